@@ -1,49 +1,88 @@
 from app.models import application
 from flask import Flask
-from app.extensions import db, migrate, jwt
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
-import logging
-from logging.handlers import RotatingFileHandler
-from app.config import Config
+from app.extensions import db, migrate, jwt, limiter
+from app.config import get_config
 
 
-def create_app():
+def create_app(profile=None, config=None):
+    """Build the app for a DB profile; `config` overrides its settings (tests, scripts)."""
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(get_config(profile))
+    app.config.update(config or {})
 
+    # orjson-backed JSON responses when available, stdlib otherwise
+    from app.utils.json import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
+    from app.utils.db_tuning import prepare_engine_options, init_engine_tuning
+    prepare_engine_options(app)
     db.init_app(app)
+    init_engine_tuning(app, db)
     migrate.init_app(app, db)
+
+    from app.utils.db_routing import init_db_routing
+    init_db_routing(app)
     jwt.init_app(app)
 
-    # Basic logging configuration
-    if not app.debug:
-        handler = RotatingFileHandler(
-            'logs/kazilink.log', maxBytes=1000000, backupCount=3)
-        handler.setLevel(logging.INFO)
-        formatter = logging.Formatter(
-            '%(asctime)s %(levelname)s %(name)s %(message)s'
-        )
-        handler.setFormatter(formatter)
-        app.logger.addHandler(handler)
-
-    # Rate limiter (uses remote address by default)
-    limiter = Limiter(key_func=get_remote_address)
-    limiter.init_app(app)
+    from app.utils.security import init_auth, init_password_hasher
+    init_auth(app)
+    init_password_hasher(app)
+
+    from services.ai_service import init_scoring
+    init_scoring(app)
+
+    # Full-text search over jobs; SQLite's FTS table is created with the schema
+    from services.search import init_search
+    init_search(app)
+
+    # Gazetteer for job location strings, loaded once per process
+    from services.geocoder import init_geocoding
+    init_geocoding(app)
+
+    # Weekly schedules as per-bucket bitmaps for "who is free" queries
+    from services.availability import init_availability
+    init_availability(app)
+
+    # `flask reconcile-ratings` for the denormalized worker ratings
+    from services.reviews import init_reviews
+    init_reviews(app)
+
+    from app.utils.http_cache import init_response_cache
+    init_response_cache(app)
+
+    # Grid-partitioned pub/sub behind GET /api/jobs/stream
+    from services.job_stream import init_job_stream
+    init_job_stream(app)
+
+    # JSON logs through a queue; request threads never write to disk
+    from app.utils.log import init_logging
+    init_logging(app, db)
+
+    # Prometheus /metrics; registers nothing unless METRICS_ENABLED
+    from app.utils.metrics import init_metrics
+    init_metrics(app, db)
+
+    from app.utils.rate_limit import init_rate_limiting
+    init_rate_limiting(app, limiter)
 
     # Import blueprints inside factory to avoid import-time side effects
     from routes.auth import auth_bp
     from routes.workers import worker_bp
     from routes.jobs import jobs_bp
     from routes.applications import application_bp
+    from routes.reviews import reviews_bp
 
-    # Register blueprints with a single API prefix
-    # auth_bp already uses the internal prefix '/auth', so register it under '/api'
-    # to yield endpoints like '/api/auth/register'
     # Register all blueprints under the common '/api' prefix so final
-    # endpoints are '/api/auth', '/api/workers', '/api/jobs', '/api/applications'
-    app.register_blueprint(auth_bp, url_prefix='/api')
-    app.register_blueprint(worker_bp, url_prefix='/api')
-    app.register_blueprint(jobs_bp, url_prefix='/api')
-    app.register_blueprint(application_bp, url_prefix='/api')
+    # endpoints are '/api/auth', '/api/workers', '/api/jobs', '/api/applications',
+    # '/api/reviews'.
+    # Passing url_prefix to register_blueprint replaces the blueprint's own
+    # prefix, so prepend '/api' to it rather than overriding it.
+    for bp in (auth_bp, worker_bp, jobs_bp, application_bp, reviews_bp):
+        app.register_blueprint(bp, url_prefix=f"/api{bp.url_prefix}")
+
+    @app.get("/api/health/db")
+    def db_health():
+        from app.utils.db_tuning import pool_stats
+        return {name or "default": pool_stats(engine) for name, engine in db.engines.items()}
+
     return app
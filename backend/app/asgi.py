@@ -0,0 +1,432 @@
+"""
+ASGI serving mode.
+
+The hot read endpoints (job feed, nearby workers, application list) are
+served by async handlers on SQLAlchemy's async engine, so a slow database
+or downstream call parks a coroutine instead of a worker thread. The live
+job stream is served here too, so an idle subscriber costs a coroutine.
+Everything else, and any request using options the async handlers do not
+implement, is passed to the regular Flask app through asgiref's
+WsgiToAsgi. Run with e.g. `uvicorn asgi:app`.
+
+Async routes still run inside a Flask request context with the app's
+before/after request hooks (rate limits, access log, metrics, DB routing),
+so they are limited, logged and measured like the WSGI routes. The hooks
+run on the event loop: with the default in-memory limiter and log queue
+they never block, but a remote RATELIMIT_STORAGE_URI costs a blocking
+round trip per request here as it does on a WSGI thread.
+"""
+import asyncio
+import io
+import re
+
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from flask import g
+from sqlalchemy import event, select, tuple_
+from sqlalchemy.ext.asyncio import create_async_engine
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from app import create_app
+from app.models.application import WorkerApplication
+from app.models.job import Job
+from app.models.user import User
+from app.utils.db_routing import REPLICA_BIND, sticky_key
+from app.utils.db_tuning import apply_pragmas
+from app.utils.geo import haversine_many
+from app.utils.http_cache import (
+    canonical_query, make_etag, pack_entry, unpack_entry, ajob_feed_key)
+from app.utils.pagination import encode_cursor, InvalidCursor
+from app.utils.querycount import track_request_queries
+from app.utils.security import AuthError, authenticated_payload
+from routes.applications import RANKED_ORDER
+from routes.jobs import (
+    MAX_RADIUS_KM, FeedParamError, parse_feed_args, feed_filters, feed_cursor_key)
+from services.job_stream import (
+    SSE_HEADERS, AsyncSubscription, StreamParamError, aiter_events, parse_stream_args)
+from routes.workers import NearbyParamError, parse_nearby_args, nearby_statement, rank_nearby
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def async_url(url: str) -> str:
+    """Swap a sync database URL's driver for its asyncio counterpart."""
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {dialect!r} URLs")
+    return f"{ASYNC_DRIVERS[dialect]}://{rest}"
+
+
+def make_async_engine(url, config, read_only=False):
+    connect_args = {}
+    if read_only and url.startswith("postgres"):
+        # Same guard as the sync replica bind (REPLICA_ENGINE_OPTIONS)
+        connect_args["server_settings"] = {"default_transaction_read_only": "on"}
+    engine = create_async_engine(async_url(url), pool_pre_ping=True, connect_args=connect_args)
+    if engine.dialect.name == "sqlite" and config.get("SQLITE_PRAGMAS"):
+        event.listen(engine.sync_engine, "connect", apply_pragmas(config["SQLITE_PRAGMAS"]))
+    return engine
+
+
+class AsyncAPI:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.fallback = WsgiToAsgi(flask_app)
+        self.json = flask_app.json
+        config = flask_app.config
+        self.primary = make_async_engine(
+            config.get("ASYNC_DATABASE_URL") or config["SQLALCHEMY_DATABASE_URI"], config)
+        replica = (config.get("SQLALCHEMY_BINDS") or {}).get(REPLICA_BIND)
+        if isinstance(replica, dict):
+            replica = replica["url"]
+        self.replica = make_async_engine(replica, config, read_only=True) if replica else None
+        # Per-request query counts for the access log and metrics
+        for engine in (self.primary, self.replica):
+            if engine is not None:
+                track_request_queries(engine.sync_engine)
+        # The environ rewrite the WSGI app gets from ProxyFix (see rate_limit.py)
+        proxy = flask_app.wsgi_app
+        self.proxy_fix = None
+        if isinstance(proxy, ProxyFix):
+            self.proxy_fix = ProxyFix(lambda environ, start_response: environ,
+                                      x_for=proxy.x_for, x_proto=proxy.x_proto,
+                                      x_host=proxy.x_host, x_port=proxy.x_port,
+                                      x_prefix=proxy.x_prefix)
+        self.routes = []
+
+    def route(self, method, pattern, when=None):
+        """
+        Serve `pattern` with an async handler. `when(request)` is checked
+        before any hook runs; returning False hands the request to the WSGI
+        app, for options the handler does not implement.
+        """
+        regex = re.compile("^" + re.sub(r"<int:(\w+)>", r"(?P<\1>\\d+)", pattern) + "$")
+
+        def register(handler):
+            self.routes.append((method, regex, when, handler))
+            return handler
+        return register
+
+    # ---- plumbing ---- #
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] == "http":
+            for method, regex, when, handler in self.routes:
+                match = regex.match(scope["path"])
+                if match and scope["method"] in (method, "HEAD" if method == "GET" else method):
+                    ctx = self.flask_app.request_context(self._environ(scope))
+                    if when is None or when(ctx.request):
+                        kwargs = {k: int(v) for k, v in match.groupdict().items()}
+                        return await self._serve(ctx, receive, send, handler, kwargs)
+                    break
+        return await self.fallback(scope, receive, send)
+
+    async def _serve(self, ctx, receive, send, handler, kwargs):
+        """
+        Run a handler the way Flask's wsgi_app runs a view: before_request
+        hooks first (one may answer, e.g. with a 429), then after_request
+        hooks on the response and teardown when the context is popped.
+        """
+        app = self.flask_app
+        chunks = None
+        ctx.push()
+        try:
+            try:
+                try:
+                    response = app.preprocess_request()
+                    if response is None:
+                        status, body, headers = await handler(self, ctx.request, **kwargs)
+                        if hasattr(body, "__aiter__"):
+                            chunks, body = body, None
+                        response = self._response(status, body, headers)
+                except Exception as e:
+                    response = app.handle_user_exception(e)
+                response = app.finalize_request(response)
+            except Exception as e:
+                response = app.handle_exception(e)
+        finally:
+            ctx.pop()
+        method = ctx.request.method
+        if chunks is not None and response.status_code == 200:
+            return await self._stream(receive, send, response, chunks, method)
+        if chunks is not None:
+            await self._discard(chunks)
+        return await self._send(send, response, method)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def aclose(self):
+        await self.primary.dispose()
+        if self.replica is not None:
+            await self.replica.dispose()
+        await self.flask_app.extensions["response_cache"].aclose()
+
+    def _environ(self, scope):
+        """The WSGI environ the fallback app would see for this request."""
+        builder = WsgiToAsgiInstance(self.flask_app)
+        builder.scope = scope
+        environ = builder.build_environ(scope, io.BytesIO())
+        if self.proxy_fix is not None:
+            environ = self.proxy_fix(environ, None)
+        return environ
+
+    def _response(self, status, body, headers):
+        if body is None:
+            # 304s and streams: send only the headers the handler set
+            response = self.flask_app.response_class(status=status, headers=headers)
+            if "Content-Type" not in (headers or {}):
+                del response.headers["Content-Type"]
+            return response
+        if not isinstance(body, bytes):
+            body = self.encode(body)
+        return self.flask_app.response_class(
+            body, status=status, headers=headers, mimetype="application/json")
+
+    @staticmethod
+    def _start(response):
+        return {
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [(k.lower().encode("latin-1"), v.encode("latin-1"))
+                        for k, v in response.headers.items()],
+        }
+
+    async def _send(self, send, response, method):
+        await send(self._start(response))
+        await send({"type": "http.response.body",
+                    "body": b"" if method == "HEAD" else response.get_data()})
+
+    async def _stream(self, receive, send, response, chunks, method):
+        """
+        Send an async iterator of chunks until it ends or the client
+        disconnects; either way the iterator is closed so it can clean up.
+        """
+        await send(self._start(response))
+        if method == "HEAD":
+            await self._discard(chunks)
+            return await send({"type": "http.response.body", "body": b""})
+
+        async def pump():
+            async for chunk in chunks:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+        async def disconnected():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        pumping = asyncio.ensure_future(pump())
+        watching = asyncio.ensure_future(disconnected())
+        done, pending = await asyncio.wait(
+            {pumping, watching}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await chunks.aclose()
+        if pumping in done:
+            await send({"type": "http.response.body", "body": b""})
+
+    @staticmethod
+    async def _discard(chunks):
+        """
+        Close a body that will not be sent. aclose() skips the finally block
+        of a generator that never started, so step it once first.
+        """
+        await anext(chunks, None)
+        await chunks.aclose()
+
+    def encode(self, body) -> bytes:
+        """JSON-encode exactly as Flask's jsonify would (shared cache entries rely on it)."""
+        indent = (self.json.compact is None and self.flask_app.debug) or self.json.compact is False
+        kwargs = {"indent": 2} if indent else {"separators": (",", ":")}
+        return self.json.dumps(body, **kwargs).encode() + b"\n"
+
+    async def read_engine(self):
+        """
+        Replica for reads unless the client wrote recently: the DB routing
+        hook has checked the cookie, the token subject is checked here
+        without blocking (see app/utils/db_routing.py).
+        """
+        if self.replica is None or g.get("db_route") != REPLICA_BIND:
+            return self.primary
+        key = sticky_key()
+        if key is not None and await self.flask_app.extensions["response_cache"].aget(key) is not None:
+            return self.primary
+        return self.replica
+
+
+def error(status, message):
+    return status, {"error": message}, None
+
+
+def conditional(api, request, body, etag, last_modified):
+    """200 with the cached body, or 304 when the client already has it."""
+    headers = {
+        "ETag": f'"{etag}"',
+        "Cache-Control": f"public, max-age={api.flask_app.config['RESPONSE_CACHE_MAX_AGE']}, must-revalidate",
+    }
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    if etag in request.if_none_match:
+        return 304, None, headers
+    return 200, body, headers
+
+
+# -------- HANDLERS -------- #
+
+# Route predicates: False sends the request to the WSGI app. They look at
+# the raw query string only, so anything unusual takes the WSGI path.
+
+def plain_feed(request):
+    args = request.args
+    return (args.get("sort", "newest") == "newest" and not args.get("include")
+            and "include_total" not in args and "page" not in args)
+
+
+def no_window(request):
+    # The availability index is built through the sync session
+    return "available_from" not in request.args and "available_until" not in request.args
+
+
+def no_include(request):
+    return not request.args.get("include")
+
+
+async def get_all_jobs(api, request):
+    """Newest-first feed with filters and cursor; other options use the WSGI path."""
+    try:
+        params = parse_feed_args(request.args)
+    except FeedParamError as e:
+        return error(400, str(e))
+
+    # Shares keys, ETags and entries with the WSGI handler's cached_json
+    cache = api.flask_app.extensions["response_cache"]
+    key = f"{await ajob_feed_key(cache)}?{canonical_query(request.args.items(multi=True))}"
+    cached = await cache.aget(key)
+    if cached is not None:
+        last_modified, etag, body = unpack_entry(cached)
+        return conditional(api, request, body, etag, last_modified)
+
+    try:
+        key_position = feed_cursor_key(params)
+    except InvalidCursor as e:
+        return error(400, str(e))
+
+    per_page = params["per_page"]
+    base = select(*Job.row_columns()).where(*feed_filters(params)).order_by(
+        Job.created_at.desc(), Job.id.desc())
+    page = []
+    batch_size = per_page + 1
+    async with (await api.read_engine()).connect() as conn:
+        while len(page) <= per_page:
+            stmt = base if key_position is None else \
+                base.where(tuple_(Job.created_at, Job.id) < key_position)
+            batch = (await conn.execute(stmt.limit(batch_size))).all()
+            dists = [None] * len(batch)
+            if params["lat"] is not None and batch:
+                dists = haversine_many(params["lat"], params["lng"],
+                                       [r.location_lat for r in batch],
+                                       [r.location_lng for r in batch]).tolist()
+            for row, dist in zip(batch, dists):
+                if params["radius_km"] is None or dist <= params["radius_km"]:
+                    page.append((row, dist))
+            if len(batch) < batch_size:
+                break
+            key_position = (batch[-1].created_at, batch[-1].id)
+            batch_size = per_page * 2
+
+    next_cursor = None
+    if len(page) > per_page:
+        page = page[:per_page]
+        last = page[-1][0]
+        next_cursor = encode_cursor({"created_at": last.created_at, "id": last.id})
+
+    items = []
+    for row, dist in page:
+        item = Job.serialize_row(row)
+        if dist is not None:
+            item["distance_km"] = round(dist, 3)
+        items.append(item)
+    body = api.encode({"items": items, "per_page": per_page, "next_cursor": next_cursor})
+
+    # No Last-Modified, as in the WSGI feed (routes/jobs.py::_build_feed)
+    etag = make_etag(body)
+    await cache.aset(key, pack_entry(None, etag, body),
+                     api.flask_app.config["RESPONSE_CACHE_TTL"])
+    return conditional(api, request, body, etag, None)
+
+
+async def workers_nearby(api, request):
+    try:
+        params = parse_nearby_args(request.args)
+    except NearbyParamError as e:
+        return error(400, str(e))
+    async with (await api.read_engine()).connect() as conn:
+        candidates = (await conn.execute(nearby_statement(params))).all()
+    return 200, rank_nearby(candidates, params), None
+
+
+async def list_applications(api, request, job_id):
+    # The same checks as login_required
+    try:
+        user_id = int(authenticated_payload()["sub"])
+    except AuthError as e:
+        return error(e.status, e.message)
+
+    async with (await api.read_engine()).connect() as conn:
+        if not api.flask_app.config.get("AUTH_STATELESS", True):
+            found = (await conn.execute(select(User.id).where(User.id == user_id))).scalar()
+            if found is None:
+                return error(404, "User not found")
+        client_id = (await conn.execute(
+            select(Job.client_id).where(Job.id == job_id))).scalar()
+        if client_id is None:
+            return error(404, "Job not found")
+        if client_id != user_id:
+            return error(403, "Unauthorized")
+        rows = (await conn.execute(select(
+            WorkerApplication.id,
+            WorkerApplication.worker_id,
+            WorkerApplication.cover_letter,
+            WorkerApplication.status,
+            WorkerApplication.ai_score,
+        ).where(WorkerApplication.job_id == job_id).order_by(*RANKED_ORDER))).all()
+    return 200, [dict(row._mapping) for row in rows], None
+
+
+async def stream_jobs(api, request):
+    """Same stream as the WSGI route, without holding a thread per subscriber."""
+    try:
+        lat, lng, radius_km = parse_stream_args(request.args, MAX_RADIUS_KM)
+    except StreamParamError as e:
+        return error(400, str(e))
+    config = api.flask_app.config
+    broker = api.flask_app.extensions["job_stream"]
+    sub = AsyncSubscription(lat, lng, radius_km, config["JOB_STREAM_QUEUE_SIZE"])
+    if not broker.hub.subscribe(sub):
+        return error(503, "Too many open streams, retry later")
+    broker.start()
+    headers = {"Content-Type": "text/event-stream; charset=utf-8", **SSE_HEADERS}
+    return 200, aiter_events(broker.hub, sub, config["JOB_STREAM_HEARTBEAT"]), headers
+
+
+def create_asgi_app(flask_app=None):
+    api = AsyncAPI(flask_app or create_app())
+    api.route("GET", "/api/jobs/", when=plain_feed)(get_all_jobs)
+    api.route("GET", "/api/jobs/stream")(stream_jobs)
+    api.route("GET", "/api/workers/", when=no_window)(workers_nearby)
+    api.route("GET", "/api/applications/job/<int:job_id>", when=no_include)(list_applications)
+    return api
@@ -8,6 +8,206 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Optional read replica; GET requests read from it (app/utils/db_routing.py).
+    # Clients stay on the primary for REPLICA_STICKY_SECONDS after a write;
+    # users are marked by token subject in the response cache, so every
+    # worker sees the mark only with a shared (redis://) RESPONSE_CACHE_URL.
+    # A job read cached from a lagging replica is served until
+    # RESPONSE_CACHE_TTL expires.
+    SQLALCHEMY_BINDS = (
+        {"replica": os.environ["REPLICA_DATABASE_URL"]}
+        if os.getenv("REPLICA_DATABASE_URL") else {}
+    )
+    REPLICA_STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+    # Engine options for the replica bind (see the DB profiles below);
+    # SQLALCHEMY_ENGINE_OPTIONS only applies to the primary
+    REPLICA_ENGINE_OPTIONS = {}
+
+    # Async engine URL for asgi.py; derived from the main URL when unset
+    # (sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg)
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
     # Secrets
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", SECRET_KEY)
+
+    # Auth: trust role/username claims in access tokens instead of loading
+    # the user on every request; other fields come from a short-TTL cache
+    AUTH_STATELESS = os.getenv("AUTH_STATELESS", "true").lower() == "true"
+    AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+
+    # Password hashing: Werkzeug method string with explicit cost, e.g.
+    # "scrypt:32768:8:1" or "pbkdf2:sha256:1000000". Existing hashes are
+    # upgraded on the next successful login. PASSWORD_HASH_WORKERS > 0 runs
+    # the KDF in a process pool of that size (benchmarks/bench_hashing.py).
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))
+
+    # Application scoring: "background" (in-process queue), "sync" or "off"
+    SCORING_MODE = os.getenv("SCORING_MODE", "background")
+
+    # Seconds before the in-process job-to-worker match index is rebuilt
+    MATCH_INDEX_TTL = float(os.getenv("MATCH_INDEX_TTL", "300"))
+
+    # Response cache for public job reads: "memory://" (per-process LRU)
+    # or a redis:// URL shared by all workers. ETags hash the body, so any
+    # worker revalidates them, but with "memory://" a worker only sees its
+    # own writes and may serve a stale entry for up to RESPONSE_CACHE_TTL.
+    RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "memory://")
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+    # Cache-Control max-age sent to clients; 0 means always revalidate
+    RESPONSE_CACHE_MAX_AGE = int(os.getenv("RESPONSE_CACHE_MAX_AGE", "0"))
+
+    # Rate limiting. Storage: "memory://" (per process), "sqlite:///<path>"
+    # shared by all workers on a host (use tmpfs, e.g. /dev/shm), or a
+    # redis:// URL shared across hosts. Limits are "N/period" strings joined
+    # with ";". Set PROXY_FIX_X_FOR to the number of proxies in front of the
+    # app so limits key on the client IP rather than the proxy's.
+    RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "true").lower() == "true"
+    RATELIMIT_STORAGE_URI = os.getenv("RATELIMIT_STORAGE_URI", "memory://")
+    RATELIMIT_STRATEGY = os.getenv("RATELIMIT_STRATEGY", "sliding-window-counter")
+    RATELIMIT_HEADERS_ENABLED = True
+    RATELIMIT_LOGIN = os.getenv("RATELIMIT_LOGIN", "10/minute;100/hour")
+    RATELIMIT_REGISTER = os.getenv("RATELIMIT_REGISTER", "5/minute;50/day")
+    RATELIMIT_APPLY = os.getenv("RATELIMIT_APPLY", "30/minute;500/day")
+    PROXY_FIX_X_FOR = int(os.getenv("PROXY_FIX_X_FOR", "0"))
+
+    # Logging (app/utils/log.py): JSON lines written by a background thread.
+    # LOG_FILE is reopened after external rotation (logrotate); empty logs
+    # to stderr. Successful access records are sampled at
+    # LOG_ACCESS_SAMPLE_RATE (0-1); slow (>= LOG_SLOW_REQUEST_MS) and 5xx
+    # requests are always logged. Records beyond LOG_QUEUE_SIZE are dropped.
+    LOG_FILE = os.getenv("LOG_FILE", "logs/kazilink.log")
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_ACCESS_SAMPLE_RATE = float(os.getenv("LOG_ACCESS_SAMPLE_RATE", "1.0"))
+    LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "1000"))
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+    # Per-route latency, SQL and serialization metrics at GET /metrics
+    # (Prometheus text). With METRICS_TOKEN set, both metrics endpoints
+    # require "Authorization: Bearer <token>" and GET /metrics/slow lists
+    # the paths and SQL of the last METRICS_SLOW_SAMPLES requests slower
+    # than METRICS_SLOW_REQUEST_MS; without a token it is not registered.
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+    METRICS_SLOW_REQUEST_MS = float(os.getenv("METRICS_SLOW_REQUEST_MS", "500"))
+    METRICS_SLOW_SAMPLES = int(os.getenv("METRICS_SLOW_SAMPLES", "50"))
+
+    # Offline geocoder for job location strings (services/geocoder.py).
+    # GEOCODER_GAZETTEER overrides the bundled CSV of Kenyan places;
+    # GEOCODER_CACHE_SIZE is the number of resolved strings kept per process.
+    # Matches below GEOCODER_MIN_CONFIDENCE are rejected with suggestions;
+    # a name prefix scores 0.5, a misspelt whole name 0.8 or more.
+    GEOCODER_GAZETTEER = os.getenv("GEOCODER_GAZETTEER", "")
+    GEOCODER_CACHE_SIZE = int(os.getenv("GEOCODER_CACHE_SIZE", "4096"))
+    GEOCODER_MIN_CONFIDENCE = float(os.getenv("GEOCODER_MIN_CONFIDENCE", "0.6"))
+
+    # Live job stream at GET /api/jobs/stream (services/job_stream.py).
+    # "memory://" only reaches subscribers of the process that created the
+    # job; with several workers use a redis:// URL. Subscribers are indexed
+    # on JOB_STREAM_CELL_KM grid cells; each has a queue of
+    # JOB_STREAM_QUEUE_SIZE events and gets a keepalive every
+    # JOB_STREAM_HEARTBEAT seconds. The ASGI app (asgi.py) holds a
+    # coroutine per stream. Under WSGI each stream holds a worker thread
+    # for as long as it is open, so a process serves at most
+    # JOB_STREAM_MAX_WSGI_STREAMS there and answers 503 beyond it: keep it
+    # well below gunicorn --threads, or 0 to serve streams from asgi.py only.
+    JOB_STREAM_BROKER_URL = os.getenv("JOB_STREAM_BROKER_URL", "memory://")
+    JOB_STREAM_CELL_KM = float(os.getenv("JOB_STREAM_CELL_KM", "5"))
+    JOB_STREAM_QUEUE_SIZE = int(os.getenv("JOB_STREAM_QUEUE_SIZE", "100"))
+    JOB_STREAM_HEARTBEAT = float(os.getenv("JOB_STREAM_HEARTBEAT", "15"))
+    JOB_STREAM_MAX_SUBSCRIBERS = int(os.getenv("JOB_STREAM_MAX_SUBSCRIBERS", "10000"))
+    JOB_STREAM_MAX_WSGI_STREAMS = int(os.getenv("JOB_STREAM_MAX_WSGI_STREAMS", "2"))
+
+    # Worker ratings (services/reviews.py): the Bayesian average stored on
+    # each profile counts REVIEW_PRIOR_WEIGHT phantom reviews at
+    # REVIEW_PRIOR_MEAN, so a handful of reviews cannot top the ranking.
+    # Run `flask reconcile-ratings` after changing either.
+    REVIEW_PRIOR_MEAN = float(os.getenv("REVIEW_PRIOR_MEAN", "3.5"))
+    REVIEW_PRIOR_WEIGHT = float(os.getenv("REVIEW_PRIOR_WEIGHT", "5"))
+
+    # Worker schedules (services/availability.py): weekly slots are wall-clock
+    # times in AVAILABILITY_TIMEZONE. The per-process index answering
+    # "free for this window" works in AVAILABILITY_BUCKET_MINUTES buckets
+    # (slots are rounded inwards to them) and is rebuilt after
+    # AVAILABILITY_INDEX_TTL seconds to pick up other processes' changes.
+    AVAILABILITY_TIMEZONE = os.getenv("AVAILABILITY_TIMEZONE", "Africa/Nairobi")
+    AVAILABILITY_BUCKET_MINUTES = int(os.getenv("AVAILABILITY_BUCKET_MINUTES", "15"))
+    AVAILABILITY_INDEX_TTL = float(os.getenv("AVAILABILITY_INDEX_TTL", "300"))
+
+    # Rows per transaction for POST /api/jobs/bulk
+    BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+
+
+# -------- DATABASE PROFILES -------- #
+# Select with DB_PROFILE; defaults to dev-sqlite for sqlite URLs and
+# prod-postgres otherwise. Pool sizes are per process: budget
+# (pool_size + max_overflow) x gunicorn workers against max_connections.
+
+class DevSQLiteConfig(Config):
+    # Applied on every new connection. WAL lets readers run alongside a
+    # writer and busy_timeout makes concurrent writers wait instead of
+    # failing with "database is locked". The pragma replaces sqlite3's
+    # connect timeout, so SQLITE_BUSY_TIMEOUT_MS is the whole lock wait.
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "synchronous": "NORMAL",
+        "cache_size": -16000,  # KiB
+        "temp_store": "MEMORY",
+    }
+
+
+class ProdPostgresConfig(Config):
+    # Several gunicorn workers per host: share limits through a file on
+    # tmpfs unless a redis:// URL is configured
+    RATELIMIT_STORAGE_URI = os.getenv(
+        "RATELIMIT_STORAGE_URI", "sqlite:////dev/shm/mboka-ratelimit.db")
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "5")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "5")),
+        # Drop connections idle long enough to be cut by a proxy/firewall
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": True,
+        "pool_use_lifo": True,
+        "connect_args": {
+            "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "5")),
+            "options": f"-c statement_timeout={os.getenv('DB_STATEMENT_TIMEOUT_MS', '5000')}",
+        },
+    }
+    # The replica serves GET requests: more connections, a longer statement
+    # timeout for reporting queries, and writes rejected server-side
+    REPLICA_ENGINE_OPTIONS = {
+        **SQLALCHEMY_ENGINE_OPTIONS,
+        "pool_size": int(os.getenv("REPLICA_POOL_SIZE", "20")),
+        "max_overflow": int(os.getenv("REPLICA_MAX_OVERFLOW", "10")),
+        "connect_args": {
+            "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "5")),
+            "options": (
+                f"-c statement_timeout={os.getenv('REPLICA_STATEMENT_TIMEOUT_MS', '15000')} "
+                "-c default_transaction_read_only=on"
+            ),
+        },
+    }
+    SQLITE_PRAGMAS = {}
+
+
+PROFILES = {
+    "dev-sqlite": DevSQLiteConfig,
+    "prod-postgres": ProdPostgresConfig,
+}
+
+
+def get_config(profile: str = None):
+    """Return the config class for a DB profile name (or DB_PROFILE)."""
+    profile = profile or os.getenv("DB_PROFILE")
+    if not profile:
+        uri = Config.SQLALCHEMY_DATABASE_URI
+        profile = "dev-sqlite" if uri.startswith("sqlite") else "prod-postgres"
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(
+            f"Unknown DB_PROFILE {profile!r}; expected one of {', '.join(PROFILES)}")
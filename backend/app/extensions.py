@@ -1,7 +1,16 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from flask_limiter import Limiter
+from app.utils.db_routing import RoutingSession
+from app.utils.rate_limit import rate_limit_key
 
-db = SQLAlchemy()
+# RoutingSession sends read-only requests to the "replica" bind when one is
+# configured (REPLICA_DATABASE_URL); otherwise it behaves like the default
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
+
+# Keyed on the JWT subject, falling back to the client IP; storage and
+# strategy come from RATELIMIT_* config (app/utils/rate_limit.py)
+limiter = Limiter(key_func=rate_limit_key)
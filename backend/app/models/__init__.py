@@ -1,2 +1,4 @@
 from .user import User
-from .worker_profile import WorkerProfile
\ No newline at end of file
+from .worker_profile import WorkerProfile
+from .review import Review
+from .availability import AvailabilitySlot, AvailabilityException
@@ -12,6 +12,12 @@ class WorkerApplication(db.Model):
     ai_score = db.Column(db.Float, nullable=True)  # optional AI ranking
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # One application per worker per job; also serves lookups by job_id
+    __table_args__ = (
+        db.UniqueConstraint("job_id", "worker_id", name="uq_worker_applications_job_worker"),
+        db.Index("ix_worker_applications_worker_created_at", "worker_id", "created_at"),
+    )
+
     # Relationships
     job = db.relationship("Job", backref="applications")
     worker = db.relationship("User", backref="applications")
@@ -0,0 +1,56 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class AvailabilitySlot(db.Model):
+    """A weekly recurring window in AVAILABILITY_TIMEZONE wall-clock time."""
+    __tablename__ = "availability_slots"
+
+    id = db.Column(db.Integer, primary_key=True)
+    worker_id = db.Column(db.Integer, db.ForeignKey("worker_profiles.id"), nullable=False)
+    weekday = db.Column(db.SmallInteger, nullable=False)  # 0 = Monday
+    start_minute = db.Column(db.SmallInteger, nullable=False)  # minutes after midnight
+    end_minute = db.Column(db.SmallInteger, nullable=False)  # exclusive, up to 1440
+
+    __table_args__ = (
+        db.CheckConstraint("weekday BETWEEN 0 AND 6", name="ck_availability_slots_weekday"),
+        db.CheckConstraint("start_minute >= 0 AND end_minute <= 1440 AND start_minute < end_minute",
+                           name="ck_availability_slots_minutes"),
+        db.Index("ix_availability_slots_worker", "worker_id", "weekday"),
+    )
+
+    def serialize(self):
+        return {
+            "weekday": self.weekday,
+            "start": f"{self.start_minute // 60:02d}:{self.start_minute % 60:02d}",
+            "end": f"{self.end_minute // 60:02d}:{self.end_minute % 60:02d}",
+        }
+
+
+class AvailabilityException(db.Model):
+    """A one-off override of the weekly slots (UTC): time off, or extra hours."""
+    __tablename__ = "availability_exceptions"
+
+    id = db.Column(db.Integer, primary_key=True)
+    worker_id = db.Column(db.Integer, db.ForeignKey("worker_profiles.id"), nullable=False)
+    starts_at = db.Column(db.DateTime, nullable=False)
+    ends_at = db.Column(db.DateTime, nullable=False)
+    available = db.Column(db.Boolean, nullable=False, default=False)  # False = time off
+    note = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # A worker's upcoming exceptions, and the index load of unexpired ones
+    __table_args__ = (
+        db.CheckConstraint("starts_at < ends_at", name="ck_availability_exceptions_range"),
+        db.Index("ix_availability_exceptions_worker", "worker_id", "ends_at"),
+        db.Index("ix_availability_exceptions_ends_at", "ends_at"),
+    )
+
+    def serialize(self):
+        return {
+            "id": self.id,
+            "starts_at": self.starts_at.isoformat(),
+            "ends_at": self.ends_at.isoformat(),
+            "available": self.available,
+            "note": self.note,
+        }
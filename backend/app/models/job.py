@@ -13,7 +13,8 @@ class Job(db.Model):
     location_lat = db.Column(db.Float, nullable=False)
     location_lng = db.Column(db.Float, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    # Set on insert too so it can back Last-Modified/ETag for every row
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     client_id = db.Column(
         db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -25,6 +26,16 @@ class Job(db.Model):
     # optional AI data: price reason, flags
     job_metadata = db.Column(JSON, nullable=True)
 
+    # Indexes backing the job feed filters and keyset ordering
+    __table_args__ = (
+        db.Index("ix_jobs_status_created_at", "status", "created_at", "id"),
+        db.Index("ix_jobs_created_at", "created_at", "id"),
+        db.Index("ix_jobs_lat_lng", "location_lat", "location_lng"),
+        # A client's jobs (export, ownership lists) and a worker's assignments
+        db.Index("ix_jobs_client_id", "client_id", "id"),
+        db.Index("ix_jobs_worker_id", "worker_id"),
+    )
+
     # Relationships
     client = db.relationship("User", foreign_keys=[
                              client_id], backref="posted_jobs")
@@ -34,18 +45,36 @@ class Job(db.Model):
     def __repr__(self):
         return f"<Job {self.title} ({self.status})>"
 
+    # Columns exposed by serialize(); list endpoints select just these
+    SERIALIZED_FIELDS = (
+        "id", "title", "description", "price", "location_lat", "location_lng",
+        "created_at", "updated_at", "client_id", "worker_id", "status",
+        "job_metadata",
+    )
+
+    @classmethod
+    def row_columns(cls):
+        return [getattr(cls, name) for name in cls.SERIALIZED_FIELDS]
+
     def serialize(self):
+        return Job.serialize_row(self)
+
+    @staticmethod
+    def serialize_row(row):
+        """Serialize a Job or a row selected with Job.row_columns()."""
+        created_at = row.created_at
+        updated_at = row.updated_at
         return {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "price": self.price,
-            "location_lat": self.location_lat,
-            "location_lng": self.location_lng,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "client_id": self.client_id,
-            "worker_id": self.worker_id,
-            "status": self.status,
-            "job_metadata": self.job_metadata,
+            "id": row.id,
+            "title": row.title,
+            "description": row.description,
+            "price": row.price,
+            "location_lat": row.location_lat,
+            "location_lng": row.location_lng,
+            "created_at": created_at.isoformat() if created_at else None,
+            "updated_at": updated_at.isoformat() if updated_at else None,
+            "client_id": row.client_id,
+            "worker_id": row.worker_id,
+            "status": row.status,
+            "job_metadata": row.job_metadata,
         }
@@ -0,0 +1,36 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class Review(db.Model):
+    __tablename__ = "reviews"
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey("jobs.id"), nullable=False)
+    reviewer_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)  # the job's client
+    worker_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)  # the job's worker
+    rating = db.Column(db.Integer, nullable=False)  # 1-5
+    comment = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # One review per job; a worker's reviews are read newest first and
+    # summed by the rating reconciliation
+    __table_args__ = (
+        db.UniqueConstraint("job_id", name="uq_reviews_job_id"),
+        db.CheckConstraint("rating BETWEEN 1 AND 5", name="ck_reviews_rating"),
+        db.Index("ix_reviews_worker_created_at", "worker_id", "created_at", "id"),
+    )
+
+    def serialize(self):
+        return {
+            "id": self.id,
+            "job_id": self.job_id,
+            "reviewer_id": self.reviewer_id,
+            "worker_id": self.worker_id,
+            "rating": self.rating,
+            "comment": self.comment,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self):
+        return f"<Review {self.id} for Job {self.job_id}>"
@@ -1,6 +1,5 @@
 from ..extensions import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 
 class User(db.Model):
     __tablename__ = "users"
@@ -9,15 +8,14 @@ class User(db.Model):
     username = db.Column(db.String(120), unique=True, nullable=False)
     name = db.Column(db.String(120), nullable=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), nullable=False)  # 'worker' or 'client'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     worker_profile = db.relationship('WorkerProfile', backref='user', uselist=False)
 
-    #one to many relationships defined in Job and WorkerApplication models
-
-    jobs = db.relationship('Job', backref='client', lazy=True)
+    # one to many relationships (posted_jobs, assigned_jobs, applications)
+    # are defined as backrefs in the Job and WorkerApplication models
 
     def serialize(self):
         return {
@@ -29,8 +27,21 @@ class User(db.Model):
             "created_at": self.created_at.isoformat()
         }
 
+    def serialize_public(self):
+        """Fields safe to show other users (no email)."""
+        return {
+            "id": self.id,
+            "username": self.username,
+            "name": self.name,
+            "role": self.role,
+        }
+
+    # Through the configured PasswordHasher (PASSWORD_HASH_METHOD/_WORKERS);
+    # imported here because app.utils.security imports this model
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        from app.utils.security import hash_password
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        from app.utils.security import verify_password
+        return verify_password(self.password_hash, password)
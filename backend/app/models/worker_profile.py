@@ -10,3 +10,38 @@ class WorkerProfile(db.Model):
     bio = db.Column(db.Text)
     skills = db.Column(db.Text)  # could be JSON in a more advanced schema
     location = db.Column(db.String(255))
+
+    # Last reported position (WGS84 degrees)
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+
+    # Availability as set by the worker; used when matching workers to jobs
+    is_available = db.Column(db.Boolean, nullable=False, default=True)
+    available_hours = db.Column(db.Integer, nullable=True)
+
+    # Review aggregates, kept in step with the reviews table by the insert
+    # transaction (services/reviews.py); rating is the Bayesian average,
+    # NULL until the first review
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating = db.Column(db.Float, nullable=True)
+
+    # Composite index backs the bounding-box prefilter in workers_nearby
+    __table_args__ = (
+        db.Index("ix_worker_profiles_lat_lng", "latitude", "longitude"),
+    )
+
+    def serialize(self):
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "bio": self.bio,
+            "skills": self.skills,
+            "location": self.location,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "is_available": self.is_available,
+            "available_hours": self.available_hours,
+            "rating": self.rating,
+            "rating_count": self.rating_count,
+        }
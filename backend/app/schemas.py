@@ -1,4 +1,6 @@
-from marshmallow import Schema, fields, validate, ValidationError
+from datetime import timezone
+
+from marshmallow import Schema, fields, post_load, validate, ValidationError
 
 
 def validate_password(p):
@@ -33,4 +35,67 @@ class JobCreateSchema(Schema):
     location_lat = fields.Float(missing=None)
     location_lng = fields.Float(missing=None)
 
+    @post_load
+    def fill_coordinates(self, data, **kwargs):
+        # Imported here: services import this module
+        from services.geocoder import UnknownLocation, resolve_coordinates
+        try:
+            data["location_lat"], data["location_lng"] = resolve_coordinates(
+                data["location"], data["location_lat"], data["location_lng"])
+        except UnknownLocation as err:
+            raise ValidationError(str(err), "location")
+        return data
+
+
+class ReviewCreateSchema(Schema):
+    job_id = fields.Int(required=True)
+    rating = fields.Int(required=True, validate=validate.Range(min=1, max=5))
+    comment = fields.Str(missing=None, validate=validate.Length(max=2000))
+
+
+def _minutes(value):
+    # "HH:MM" -> minutes after midnight; "24:00" closes a slot at midnight
+    try:
+        hours, minutes = map(int, value.split(":"))
+    except (AttributeError, ValueError):
+        raise ValidationError("Use HH:MM")
+    if not (0 <= minutes < 60 and 0 <= hours * 60 + minutes <= 24 * 60):
+        raise ValidationError("Use HH:MM between 00:00 and 24:00")
+    return hours * 60 + minutes
+
+
+class AvailabilitySlotSchema(Schema):
+    weekday = fields.Int(required=True, validate=validate.Range(min=0, max=6))  # 0 = Monday
+    start = fields.Str(required=True)
+    end = fields.Str(required=True)
+
+    @post_load
+    def to_minutes(self, data, **kwargs):
+        start, end = _minutes(data["start"]), _minutes(data["end"])
+        if start >= end:
+            raise ValidationError("Slot must end after it starts; split overnight slots", "end")
+        return {"weekday": data["weekday"], "start_minute": start, "end_minute": end}
+
+
+class ScheduleSchema(Schema):
+    slots = fields.List(fields.Nested(AvailabilitySlotSchema), required=True,
+                        validate=validate.Length(max=100))
+
+
+class AvailabilityExceptionSchema(Schema):
+    starts_at = fields.AwareDateTime(required=True, default_timezone=timezone.utc)
+    ends_at = fields.AwareDateTime(required=True, default_timezone=timezone.utc)
+    available = fields.Bool(missing=False)  # False = time off, True = extra hours
+    note = fields.Str(missing=None, validate=validate.Length(max=255))
 
+    @post_load
+    def to_utc(self, data, **kwargs):
+        # Stored as naive UTC like every other timestamp
+        from services.availability import MAX_EXCEPTION
+        for key in ("starts_at", "ends_at"):
+            data[key] = data[key].astimezone(timezone.utc).replace(tzinfo=None)
+        if data["starts_at"] >= data["ends_at"]:
+            raise ValidationError("Must be after starts_at", "ends_at")
+        if data["ends_at"] - data["starts_at"] > MAX_EXCEPTION:
+            raise ValidationError("Exceptions are limited to 90 days", "ends_at")
+        return data
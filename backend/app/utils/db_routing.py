@@ -0,0 +1,93 @@
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+from app.utils.http_cache import get_response_cache
+
+REPLICA_BIND = "replica"
+STICKY_COOKIE = "db_primary_until"
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RoutingSession(Session):
+    """
+    Sends reads in read-only requests to the "replica" bind.
+
+    A request is routed to the replica when it is a GET/HEAD, a replica
+    bind is configured, the handler is not marked with @use_primary and
+    the client has not written recently (see init_db_routing). Flushes
+    always go to the primary, as does anything outside a request (CLI,
+    background threads).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _use_replica():
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _use_replica():
+    if not has_request_context() or g.get("db_route") != REPLICA_BIND:
+        return False
+    # Looked up on the first query, so requests that never query skip it
+    if g.get("db_recent_writer") is None:
+        key = sticky_key()
+        g.db_recent_writer = key is not None and get_response_cache().get(key) is not None
+    return not g.db_recent_writer
+
+
+def sticky_key():
+    """
+    Shared-cache key marking the caller as having written within
+    REPLICA_STICKY_SECONDS, or None for anonymous requests.
+    """
+    from app.utils.security import request_payload
+    payload = request_payload()
+    return f"db:primary:{payload['sub']}" if payload else None
+
+
+def use_primary(f):
+    """Mark a GET handler that must read its own writes from the primary."""
+    f._use_primary = True
+    return f
+
+
+def init_db_routing(app):
+    if REPLICA_BIND not in (app.config.get("SQLALCHEMY_BINDS") or {}):
+        return
+    sticky_seconds = app.config["REPLICA_STICKY_SECONDS"]
+
+    @app.before_request
+    def choose_route():
+        if request.method not in READ_METHODS:
+            return
+        view = app.view_functions.get(request.endpoint)
+        if view is None or getattr(view, "_use_primary", False):
+            return
+        # Read-your-writes: clients that wrote recently stay on the primary
+        # until replication has had time to catch up. Authenticated users
+        # are marked in the shared response cache under their token
+        # subject, which holds for every device and for clients that drop
+        # cookies; the cookie covers anonymous writers (registration).
+        try:
+            primary_until = float(request.cookies.get(STICKY_COOKIE, 0))
+        except ValueError:
+            primary_until = 0
+        if primary_until < time.time():
+            g.db_route = REPLICA_BIND
+            g.db_recent_writer = None
+
+    @app.after_request
+    def mark_writer(response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            response.set_cookie(
+                STICKY_COOKIE, f"{time.time() + sticky_seconds:.3f}",
+                max_age=int(sticky_seconds) + 1, httponly=True, samesite="Strict",
+                secure=current_app.config.get("ENV") == "production")
+            key = sticky_key()
+            if key is not None:
+                get_response_cache().set(key, b"1", sticky_seconds)
+        return response
@@ -0,0 +1,116 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from app.utils.db_routing import REPLICA_BIND
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        # Keep counters when the pool is rebuilt (e.g. after dispose)
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+
+def apply_pragmas(pragmas):
+    """Connect-event listener that sets SQLite PRAGMAs on each new connection."""
+    def on_connect(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    return on_connect
+
+
+def _in_memory(uri) -> bool:
+    return uri in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in uri
+
+
+def prepare_engine_options(app):
+    """
+    Call before db.init_app: swaps in MeteredQueuePool for pooled
+    (non in-memory) databases so checkout waits can be reported, and gives
+    a replica bind configured as a bare URL the REPLICA_ENGINE_OPTIONS
+    (Flask-SQLAlchemy applies SQLALCHEMY_ENGINE_OPTIONS to the primary only).
+    """
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    if not _in_memory(app.config["SQLALCHEMY_DATABASE_URI"]):
+        options.setdefault("poolclass", MeteredQueuePool)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    replica = binds.get(REPLICA_BIND)
+    if isinstance(replica, str):
+        replica = {**app.config.get("REPLICA_ENGINE_OPTIONS", {}), "url": replica}
+        if not _in_memory(replica["url"]):
+            replica.setdefault("poolclass", MeteredQueuePool)
+        binds[REPLICA_BIND] = replica
+        app.config["SQLALCHEMY_BINDS"] = binds
+
+
+def init_engine_tuning(app, db):
+    """Call after db.init_app: installs SQLite pragmas on every new connection."""
+    pragmas = app.config.get("SQLITE_PRAGMAS") or {}
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite" and pragmas:
+                event.listen(engine, "connect", apply_pragmas(pragmas))
+
+
+def pool_stats(engine) -> dict:
+    """Snapshot of an engine's pool: size, checked out, overflow and wait times."""
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update({
+            "checkouts": metrics.checkouts,
+            "timeouts": metrics.timeouts,
+            "wait_avg_ms": round(metrics.wait_total / metrics.checkouts * 1000, 3)
+            if metrics.checkouts else 0.0,
+            "wait_max_ms": round(metrics.wait_max * 1000, 3),
+        })
+    return stats
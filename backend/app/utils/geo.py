@@ -0,0 +1,204 @@
+import math
+
+import numpy as np
+
+# Mean Earth radius (IUGG) in kilometres
+EARTH_RADIUS_KM = 6371.0088
+
+# Kilometres spanned by one degree of latitude
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180.0
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + \
+        math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lng: float, radius_km: float):
+    """
+    Return (min_lat, max_lat, min_lng, max_lng) enclosing a circle of
+    radius_km around (lat, lng). Used as an index-friendly SQL prefilter;
+    callers still compute the exact haversine distance on the candidates.
+    """
+    dlat = radius_km / KM_PER_DEG_LAT
+    min_lat = max(-90.0, lat - dlat)
+    max_lat = min(90.0, lat + dlat)
+
+    # Near the poles, or when the box wraps the antimeridian, fall back to
+    # the full longitude range rather than splitting the box in two.
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat <= 1e-9:
+        return min_lat, max_lat, -180.0, 180.0
+    dlng = radius_km / (KM_PER_DEG_LAT * cos_lat)
+    if lng - dlng < -180.0 or lng + dlng > 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, lng - dlng, lng + dlng
+
+
+def valid_coordinates(lat, lng) -> bool:
+    """True if lat/lng are numbers within the WGS84 range."""
+    try:
+        lat = float(lat)
+        lng = float(lng)
+    except (TypeError, ValueError):
+        return False
+    return -90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0
+
+
+# -------- VECTORIZED ENGINE -------- #
+
+def haversine_many(lat: float, lng: float, lats, lngs):
+    """
+    Haversine distance (km) from one point to arrays of points.
+    lats/lngs are array-likes in degrees; returns a NumPy array.
+    """
+    lats = np.radians(np.asarray(lats, dtype=np.float64))
+    lngs = np.radians(np.asarray(lngs, dtype=np.float64))
+    phi = math.radians(lat)
+    a = np.sin((lats - phi) * 0.5) ** 2 + \
+        math.cos(phi) * np.cos(lats) * np.sin((lngs - math.radians(lng)) * 0.5) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GeoIndex:
+    """
+    In-memory point set for batched distance queries.
+
+    Coordinates are stored as compact float32 radians alongside their
+    integer ids; cos(lat) is precomputed so each query is a handful of
+    vectorized passes over the arrays. Top-k selection uses argpartition,
+    so only the k winners are fully sorted.
+    """
+
+    # Queries are evaluated in blocks of this many points to bound the
+    # size of the (queries x points) distance matrix.
+    BLOCK_SIZE = 1 << 22
+
+    def __init__(self, ids=(), lats=(), lngs=()):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self._lat = np.radians(np.asarray(lats, dtype=np.float64)).astype(np.float32)
+        self._lng = np.radians(np.asarray(lngs, dtype=np.float64)).astype(np.float32)
+        self._cos_lat = np.cos(self._lat)
+        self._pos = {int(i): n for n, i in enumerate(self.ids)}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from an iterable of (id, lat, lng), skipping missing coordinates."""
+        rows = [r for r in rows if r[1] is not None and r[2] is not None]
+        if not rows:
+            return cls()
+        ids, lats, lngs = zip(*rows)
+        return cls(ids, lats, lngs)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, item_id):
+        return int(item_id) in self._pos
+
+    # ---- maintenance ---- #
+
+    def upsert(self, item_id: int, lat: float, lng: float):
+        """Insert or move a point. Appends are O(n); prefer rebuilding for bulk loads."""
+        item_id = int(item_id)
+        rlat = np.float32(math.radians(lat))
+        rlng = np.float32(math.radians(lng))
+        n = self._pos.get(item_id)
+        if n is None:
+            self._pos[item_id] = len(self.ids)
+            self.ids = np.append(self.ids, item_id)
+            self._lat = np.append(self._lat, rlat)
+            self._lng = np.append(self._lng, rlng)
+            self._cos_lat = np.append(self._cos_lat, np.cos(rlat))
+        else:
+            self._lat[n] = rlat
+            self._lng[n] = rlng
+            self._cos_lat[n] = np.cos(rlat)
+
+    def remove(self, item_id: int):
+        """Remove a point by swapping the last entry into its slot."""
+        n = self._pos.pop(int(item_id), None)
+        if n is None:
+            return
+        last = len(self.ids) - 1
+        if n != last:
+            moved = int(self.ids[last])
+            for arr in (self.ids, self._lat, self._lng, self._cos_lat):
+                arr[n] = arr[last]
+            self._pos[moved] = n
+        self.ids = self.ids[:last]
+        self._lat = self._lat[:last]
+        self._lng = self._lng[:last]
+        self._cos_lat = self._cos_lat[:last]
+
+    # ---- queries ---- #
+
+    def distances(self, lats, lngs):
+        """
+        Distance matrix (km) of shape (len(lats), len(self)) for many
+        query points at once.
+        """
+        q_lat = np.radians(np.atleast_1d(np.asarray(lats, dtype=np.float64))).astype(np.float32)
+        q_lng = np.radians(np.atleast_1d(np.asarray(lngs, dtype=np.float64))).astype(np.float32)
+        q_lat = q_lat[:, None]
+        a = np.sin((self._lat - q_lat) * 0.5) ** 2 + \
+            np.cos(q_lat) * self._cos_lat * np.sin((self._lng - q_lng[:, None]) * 0.5) ** 2
+        np.minimum(a, 1.0, out=a)
+        return (2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(a))
+
+    def _blocks(self, lats, lngs):
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lngs = np.atleast_1d(np.asarray(lngs, dtype=np.float64))
+        step = max(1, self.BLOCK_SIZE // max(len(self), 1))
+        for start in range(0, len(lats), step):
+            yield self.distances(lats[start:start + step], lngs[start:start + step])
+
+    def nearest(self, lat: float, lng: float, k: int = 10):
+        """Return [(id, distance_km)] of the k closest points, nearest first."""
+        return self.nearest_many([lat], [lng], k)[0]
+
+    def nearest_many(self, lats, lngs, k: int = 10):
+        """Top-k nearest points for each query point."""
+        results = []
+        if len(self) == 0 or k <= 0:
+            return [[] for _ in np.atleast_1d(lats)]
+        k = min(k, len(self))
+        for dist in self._blocks(lats, lngs):
+            if k < len(self):
+                part = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            else:
+                part = np.broadcast_to(np.arange(len(self)), dist.shape)
+            part_dist = np.take_along_axis(dist, part, axis=1)
+            order = np.argsort(part_dist, axis=1)
+            top = np.take_along_axis(part, order, axis=1)
+            top_dist = np.take_along_axis(part_dist, order, axis=1)
+            for row_idx, row_dist in zip(top, top_dist):
+                results.append(list(zip(self.ids[row_idx].tolist(), row_dist.tolist())))
+        return results
+
+    def within(self, lat: float, lng: float, radius_km: float, limit: int = None):
+        """Return [(id, distance_km)] inside radius_km, nearest first."""
+        return self.within_many([lat], [lng], radius_km, limit)[0]
+
+    def within_many(self, lats, lngs, radius_km: float, limit: int = None):
+        """Within-radius query for each query point, optionally capped at limit."""
+        results = []
+        if len(self) == 0:
+            return [[] for _ in np.atleast_1d(lats)]
+        for dist in self._blocks(lats, lngs):
+            for row in dist:
+                hits = np.flatnonzero(row <= radius_km)
+                if limit is not None and len(hits) > limit:
+                    if limit <= 0:
+                        hits = hits[:0]
+                    else:
+                        hits = hits[np.argpartition(row[hits], limit - 1)[:limit]]
+                hits = hits[np.argsort(row[hits])]
+                results.append(list(zip(self.ids[hits].tolist(), row[hits].tolist())))
+        return results
@@ -0,0 +1,71 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import (
+    generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS)
+
+
+def normalize_method(method: str) -> str:
+    """
+    Expand a Werkzeug hash method to the fully parameterised prefix it
+    writes into stored hashes, e.g. "scrypt" -> "scrypt:32768:8:1".
+    """
+    name, *args = method.split(":")
+    if name == "scrypt":
+        n, r, p = (args + ["32768", "8", "1"][len(args):])[:3]
+        return f"scrypt:{int(n)}:{int(r)}:{int(p)}"
+    if name == "pbkdf2":
+        digest, iterations = (args + ["sha256", str(DEFAULT_PBKDF2_ITERATIONS)][len(args):])[:2]
+        return f"pbkdf2:{digest}:{int(iterations)}"
+    raise ValueError(f"Unsupported password hash method: {method}")
+
+
+class PasswordHasher:
+    """
+    Password hashing with explicit cost parameters.
+
+    `method` uses Werkzeug's syntax ("scrypt:n:r:p" or
+    "pbkdf2:digest:iterations"). Hashes written with different parameters
+    still verify; `needs_rehash` tells the login path to upgrade them.
+
+    With workers > 0 the KDF runs in a bounded process pool so CPU-heavy
+    hashing does not hold the GIL of the request worker. At most
+    workers * queue_factor calls may be in flight; further callers wait.
+    """
+
+    def __init__(self, method: str = "scrypt:32768:8:1", salt_length: int = 16,
+                 workers: int = 0, queue_factor: int = 4):
+        self.method = normalize_method(method)
+        self.salt_length = salt_length
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max(workers, 1) * queue_factor)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _executor(self):
+        # Created lazily so the pool is started after gunicorn forks
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        with self._slots:
+            return self._executor().submit(fn, *args).result()
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, hashed_password: str, plain_password: str) -> bool:
+        return self._run(check_password_hash, hashed_password, plain_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return hashed_password.split("$", 1)[0] != self.method
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,213 @@
+import hashlib
+import threading
+from urllib.parse import urlencode
+
+from flask import current_app, request
+from werkzeug.http import http_date
+
+from app.utils.cache import TTLCache
+
+try:
+    import redis
+    import redis.asyncio
+except ImportError:  # only needed for redis:// cache URLs
+    redis = None
+
+
+# -------- BACKENDS -------- #
+
+class LRUBackend:
+    """
+    Per-process backend. Version counters only see this process's writes,
+    so with several workers an entry can outlive a write made elsewhere by
+    up to RESPONSE_CACHE_TTL. Counters live outside the LRU so they are
+    never evicted.
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        self._values = TTLCache(maxsize=maxsize)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._values.get(key)
+
+    def set(self, key, value: bytes, ttl: float):
+        self._values.set(key, value, ttl)
+
+    def version(self, name) -> int:
+        return self._versions.get(name, 0)
+
+    def bump(self, name):
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+    # Awaited by the async handlers (app/asgi.py); memory reads never block
+    async def aget(self, key):
+        return self.get(key)
+
+    async def aset(self, key, value: bytes, ttl: float):
+        self.set(key, value, ttl)
+
+    async def aversion(self, name) -> int:
+        return self.version(name)
+
+    async def aclose(self):
+        pass
+
+
+class RedisBackend:
+    """
+    Shared backend for multi-process deployments (any Redis-protocol server).
+    The a* methods use a separate redis.asyncio client so the async handlers
+    never block the event loop on a round trip.
+    """
+
+    PREFIX = "kazilink:http:"
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("redis package is required for a redis:// RESPONSE_CACHE_URL")
+        self._url = url
+        self._client = redis.Redis.from_url(url)
+        self._async_client = None
+
+    def get(self, key):
+        return self._client.get(self.PREFIX + key)
+
+    def set(self, key, value: bytes, ttl: float):
+        self._client.set(self.PREFIX + key, value, ex=max(1, int(ttl)))
+
+    def version(self, name) -> int:
+        return int(self._client.get(self.PREFIX + "v:" + name) or 0)
+
+    def bump(self, name):
+        self._client.incr(self.PREFIX + "v:" + name)
+
+    @property
+    def _aclient(self):
+        # Created on first use, so it binds to the ASGI server's event loop
+        if self._async_client is None:
+            self._async_client = redis.asyncio.Redis.from_url(self._url)
+        return self._async_client
+
+    async def aget(self, key):
+        return await self._aclient.get(self.PREFIX + key)
+
+    async def aset(self, key, value: bytes, ttl: float):
+        await self._aclient.set(self.PREFIX + key, value, ex=max(1, int(ttl)))
+
+    async def aversion(self, name) -> int:
+        return int(await self._aclient.get(self.PREFIX + "v:" + name) or 0)
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+def make_backend(url: str, maxsize: int):
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    if url.startswith("memory://"):
+        return LRUBackend(maxsize)
+    raise ValueError(f"Unsupported RESPONSE_CACHE_URL: {url}")
+
+
+def init_response_cache(app):
+    app.extensions["response_cache"] = make_backend(
+        app.config["RESPONSE_CACHE_URL"], app.config["RESPONSE_CACHE_MAX_ENTRIES"])
+
+
+def get_response_cache():
+    return current_app.extensions["response_cache"]
+
+
+# -------- CONDITIONAL, CACHED RESPONSES -------- #
+
+def canonical_query(items) -> str:
+    """Order-independent query string, so equivalent URLs share an entry."""
+    return urlencode(sorted(items))
+
+
+def make_etag(body: bytes) -> str:
+    """ETag of a response body; equal bodies get equal ETags in every process."""
+    return hashlib.blake2b(body, digest_size=10).hexdigest()
+
+
+def pack_entry(last_modified, etag: str, body: bytes) -> bytes:
+    return f"{last_modified or ''}\n{etag}\n".encode() + body
+
+
+def unpack_entry(value: bytes):
+    """(last_modified or None, etag, body) of a stored entry."""
+    last_modified, etag, body = value.split(b"\n", 2)
+    return last_modified.decode() or None, etag.decode(), body
+
+
+def cached_json(key: str, build):
+    """
+    Serve a public JSON read with ETag revalidation and a shared cache.
+
+    `key` must change whenever the underlying data changes (it embeds
+    version counters). The ETag is a hash of the body, stored with it, so
+    If-None-Match is answered with 304 only when the body this process
+    would send is the one the client already has; a cached entry answers
+    without touching the database. Otherwise build() is called; it returns
+    (response, status, last_modified datetime or None) and only 200
+    responses are stored. If-Modified-Since is honoured when build()
+    gives a last_modified; lists should give None, since rows leaving a
+    list can move its newest timestamp back.
+    """
+    cache = get_response_cache()
+    key = f"{key}?{canonical_query(request.args.items(multi=True))}"
+    response_class = current_app.response_class
+
+    cached = cache.get(key)
+    if cached is not None:
+        last_modified, etag, body = unpack_entry(cached)
+        response = response_class(body, mimetype="application/json")
+    else:
+        response, status, modified = build()
+        response.status_code = status
+        if status != 200:
+            return response
+        body = response.get_data()
+        etag = make_etag(body)
+        last_modified = http_date(modified) if modified else None
+        cache.set(key, pack_entry(last_modified, etag, body),
+                  current_app.config["RESPONSE_CACHE_TTL"])
+    if last_modified:
+        response.headers["Last-Modified"] = last_modified
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = \
+        f"public, max-age={current_app.config['RESPONSE_CACHE_MAX_AGE']}, must-revalidate"
+    # 304 on a matching If-None-Match (or If-Modified-Since)
+    return response.make_conditional(request)
+
+
+# -------- JOB KEYS & INVALIDATION -------- #
+
+def job_feed_key() -> str:
+    return f"jobs:feed:v{get_response_cache().version('jobs:feed')}"
+
+
+async def ajob_feed_key(cache) -> str:
+    """job_feed_key() for the async handlers."""
+    return f"jobs:feed:v{await cache.aversion('jobs:feed')}"
+
+
+def job_item_key(job_id: int) -> str:
+    return f"jobs:item:{job_id}:v{get_response_cache().version(f'jobs:item:{job_id}')}"
+
+
+def invalidate_jobs(*job_ids):
+    """
+    Call after committing job writes. Bumps the version of each changed
+    job and of the feed, since any page may now list different jobs.
+    """
+    cache = get_response_cache()
+    for job_id in job_ids:
+        cache.bump(f"jobs:item:{job_id}")
+    cache.bump("jobs:feed")
@@ -0,0 +1,52 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes with orjson when it is installed.
+
+    Output matches the default provider: keys are sorted, datetimes go
+    through the same `default` hook, and debug responses are indented.
+    Anything orjson rejects (e.g. integers above 64 bits) falls back to the
+    stdlib encoder.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.fast = orjson is not None
+
+    def _options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _encode(self, obj, indent=False) -> bytes:
+        return orjson.dumps(obj, default=self.default, option=self._options(indent))
+
+    def dumps(self, obj, **kwargs) -> str:
+        if self.fast and set(kwargs) <= {"indent", "separators"}:
+            try:
+                return self._encode(obj, bool(kwargs.get("indent"))).decode()
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if not self.fast:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = self._encode(obj, indent)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        # Bytes go straight to the response; no str round trip
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,201 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+from app.utils.querycount import track_request_queries
+
+# Record attributes set by LogRecord itself; anything else came from extra=
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+# -------- FORMATTING -------- #
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any extras."""
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+JSONFormatter.converter = time.gmtime
+
+
+# -------- HANDLERS / FILTERS -------- #
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never waits: when the queue is full the record is
+    dropped and counted instead of blocking the request thread.
+    """
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Render the message and traceback here, while args and exc_info are
+        # still valid, but leave JSON encoding to the listener thread
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps request id, method and route on records logged during a request."""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get("request_id")
+            record.method = request.method
+            record.route = request.url_rule.rule if request.url_rule else request.path
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of records at or below INFO; warnings and up always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.INFO or random.random() < self.rate
+
+
+# -------- REQUEST HOOKS -------- #
+
+
+# Listener behind the handlers currently on the process-wide loggers. Each
+# init_logging() replaces those handlers and stops the listener it displaced.
+_listener = None
+
+
+def _stop_listener(listener):
+    # Flush what is queued, then close the destination's file
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+@atexit.register
+def _stop_current_listener():
+    if _listener is not None:
+        _stop_listener(_listener)
+
+
+def _destination(app):
+    path = app.config.get("LOG_FILE")
+    if app.debug or not path:
+        return logging.StreamHandler(sys.stderr)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Rotate externally (logrotate): several workers rotating one file in
+    # process corrupts it, and WatchedFileHandler reopens after a rotation
+    return WatchedFileHandler(path)
+
+
+def init_logging(app, db):
+    """
+    Route app and service logs through a queue to a single listener thread
+    that formats JSON and writes to LOG_FILE (stderr in debug). Request
+    threads only enqueue. Each request gets an X-Request-ID and an access
+    record with route, status, latency and DB query count; 2xx/3xx access
+    records are kept at LOG_ACCESS_SAMPLE_RATE, slow and failed ones always.
+    """
+    log_queue = queue.Queue(maxsize=app.config["LOG_QUEUE_SIZE"])
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(RequestContextFilter())
+
+    destination = _destination(app)
+    destination.setFormatter(JSONFormatter())
+    listener = QueueListener(log_queue, destination, respect_handler_level=True)
+    listener.start()
+    app.extensions["log_listener"] = listener
+    app.extensions["log_handler"] = handler
+
+    level = app.config["LOG_LEVEL"]
+    app.logger.removeHandler(default_handler)
+    access = logging.getLogger(f"{app.logger.name}.access")
+    # Loggers are process-wide; replace what an earlier create_app() attached
+    for logger in (app.logger, logging.getLogger("services"), access):
+        for old in logger.handlers + logger.filters:
+            if isinstance(old, (NonBlockingQueueHandler, SamplingFilter)):
+                logger.removeHandler(old)
+                logger.removeFilter(old)
+    for logger in (app.logger, logging.getLogger("services")):
+        logger.setLevel(level)
+        logger.addHandler(handler)
+    access.addFilter(SamplingFilter(app.config["LOG_ACCESS_SAMPLE_RATE"]))
+
+    # Nothing enqueues to the displaced handler any more: drain and stop it
+    global _listener
+    previous, _listener = _listener, listener
+    if previous is not None:
+        _stop_listener(previous)
+
+    slow_ms = app.config["LOG_SLOW_REQUEST_MS"]
+
+    with app.app_context():
+        for engine in db.engines.values():
+            track_request_queries(engine)
+
+    @app.before_request
+    def start_request():
+        g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        g.request_start = time.perf_counter()
+        g.db_queries, g.sql_seconds = 0, 0.0
+
+    @app.after_request
+    def log_request(response):
+        start = g.get("request_start")
+        if start is None:
+            return response
+        latency_ms = (time.perf_counter() - start) * 1000
+        response.headers["X-Request-ID"] = g.request_id
+        level = logging.INFO
+        if response.status_code >= 500 or latency_ms >= slow_ms:
+            level = logging.WARNING
+        if access.isEnabledFor(level):
+            access.log(level, "%s %s %s", request.method, request.path, response.status_code,
+                       extra={
+                           "status": response.status_code,
+                           "latency_ms": round(latency_ms, 2),
+                           "db_queries": g.get("db_queries", 0),
+                           "bytes": response.calculate_content_length(),
+                       })
+        return response
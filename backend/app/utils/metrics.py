@@ -0,0 +1,201 @@
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+from flask import current_app, g, has_request_context, jsonify, request
+from app.utils.db_tuning import pool_stats
+from app.utils.json import FastJSONProvider
+from app.utils.querycount import track_request_queries
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+
+
+# -------- REGISTRY -------- #
+
+
+class Histogram:
+    """Prometheus-style histogram keyed by a fixed tuple of label values."""
+
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, values: tuple, amount: float):
+        index = bisect_left(self.buckets, amount)
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                # Per-bucket counts (+Inf last), sum
+                series = self._series[values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = [(values, list(counts), total)
+                        for values, (counts, total) in self._series.items()]
+        for values, counts, total in sorted(snapshot):
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            yield f"{self.name}_sum{{{labels}}} {total}"
+            yield f"{self.name}_count{{{labels}}} {cumulative}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _gauge(name, help, samples):
+    yield f"# HELP {name} {help}"
+    yield f"# TYPE {name} gauge"
+    for labels, value in samples:
+        rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        yield f"{name}{{{rendered}}} {value}"
+
+
+class Metrics:
+    """Per-process request metrics, rendered by GET /metrics."""
+
+    def __init__(self, slow_samples: int):
+        self.request_latency = Histogram(
+            "http_request_duration_seconds", "Request latency.",
+            ("method", "route", "status"), LATENCY_BUCKETS)
+        self.response_size = Histogram(
+            "http_response_size_bytes", "Response body size.", ("route",), SIZE_BUCKETS)
+        self.sql_queries = Histogram(
+            "db_queries_per_request", "SQL statements per request.", ("route",), COUNT_BUCKETS)
+        self.sql_duration = Histogram(
+            "db_query_duration_seconds", "Time spent in SQL per request.",
+            ("route",), LATENCY_BUCKETS)
+        self.serialize_duration = Histogram(
+            "json_serialize_duration_seconds", "Time spent encoding JSON per request.",
+            ("route",), LATENCY_BUCKETS)
+        self.histograms = (self.request_latency, self.response_size, self.sql_queries,
+                           self.sql_duration, self.serialize_duration)
+        self.slow_requests = deque(maxlen=slow_samples)
+
+    def render(self, engines, dropped_logs: int = 0) -> str:
+        lines = []
+        for histogram in self.histograms:
+            lines.extend(histogram.render())
+        pools = [(name or "default", pool_stats(engine)) for name, engine in engines.items()]
+        for key, help in (("checked_out", "Connections in use."),
+                          ("overflow", "Connections above pool_size."),
+                          ("timeouts", "Pool checkouts that timed out.")):
+            lines.extend(_gauge(f"db_pool_{key}", help,
+                                [({"engine": name}, stats[key])
+                                 for name, stats in pools if key in stats]))
+        lines.extend(_gauge("log_records_dropped", "Log records dropped on a full queue.",
+                            [({}, dropped_logs)]))
+        return "\n".join(lines) + "\n"
+
+
+# -------- HOOKS -------- #
+
+
+class TimedJSONProvider(FastJSONProvider):
+    """FastJSONProvider that adds encode time to g.serialize_seconds."""
+
+    def response(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            if has_request_context():
+                g.serialize_seconds = g.get("serialize_seconds", 0.0) + time.perf_counter() - start
+
+
+def _authorized() -> bool:
+    token = current_app.config.get("METRICS_TOKEN")
+    if not token:
+        return True
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    return hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def init_metrics(app, db):
+    """
+    With METRICS_ENABLED, time every request and expose the results at
+    GET /metrics in Prometheus text format. When METRICS_TOKEN is set,
+    requests slower than METRICS_SLOW_REQUEST_MS also keep their SQL and
+    are listed at GET /metrics/slow; both endpoints then require
+    "Authorization: Bearer <METRICS_TOKEN>". The slow list holds full
+    paths and SQL text, so it is never served without the token. When
+    disabled nothing is registered, so requests pay nothing. Metrics are
+    per process: scrape every worker.
+    """
+    if not app.config["METRICS_ENABLED"]:
+        return
+    registry = Metrics(app.config["METRICS_SLOW_SAMPLES"])
+    app.extensions["metrics"] = registry
+    app.json = TimedJSONProvider(app)
+    slow_seconds = app.config["METRICS_SLOW_REQUEST_MS"] / 1000
+    keep_slow = bool(app.config.get("METRICS_TOKEN"))
+
+    # The same SQL listeners as the access log (app/utils/log.py)
+    with app.app_context():
+        for engine in db.engines.values():
+            track_request_queries(engine)
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+        # g is shared by requests made under one pushed app context
+        g.db_queries, g.sql_seconds, g.serialize_seconds = 0, 0.0, 0.0
+        g.sql_statements = [] if keep_slow else None
+
+    @app.after_request
+    def record(response):
+        start = g.get("metrics_start")
+        if start is None or request.endpoint in ("prometheus_metrics", "slow_requests"):
+            return response
+        elapsed = time.perf_counter() - start
+        # The rule, not the path, keeps label cardinality bounded
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        registry.request_latency.observe((request.method, route, str(response.status_code)), elapsed)
+        size = response.calculate_content_length()
+        if size is not None:
+            registry.response_size.observe((route,), size)
+        registry.sql_queries.observe((route,), g.get("db_queries", 0))
+        registry.sql_duration.observe((route,), g.get("sql_seconds", 0.0))
+        registry.serialize_duration.observe((route,), g.get("serialize_seconds", 0.0))
+        if keep_slow and elapsed >= slow_seconds:
+            registry.slow_requests.append({
+                "at": time.time(),
+                "method": request.method,
+                "path": request.full_path.rstrip("?"),
+                "status": response.status_code,
+                "duration_ms": round(elapsed * 1000, 2),
+                "sql": [{"statement": s, "duration_ms": round(d * 1000, 3)}
+                        for s, d in g.get("sql_statements") or ()],
+            })
+        return response
+
+    @app.get("/metrics")
+    def prometheus_metrics():
+        if not _authorized():
+            return jsonify({"error": "Invalid or missing metrics token"}), 401
+        handler = current_app.extensions.get("log_handler")
+        body = registry.render(
+            db.engines, getattr(handler, "dropped", 0))
+        return body, 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+    if keep_slow:
+        @app.get("/metrics/slow")
+        def slow_requests():
+            if not _authorized():
+                return jsonify({"error": "Invalid or missing metrics token"}), 401
+            return jsonify(list(registry.slow_requests))
@@ -0,0 +1,95 @@
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context
+from sqlalchemy import event
+
+from app.extensions import db
+
+
+class QueryCounter:
+    """Counts SQL statements sent to an engine while active."""
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+        self.parameters = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+
+@contextmanager
+def count_queries(engine=None):
+    """
+    Usage:
+        with count_queries() as counter:
+            client.get("/api/jobs/")
+        print(counter.count)
+    """
+    engine = engine or db.engine
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter._on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter._on_execute)
+
+
+def assert_constant_queries(call, seed, sizes=(1, 5, 25), engine=None):
+    """
+    Fail if the number of queries issued by call() grows with result size.
+
+    For each size, seed(size) must prepare data so call() returns that
+    many rows; call() is then run and its statements counted. Counts must
+    be identical across sizes, which catches N+1 lazy loads.
+    """
+    counts = {}
+    last = None
+    for size in sizes:
+        seed(size)
+        with count_queries(engine) as counter:
+            call()
+        counts[size] = counter.count
+        if last is not None and counter.count != counts[last]:
+            raise AssertionError(
+                f"Query count grows with result size: {counts}\n"
+                + "\n".join(counter.statements))
+        last = size
+    return counts
+
+
+# -------- PER-REQUEST TRACKING -------- #
+
+
+def _before_cursor(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info["request_query_start"] = time.perf_counter()
+
+
+def _after_cursor(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop("request_query_start", None)
+    if start is None or not has_request_context():
+        return
+    elapsed = time.perf_counter() - start
+    g.db_queries = g.get("db_queries", 0) + 1
+    g.sql_seconds = g.get("sql_seconds", 0.0) + elapsed
+    # A list only while something wants the statements (metrics' slow log)
+    statements = g.get("sql_statements")
+    if statements is not None:
+        statements.append((statement, elapsed))
+
+
+def track_request_queries(engine):
+    """
+    Count and time the statements each request sends to `engine` in
+    g.db_queries and g.sql_seconds, and append (statement, seconds) to
+    g.sql_statements when a before_request hook has set it to a list. The
+    access log and the metrics share this one pair of listeners;
+    installing it twice is a no-op.
+    """
+    if not event.contains(engine, "after_cursor_execute", _after_cursor):
+        event.listen(engine, "before_cursor_execute", _before_cursor)
+        event.listen(engine, "after_cursor_execute", _after_cursor)
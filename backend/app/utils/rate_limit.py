@@ -0,0 +1,240 @@
+import os
+import sqlite3
+import threading
+import time
+from math import floor
+from urllib.parse import urlparse
+
+from flask import jsonify
+from flask_limiter.util import get_remote_address
+from limits.storage import MovingWindowSupport, SlidingWindowCounterSupport, Storage
+from limits.storage.base import TimestampedSlidingWindow
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+# -------- KEYS -------- #
+
+
+def rate_limit_key() -> str:
+    """
+    Bucket for the current request: the JWT subject when a valid access
+    token is present, otherwise the client IP. Behind a proxy set
+    PROXY_FIX_X_FOR so the IP is the client's, not the proxy's.
+
+    Invalid tokens fall back to the IP so a forged subject cannot open a
+    fresh bucket. The decoded token is reused by login_required.
+    """
+    from app.utils.security import request_payload
+    payload = request_payload()
+    if payload:
+        return f"user:{payload['sub']}"
+    return f"ip:{get_remote_address()}"
+
+
+# -------- SQLITE STORAGE -------- #
+
+
+class SQLiteStorage(Storage, MovingWindowSupport, SlidingWindowCounterSupport,
+                    TimestampedSlidingWindow):
+    """
+    Rate limit counters in a SQLite file, shared by every worker process on
+    the host. Put the file on tmpfs (/dev/shm) to keep it off the disk:
+
+        RATELIMIT_STORAGE_URI=sqlite:////dev/shm/mboka-ratelimit.db
+
+    Each hit is one short write transaction. Supports the fixed-window,
+    sliding-window-counter and moving-window strategies.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+    PURGE_EVERY = 1000
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        # sqlite:////abs/path -> /abs/path, sqlite:///rel/path -> rel/path
+        self.path = urlparse(uri).path[1:]
+        self.timeout = float(options.get("timeout", 5))
+        self._local = threading.local()
+        self._writes = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        with self._tx() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                "key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "key TEXT NOT NULL, at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_events_key_at ON events (key, at)")
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread and per process (gunicorn forks after import)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _tx(self):
+        return _Transaction(self._conn())
+
+    def _maybe_purge(self, conn, now):
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM counters WHERE expires_at <= ?", (now,))
+
+    # ---- fixed window ---- #
+
+    def _incr(self, conn, key, expiry, amount, now):
+        return conn.execute(
+            "INSERT INTO counters (key, count, expires_at) VALUES (?1, ?2, ?3) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "count = CASE WHEN expires_at <= ?4 THEN ?2 ELSE count + ?2 END, "
+            "expires_at = CASE WHEN expires_at <= ?4 THEN ?3 ELSE expires_at END "
+            "RETURNING count",
+            (key, amount, now + expiry, now),
+        ).fetchone()[0]
+
+    def _get(self, conn, key, now):
+        row = conn.execute(
+            "SELECT count FROM counters WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._tx() as conn:
+            self._maybe_purge(conn, now)
+            return self._incr(conn, key, expiry, amount, now)
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        with self._tx() as conn:
+            row = conn.execute(
+                "UPDATE counters SET count = MAX(count - ?, 0) WHERE key = ? RETURNING count",
+                (amount, key),
+            ).fetchone()
+            return row[0] if row else 0
+
+    def get(self, key: str) -> int:
+        return self._get(self._conn(), key, time.time())
+
+    def get_expiry(self, key: str) -> float:
+        row = self._conn().execute(
+            "SELECT expires_at FROM counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else time.time()
+
+    def clear(self, key: str) -> None:
+        with self._tx() as conn:
+            conn.execute("DELETE FROM counters WHERE key = ?", (key,))
+            conn.execute("DELETE FROM events WHERE key = ?", (key,))
+
+    def check(self) -> bool:
+        try:
+            self._conn().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        with self._tx() as conn:
+            removed = conn.execute("DELETE FROM counters").rowcount
+            removed += conn.execute("DELETE FROM events").rowcount
+        return removed
+
+    # ---- sliding window counter ---- #
+
+    def _window(self, conn, key, expiry, now):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self._get(conn, previous_key, now)
+        current_count = self._get(conn, current_key, now)
+        previous_ttl = (
+            (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0)
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl, current_key
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int,
+                                     amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front, so the read and the
+        # increment cannot interleave with another worker's hit
+        with self._tx() as conn:
+            previous, previous_ttl, current, _, current_key = self._window(
+                conn, key, expiry, now)
+            if floor(previous * previous_ttl / expiry + current) + amount > limit:
+                return False
+            self._maybe_purge(conn, now)
+            self._incr(conn, current_key, 2 * expiry, amount, now)
+            return True
+
+    def get_sliding_window(self, key: str, expiry: int):
+        return self._window(self._conn(), key, expiry, time.time())[:4]
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
+
+    # ---- moving window ---- #
+
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        with self._tx() as conn:
+            conn.execute("DELETE FROM events WHERE key = ? AND at <= ?", (key, now - expiry))
+            count = conn.execute(
+                "SELECT COUNT(*) FROM events WHERE key = ?", (key,)).fetchone()[0]
+            if count + amount > limit:
+                return False
+            conn.executemany("INSERT INTO events (key, at) VALUES (?, ?)",
+                             [(key, now)] * amount)
+            return True
+
+    def get_moving_window(self, key: str, limit: int, expiry: int):
+        now = time.time()
+        oldest, count = self._conn().execute(
+            "SELECT MIN(at), COUNT(*) FROM events WHERE key = ? AND at > ?",
+            (key, now - expiry),
+        ).fetchone()
+        return (oldest, count) if count else (now, 0)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK on an autocommit connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# -------- SETUP -------- #
+
+
+def init_rate_limiting(app, limiter):
+    """
+    Wire the limiter into the app. Storage and algorithm come from
+    RATELIMIT_STORAGE_URI and RATELIMIT_STRATEGY; per-route limits from
+    RATELIMIT_LOGIN / RATELIMIT_REGISTER / RATELIMIT_APPLY.
+    """
+    hops = app.config.get("PROXY_FIX_X_FOR", 0)
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
+    limiter.init_app(app)
+
+    @app.errorhandler(429)
+    def rate_limited(e):
+        return jsonify({"error": f"Rate limit exceeded: {e.description}"}), 429
@@ -1,39 +1,72 @@
 import datetime
 import jwt
-from flask import current_app, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import current_app, has_app_context, request, jsonify
 from functools import wraps
+from sqlalchemy import event
+from app.extensions import db
 from app.models.user import User
+from app.utils.cache import TTLCache
+from app.utils.hashing import PasswordHasher
 
 # -------- PASSWORD SECURITY -------- #
 
 
+_default_hasher = PasswordHasher()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """The hasher configured for the current app (see init_password_hasher)."""
+    if not has_app_context():
+        return _default_hasher
+    return current_app.extensions.get("password_hasher", _default_hasher)
+
+
+def init_password_hasher(app):
+    app.extensions["password_hasher"] = PasswordHasher(
+        method=app.config["PASSWORD_HASH_METHOD"],
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+    )
+
+
 def hash_password(password: str) -> str:
-    """Hash plain password using Werkzeug."""
-    return generate_password_hash(password)
+    """Hash plain password with the configured KDF parameters."""
+    return get_password_hasher().hash(password)
 
 
 def verify_password(hashed_password: str, plain_password: str) -> bool:
     """Compare stored hash with user input."""
-    return check_password_hash(hashed_password, plain_password)
+    return get_password_hasher().verify(hashed_password, plain_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was written with different parameters than configured."""
+    return get_password_hasher().needs_rehash(hashed_password)
 
 
 # -------- JWT GENERATION -------- #
 
-def create_access_token(user_id: int) -> str:
-    """Create a short-lived JWT (access token)."""
+def create_access_token(user_id: int, role: str = None, username: str = None) -> str:
+    """
+    Create a short-lived JWT (access token).
+    role/username are embedded as claims so authenticated requests can be
+    served without loading the user row.
+    """
     payload = {
-        "sub": user_id,
+        "sub": str(user_id),
         "exp": datetime.datetime.utcnow() + datetime.timedelta(minutes=30),
         "type": "access"
     }
+    if role is not None:
+        payload["role"] = role
+    if username is not None:
+        payload["username"] = username
     return jwt.encode(payload, current_app.config["SECRET_KEY"], algorithm="HS256")
 
 
 def create_refresh_token(user_id: int) -> str:
     """Create a long-lived JWT (refresh token)."""
     payload = {
-        "sub": user_id,
+        "sub": str(user_id),
         "exp": datetime.datetime.utcnow() + datetime.timedelta(days=7),
         "type": "refresh"
     }
@@ -45,31 +78,170 @@ def decode_token(token: str):
     return jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=["HS256"])
 
 
+# -------- AUTHENTICATED PRINCIPAL -------- #
+
+class AuthError(Exception):
+    """Authentication failure with the status and message to answer with."""
+
+    def __init__(self, message: str, status: int = 401):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+# Column snapshots of recently seen users, keyed by id. Entries are dropped
+# whenever a User row is updated or deleted in this process; the TTL bounds
+# staleness for changes made by other processes.
+user_cache = TTLCache(ttl=60.0, maxsize=10000)
+
+_USER_FIELDS = tuple(c.key for c in User.__table__.columns if c.key != "password_hash")
+
+
+def get_user_snapshot(user_id: int):
+    """Return a dict of the user's columns, served from cache when possible."""
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = {f: getattr(user, f) for f in _USER_FIELDS}
+        user_cache.set(user_id, snapshot, current_app.config.get("AUTH_USER_CACHE_TTL"))
+    return snapshot
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user_cache(mapper, connection, target):
+    user_cache.pop(target.id)
+
+
+class Principal:
+    """
+    Authenticated caller built from access-token claims.
+
+    `id`, `role` and `username` come straight from the token. Any other
+    user field (e.g. `email`) is read from the cached user snapshot on first
+    access, and `.user` returns the session-bound ORM User for handlers that
+    need to modify it.
+    """
+
+    def __init__(self, user_id: int, claims: dict = None):
+        self.id = user_id
+        self._claims = claims or {}
+        self._snapshot = None
+
+    def __getattr__(self, name):
+        # Only called for attributes not set in __init__
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self._claims:
+            return self._claims[name]
+        if self._snapshot is None:
+            self._snapshot = get_user_snapshot(self.id)
+            if self._snapshot is None:
+                # Deleted after the token was issued; answered like
+                # login_required does with AUTH_STATELESS off
+                raise AuthError("User not found", 404)
+        try:
+            return self._snapshot[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @property
+    def user(self):
+        user = db.session.get(User, self.id)
+        if user is None:
+            raise AuthError("User not found", 404)
+        return user
+
+    def __repr__(self):
+        return f"<Principal {self.id}>"
+
+
+def principal_from_payload(payload: dict) -> Principal:
+    claims = {k: payload[k] for k in ("role", "username") if k in payload}
+    return Principal(int(payload["sub"]), claims)
+
+
 # -------- LOGIN REQUIRED DECORATOR -------- #
 
+def request_token():
+    """Access token from the Authorization header (Bearer) or the access_token cookie."""
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        return auth_header.split(" ", 1)[1]
+    return request.cookies.get("access_token")
+
+
+def request_payload():
+    """
+    Payload of the request's access token, or None when it is missing,
+    invalid, expired or not an access token. Decoded once per request and
+    shared by the rate limiter key and login_required.
+    """
+    # Cached in the WSGI environ rather than g: g outlives the request when
+    # an app context is already pushed (CLI commands, scripts, tests)
+    if "mboka.jwt_payload" not in request.environ:
+        payload = None
+        token = request_token()
+        if token:
+            try:
+                payload = decode_token(token)
+            except jwt.InvalidTokenError:
+                payload = None
+            if payload and payload.get("type") != "access":
+                payload = None
+        request.environ["mboka.jwt_payload"] = payload
+    return request.environ["mboka.jwt_payload"]
+
+
+def authenticated_payload() -> dict:
+    """
+    Payload of the request's access token. Raises AuthError when the token
+    is missing or invalid. Shared by login_required and the async handlers
+    (app/asgi.py).
+    """
+    if not request_token():
+        raise AuthError("Authentication required. Provide 'Authorization: Bearer <token>' header or 'access_token' cookie.")
+    payload = request_payload()
+    if payload is None:
+        raise AuthError("Invalid or expired token")
+    return payload
+
+
 def login_required(f):
     """
     Protect routes requiring authentication.
     Passes current_user to the route if token is valid.
+
+    With AUTH_STATELESS enabled (the default) current_user is a Principal
+    built from the token, so no query is issued unless the handler reads a
+    field the token does not carry. A user deleted after the token was
+    issued keeps access until the token expires, except that reading such
+    a field answers 404 (see init_auth). Disable it to load and verify the
+    User row on every request.
     """
     @wraps(f)
     def decorated(*args, **kwargs):
-        # Accept token either from Authorization header (Bearer) or from cookies
-        token = None
-        auth_header = request.headers.get("Authorization", "")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ", 1)[1]
-        else:
-            token = request.cookies.get("access_token")
-
-        if not token:
-            return jsonify({"error": "Authentication required. Provide 'Authorization: Bearer <token>' header or 'access_token' cookie."}), 401
         try:
-            payload = decode_token(token)
-            user = User.query.get(payload["sub"])
-            if not user:
-                return jsonify({"error": "User not found"}), 404
+            payload = authenticated_payload()
+        except AuthError as e:
+            return jsonify({"error": e.message}), e.status
+        try:
+            if current_app.config.get("AUTH_STATELESS", True):
+                user = principal_from_payload(payload)
+            else:
+                user = db.session.get(User, int(payload["sub"]))
+                if not user:
+                    return jsonify({"error": "User not found"}), 404
         except Exception:
             return jsonify({"error": "Invalid or expired token"}), 401
         return f(user, *args, **kwargs)
     return decorated
+
+
+def init_auth(app):
+    """Answer an AuthError raised inside a handler (e.g. by Principal) as JSON."""
+    @app.errorhandler(AuthError)
+    def auth_error(e):
+        return jsonify({"error": e.message}), e.status
@@ -0,0 +1,40 @@
+import re
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Words too common in job posts to carry any signal
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have i in is it my need needed of on or
+our please the to we with you your
+""".split())
+
+
+def tokenize(text: str) -> list:
+    """Lower-case alphanumeric tokens, minus stopwords."""
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def parse_skills(value) -> list:
+    """
+    Normalise WorkerProfile.skills (comma separated text, or a list from
+    the API) into a de-duplicated list of lower-case skills.
+    """
+    if not value:
+        return []
+    items = value if isinstance(value, (list, tuple)) else value.split(",")
+    seen = []
+    for item in items:
+        skill = " ".join(str(item).lower().split())
+        if skill and skill not in seen:
+            seen.append(skill)
+    return seen
+
+
+def skill_tokens(value) -> set:
+    """Flat token set of all skills, so "house painting" also matches "painting"."""
+    tokens = set()
+    for skill in parse_skills(value):
+        tokens.update(tokenize(skill))
+    return tokens
@@ -0,0 +1,4 @@
+from app.asgi import create_asgi_app
+
+# ASGI entry point (e.g. `uvicorn asgi:app`); runs alongside wsgi.py
+app = create_asgi_app()
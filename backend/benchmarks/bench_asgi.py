@@ -0,0 +1,127 @@
+"""
+WSGI vs ASGI job feed under a slow downstream call.
+
+Each request to GET /api/jobs/ first waits --latency-ms (standing in for
+an AI service or slow database), then serves the feed. WSGI requests run
+on a fixed thread pool, as under gunicorn's gthread worker. ASGI requests
+run as coroutines on one event loop through the async handlers in
+app/asgi.py. Needs httpx (requirements-dev.txt) for the in-process ASGI client.
+
+    python -m benchmarks.bench_asgi
+    python -m benchmarks.bench_asgi --concurrency 16 128 --latency-ms 100
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_asgi.db")
+os.environ.setdefault("SCORING_MODE", "off")
+
+import httpx  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.asgi import AsyncAPI, get_all_jobs  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.job import Job  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def seed(app, n):
+    with app.app_context():
+        db.create_all()
+        if db.session.query(Job.id).first():
+            return
+        client = User(username="bench", email="bench@example.com",
+                      password_hash="x", role="client")
+        db.session.add(client)
+        db.session.flush()
+        start = datetime(2025, 1, 1)
+        db.session.execute(db.insert(Job), [{
+            "title": f"Job {i}", "description": "Fix a leaking tap",
+            "price": 1000.0 + i, "location_lat": -1.28 + (i % 100) * 1e-3,
+            "location_lng": 36.82, "created_at": start + timedelta(seconds=i),
+            "updated_at": start + timedelta(seconds=i), "client_id": client.id,
+            "status": "open",
+        } for i in range(n)])
+        db.session.commit()
+
+
+def summarize(name, concurrency, latencies, elapsed):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<5} c={concurrency:<4} {len(latencies) / elapsed:8.1f} req/s | "
+          f"p50 {statistics.median(latencies) * 1e3:7.1f} ms | p95 {p95 * 1e3:7.1f} ms")
+
+
+def run_wsgi(app, requests, concurrency, threads):
+    client = app.test_client()
+    workers = threading.BoundedSemaphore(threads)
+
+    def one(i):
+        # Clients beyond the thread count wait for a worker, as connections
+        # sit in the listen backlog; that wait counts toward latency.
+        start = time.perf_counter()
+        with workers:
+            assert client.get(f"/api/jobs/?per_page=20&n={i}").status_code == 200
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    summarize("wsgi", concurrency, latencies, time.perf_counter() - start)
+
+
+async def run_asgi(api, requests, concurrency):
+    transport = httpx.ASGITransport(app=api)
+    limit = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            async with limit:
+                start = time.perf_counter()
+                r = await client.get(f"/api/jobs/?per_page=20&n={i}")
+                assert r.status_code == 200
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(one(i) for i in range(requests)))
+    summarize("asgi", concurrency, latencies, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 64, 256])
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--threads", type=int, default=8,
+                        help="WSGI worker threads (gunicorn --threads)")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jobs", type=int, default=5000)
+    args = parser.parse_args()
+    delay = args.latency_ms / 1000
+
+    wsgi_app = create_app()
+    seed(wsgi_app, args.jobs)
+    wsgi_app.before_request(lambda: time.sleep(delay))
+
+    async def slow_feed(api, request):
+        await asyncio.sleep(delay)
+        return await get_all_jobs(api, request)
+
+    api = AsyncAPI(create_app())
+    api.route("GET", "/api/jobs/")(slow_feed)
+
+    print(f"{args.requests} requests, {args.latency_ms:.0f} ms simulated downstream, "
+          f"{args.threads} WSGI threads")
+    for concurrency in args.concurrency:
+        run_wsgi(wsgi_app, args.requests, concurrency, args.threads)
+        asyncio.run(run_asgi(api, args.requests, concurrency))
+    asyncio.run(api.aclose())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Nearby-worker distance benchmark.
+
+Compares the original per-row Python loop from workers_nearby against the
+vectorized GeoIndex at several population sizes.
+
+    python -m benchmarks.bench_geo              # 10k, 100k, 1M workers
+    python -m benchmarks.bench_geo --sizes 10000 --queries 64
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.utils.geo import GeoIndex
+
+# Roughly the Nairobi metro area
+LAT_RANGE = (-1.45, -1.10)
+LNG_RANGE = (36.65, 37.10)
+RADIUS_KM = 3.0
+
+
+def make_workers(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(*LAT_RANGE, n)
+    lngs = rng.uniform(*LNG_RANGE, n)
+    return np.arange(1, n + 1), lats, lngs
+
+
+def legacy_loop(rows, lat, lng):
+    # Mirrors the pre-index workers_nearby implementation
+    results = []
+    for worker_id, w_lat, w_lng in rows:
+        dist = ((w_lat - lat)**2 + (w_lng - lng)**2) ** 0.5
+        if dist <= 0.05:
+            results.append((worker_id, dist))
+    return results
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(n, queries, repeat):
+    ids, lats, lngs = make_workers(n)
+    rows = list(zip(ids.tolist(), lats.tolist(), lngs.tolist()))
+    q_lats, q_lngs = make_workers(queries, seed=1)[1:]
+
+    start = time.perf_counter()
+    index = GeoIndex(ids, lats, lngs)
+    build = time.perf_counter() - start
+
+    loop = timed(lambda: legacy_loop(rows, q_lats[0], q_lngs[0]), repeat)
+    within = timed(lambda: index.within(q_lats[0], q_lngs[0], RADIUS_KM), repeat)
+    top_k = timed(lambda: index.nearest(q_lats[0], q_lngs[0], 20), repeat)
+    batch = timed(lambda: index.nearest_many(q_lats, q_lngs, 20), repeat)
+
+    print(f"{n:>9,} workers | build {build * 1e3:8.2f} ms | "
+          f"loop {loop * 1e3:9.2f} ms | within {within * 1e3:8.2f} ms | "
+          f"top-20 {top_k * 1e3:8.2f} ms | "
+          f"{queries} x top-20 {batch * 1e3 / queries:8.2f} ms/query | "
+          f"speedup {loop / within:6.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for n in args.sizes:
+        run(n, args.queries, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Offline geocoder benchmark.
+
+Reports the gazetteer load time, the cost of one lookup for exact,
+misspelt and prefix-only location strings with the LRU cache cold and
+warm, and the hit rate on a seeded mix of repeated strings.
+
+    python -m benchmarks.bench_geocoder
+    python -m benchmarks.bench_geocoder --lookups 200000
+"""
+import argparse
+import random
+import time
+
+from services.geocoder import Geocoder
+
+SAMPLES = {
+    "exact": ["Kilimani, Nairobi", "Nyali, Mombasa", "Milimani, Kisumu", "Thika Road Mall",
+              "Plot 12, South B", "Kitengela", "Near Sarit Centre, Westlands"],
+    "misspelt": ["Kilimanii", "Westland Nairobi", "Kasarni", "Embakazi", "kawangwre",
+                 "Kitengala, Kajiado"],
+    "prefix": ["Kenyatta Univ", "Kileles", "Syokim"],
+    "unknown": ["my house", "behind the shop", "xyz"],
+}
+
+
+def per_lookup(geocoder, strings, rounds, cached):
+    if cached:
+        for s in strings:
+            geocoder.geocode(s)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for s in strings:
+            if not cached:
+                geocoder.geocode.cache_clear()
+                geocoder._correct.cache_clear()
+            geocoder.geocode(s)
+    return (time.perf_counter() - start) / (rounds * len(strings)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--lookups", type=int, default=100000)
+    parser.add_argument("--distinct", type=int, default=2000,
+                        help="distinct strings in the mixed workload")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    geocoder = Geocoder.from_csv()
+    print(f"gazetteer loaded in {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({len(geocoder.places)} places)")
+
+    print("per lookup (µs)            cold     warm")
+    for label, strings in SAMPLES.items():
+        cold = per_lookup(geocoder, strings, args.rounds, cached=False)
+        warm = per_lookup(geocoder, strings, args.rounds * 10, cached=True)
+        print(f"  {label:<22} {cold:8.1f} {warm:8.2f}")
+
+    # Jobs repeat a small set of places with varying house numbers
+    rng = random.Random(42)
+    pool = [s for strings in SAMPLES.values() for s in strings]
+    distinct = [f"Plot {i}, {rng.choice(pool)}" for i in range(args.distinct)]
+    workload = rng.choices(distinct, weights=[1 / (i + 1) for i in range(len(distinct))],
+                           k=args.lookups)
+    geocoder = Geocoder.from_csv(cache_size=1024)
+    start = time.perf_counter()
+    for s in workload:
+        geocoder.geocode(s)
+    elapsed = time.perf_counter() - start
+    info = geocoder.geocode.cache_info()
+    print(f"mixed workload: {elapsed / len(workload) * 1e6:.2f} µs per lookup, "
+          f"{info.hits / (info.hits + info.misses):.0%} cache hits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Password hashing throughput benchmark.
+
+Reports single-core verifications/sec (≈ logins/sec per core) for each KDF
+setting, and aggregate throughput through PasswordHasher's process pool.
+
+    python -m benchmarks.bench_hashing
+    python -m benchmarks.bench_hashing --methods pbkdf2:sha256:600000 --workers 4
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.hashing import PasswordHasher
+
+DEFAULT_METHODS = [
+    "scrypt:16384:8:1",
+    "scrypt:32768:8:1",
+    "pbkdf2:sha256:600000",
+    "pbkdf2:sha256:1000000",
+]
+PASSWORD = "correct-horse-42"
+
+
+def per_core(method, seconds):
+    hasher = PasswordHasher(method)
+    hashed = hasher.hash(PASSWORD)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        hasher.verify(hashed, PASSWORD)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def pooled(method, workers, total):
+    hasher = PasswordHasher(method, workers=workers)
+    hashed = hasher.hash(PASSWORD)  # also warms up the pool
+    # Request threads submitting concurrently, as gunicorn threads would
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers * 4) as threads:
+        list(threads.map(lambda _: hasher.verify(hashed, PASSWORD), range(total)))
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--methods", nargs="+", default=DEFAULT_METHODS)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"{'method':<24} {'logins/s/core':>14} {'ms/login':>9} "
+          f"{'pool x' + str(args.workers):>10}")
+    for method in args.methods:
+        rate = per_core(method, args.seconds)
+        pool_rate = pooled(method, args.workers, max(8, int(rate * args.seconds)))
+        print(f"{method:<24} {rate:>14.1f} {1000 / rate:>9.1f} {pool_rate:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Live job stream benchmark.
+
+Reports the cost of publishing one job to the in-process hub with
+subscribers spread over Kenyan cities, grid lookup vs a scan of every
+subscriber. Then starts the ASGI app under uvicorn, opens --connections
+idle SSE streams, and reports the server's memory per open stream and
+how long a job created through the API takes to reach every subscriber
+in range. All streams are read by one client event loop, so that time
+is an upper bound.
+
+    python -m benchmarks.bench_job_stream
+    python -m benchmarks.bench_job_stream --subscribers 50000 --connections 5000
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Set before the app is imported; inherited by the uvicorn child process
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp()}/bench_job_stream.db",
+    "RATELIMIT_ENABLED": "false", "SCORING_MODE": "off", "LOG_FILE": "",
+    "LOG_ACCESS_SAMPLE_RATE": "0",
+})
+
+import httpx  # noqa: E402
+
+from benchmarks.seed import CITIES  # noqa: E402
+from services.job_stream import JobStreamHub, Subscription  # noqa: E402
+
+
+class CountingSubscription(Subscription):
+    def put(self, frame):
+        self.dropped += 1
+
+
+def _near(rng, city):
+    _, lat, lng, _ = city
+    return lat + rng.uniform(-0.05, 0.05), lng + rng.uniform(-0.05, 0.05)
+
+
+def dispatch_cost(subscribers, publishes, radius_km):
+    rng = random.Random(42)
+    weights = [c[3] for c in CITIES]
+    hub = JobStreamHub()
+    subs = [CountingSubscription(*_near(rng, rng.choices(CITIES, weights)[0]), radius_km, 0)
+            for _ in range(subscribers)]
+    for sub in subs:
+        hub.subscribe(sub)
+    jobs = [_near(rng, rng.choices(CITIES, weights)[0]) for _ in range(publishes)]
+
+    start = time.perf_counter()
+    delivered = sum(hub.dispatch(lat, lng, b"") for lat, lng in jobs)
+    grid = (time.perf_counter() - start) / publishes * 1e6
+
+    start = time.perf_counter()
+    for lat, lng in jobs:
+        for sub in subs:
+            if sub.matches(lat, lng):
+                sub.put(b"")
+    scan = (time.perf_counter() - start) / publishes * 1e6
+    return grid, scan, delivered / publishes
+
+
+def _rss_kb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port):
+    from app import create_app
+    from app.extensions import db
+
+    with create_app().app_context():
+        db.create_all()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"], cwd=BACKEND_DIR, env=os.environ.copy())
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/health/db")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise SystemExit("uvicorn did not start")
+
+
+async def fan_out(base, pid, connections, radius_km):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=0)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=None) as client:
+        rss_before = _rss_kb(pid)
+        opened, arrivals = asyncio.Event(), []
+        ready = [0]
+
+        async def subscribe(near):
+            # Half the subscribers sit in Kilimani, half in Mombasa
+            lat, lng = (-1.29, 36.785) if near else (-4.04, 39.67)
+            url = f"/api/jobs/stream?lat={lat}&lng={lng}&radius_km={radius_km}"
+            async with client.stream("GET", url) as response:
+                async for chunk in response.aiter_raw():
+                    if chunk.startswith(b"retry"):
+                        ready[0] += 1
+                        if ready[0] == connections:
+                            opened.set()
+                    elif b"event: job" in chunk:
+                        arrivals.append(time.perf_counter())
+                        return
+
+        tasks = [asyncio.create_task(subscribe(i % 2 == 0)) for i in range(connections)]
+        await asyncio.wait_for(opened.wait(), 120)
+        await asyncio.sleep(1)
+        per_stream = (_rss_kb(pid) - rss_before) / connections
+
+        await client.post("/api/auth/register", json={
+            "username": "streamer", "email": "streamer@bench.local",
+            "password": "benchpass123", "role": "client"})
+        token = (await client.post("/api/auth/login", json={
+            "email": "streamer@bench.local", "password": "benchpass123"})).json()["access_token"]
+        start = time.perf_counter()
+        await client.post("/api/jobs/", headers={"Authorization": f"Bearer {token}"}, json={
+            "title": "Fix a leaking tap", "description": "Kitchen", "location": "Kilimani"})
+        expected = (connections + 1) // 2
+        while len(arrivals) < expected and time.perf_counter() - start < 30:
+            await asyncio.sleep(0.005)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return per_stream, len(arrivals), expected, (max(arrivals, default=start) - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subscribers", type=int, default=20000)
+    parser.add_argument("--publishes", type=int, default=2000)
+    parser.add_argument("--radius-km", type=float, default=5.0)
+    parser.add_argument("--connections", type=int, default=2000)
+    args = parser.parse_args()
+
+    grid, scan, fanout = dispatch_cost(args.subscribers, args.publishes, args.radius_km)
+    print(f"publish to {args.subscribers} subscribers ({fanout:.0f} in range on average): "
+          f"grid {grid:.0f} µs, full scan {scan:.0f} µs")
+
+    port = _free_port()
+    server = start_server(port)
+    try:
+        per_stream, received, expected, fanout_ms = asyncio.run(
+            fan_out(f"http://127.0.0.1:{port}", server.pid, args.connections, args.radius_km))
+    finally:
+        server.terminate()
+        server.wait()
+    print(f"uvicorn with {args.connections} open streams: {per_stream:.1f} KiB RSS per stream; "
+          f"new job reached {received}/{expected} subscribers in range in {fanout_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Per-request cost of the /metrics instrumentation.
+
+Serves a page of the job feed (response cache off) through the test
+client with METRICS_ENABLED off and on, in alternating rounds, and
+reports the difference of the medians.
+
+    python -m benchmarks.bench_metrics
+    python -m benchmarks.bench_metrics --requests 1000 --rounds 12
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_metrics.db")
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.job import Job  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def seed(app, n):
+    with app.app_context():
+        db.create_all()
+        if db.session.query(Job.id).first():
+            return
+        client = User(username="bench", email="bench@example.com",
+                      password_hash="x", role="client")
+        db.session.add(client)
+        db.session.flush()
+        start = datetime(2025, 1, 1)
+        db.session.execute(db.insert(Job), [{
+            "title": f"Job {i}", "description": "Paint a fence", "price": 500.0,
+            "location_lat": -1.28, "location_lng": 36.82,
+            "created_at": start + timedelta(seconds=i),
+            "updated_at": start + timedelta(seconds=i),
+            "client_id": client.id, "status": "open",
+        } for i in range(n)])
+        db.session.commit()
+
+
+def make_client(enabled):
+    # Config is read when app.config is imported, so toggle it per app instead
+    app = create_app(config={
+        "METRICS_ENABLED": enabled,
+        # With a token the slow-request SQL capture is on too
+        "METRICS_TOKEN": "bench",
+        "RESPONSE_CACHE_TTL": 0,
+        "LOG_FILE": os.path.join(tempfile.gettempdir(), "bench_metrics.log"),
+    })
+    seed(app, 500)
+    client = app.test_client()
+    scrape = client.get("/metrics", headers={"Authorization": "Bearer bench"})
+    assert (scrape.status_code == 200) == enabled, "METRICS_ENABLED not applied"
+    for _ in range(100):
+        client.get("/api/jobs/?per_page=20")
+    return client
+
+
+def per_request(client, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get("/api/jobs/?per_page=20")
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=8)
+    args = parser.parse_args()
+    clients = {False: make_client(False), True: make_client(True)}
+    # Alternate off/on rounds so drift (caches, CPU clock) hits both alike
+    times = {False: [], True: []}
+    for _ in range(args.rounds):
+        for enabled, client in clients.items():
+            times[enabled].append(per_request(client, args.requests))
+    off, on = statistics.median(times[False]), statistics.median(times[True])
+    print(f"GET /api/jobs/?per_page=20, median of {args.rounds} rounds: {off:.0f} µs off, "
+          f"{on:.0f} µs on (+{on - off:.0f} µs, {(on - off) / off:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
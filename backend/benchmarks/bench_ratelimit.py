@@ -0,0 +1,140 @@
+"""
+Rate limiter overhead benchmark.
+
+Reports the cost of one limit check per storage backend and strategy, the
+added latency per request through Flask (on a limited route and on one
+without limits, each case in its own process), and checks that the
+SQLite storage enforces one limit across several processes.
+
+    python -m benchmarks.bench_ratelimit
+    python -m benchmarks.bench_ratelimit --storages memory:// sqlite:////dev/shm/rl.db
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from multiprocessing import Pool, get_context
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_ratelimit.db")
+
+from limits import parse  # noqa: E402
+from limits.storage import storage_from_string  # noqa: E402
+from limits.strategies import STRATEGIES  # noqa: E402
+
+import app.utils.rate_limit  # noqa: E402,F401  registers the sqlite:// scheme
+
+STRATEGY_NAMES = ["fixed-window", "sliding-window-counter", "moving-window"]
+
+
+def per_hit(uri, strategy, hits, keys=64):
+    storage = storage_from_string(uri)
+    storage.reset()
+    limiter = STRATEGIES[strategy](storage)
+    # High enough that every hit is admitted and the moving window stays small
+    item = parse(f"{hits}/second" if strategy == "moving-window" else "1000000/hour")
+    start = time.perf_counter()
+    for i in range(hits):
+        limiter.hit(item, "bench", str(i % keys))
+    return (time.perf_counter() - start) / hits * 1e6
+
+
+def per_request(args):
+    """Mean µs per request to a limited and an unlimited route, in a fresh process."""
+    enabled, requests = args
+    from app import create_app
+    from app.extensions import limiter
+
+    # Config is read when app.config is imported, so it is passed per app;
+    # the limiter is a shared extension, hence one process per case
+    flask_app = create_app(config={
+        "RATELIMIT_ENABLED": enabled,
+        "RATELIMIT_STORAGE_URI": "memory://",
+        "RATELIMIT_LOGIN": "1000000/hour",
+        "LOG_FILE": os.path.join(tempfile.gettempdir(), "bench_ratelimit.log"),
+    })
+
+    # Routes that do nothing but pass through the limiter
+    @flask_app.get("/bench/limited")
+    @limiter.limit(lambda: flask_app.config["RATELIMIT_LOGIN"])
+    def limited():
+        return {"ok": True}
+
+    @flask_app.get("/bench/unlimited")
+    def unlimited():
+        return {"ok": True}
+
+    client = flask_app.test_client()
+    applied = "X-RateLimit-Limit" in client.get("/bench/limited").headers
+    assert applied == enabled, "RATELIMIT_ENABLED not applied"
+    result = []
+    for path in ("/bench/limited", "/bench/unlimited"):
+        for _ in range(50):
+            client.get(path)
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get(path)
+        result.append((time.perf_counter() - start) / requests * 1e6)
+    return result
+
+
+def through_flask(requests, rounds):
+    """Median (limited, unlimited) µs per request with the limiter off and on."""
+    times = {False: [], True: []}
+    with get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+        # Alternate so drift hits both cases alike
+        for _ in range(rounds):
+            for enabled in (False, True):
+                times[enabled].append(pool.apply(per_request, ((enabled, requests),)))
+    return {enabled: [statistics.median(t[i] for t in runs) for i in (0, 1)]
+            for enabled, runs in times.items()}
+
+
+def _hammer(args):
+    uri, limit, attempts = args
+    limiter = STRATEGIES["sliding-window-counter"](storage_from_string(uri))
+    item = parse(f"{limit}/minute")
+    return sum(limiter.hit(item, "shared", "client") for _ in range(attempts))
+
+
+def shared(uri, processes, limit):
+    storage_from_string(uri).reset()
+    with Pool(processes) as pool:
+        admitted = sum(pool.map(_hammer, [(uri, limit, limit)] * processes))
+    return admitted
+
+
+def main():
+    default_sqlite = f"sqlite:///{tempfile.mkdtemp()}/bench_ratelimit_counters.db"
+    if os.path.isdir("/dev/shm"):
+        default_sqlite = "sqlite:////dev/shm/bench_ratelimit_counters.db"
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--storages", nargs="+", default=["memory://", default_sqlite])
+    parser.add_argument("--hits", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    print("per limit check (µs)")
+    for uri in args.storages:
+        for strategy in STRATEGY_NAMES:
+            print(f"  {uri:<48} {strategy:<24} {per_hit(uri, strategy, args.hits):7.1f}")
+
+    flask = through_flask(args.requests, args.rounds)
+    print(f"per request through Flask (memory://), median of {args.rounds} rounds")
+    for i, route in enumerate(("limited route", "unlimited route")):
+        off, on = flask[False][i], flask[True][i]
+        print(f"  {route:<16} {off:.0f} µs limiter off, {on:.0f} µs on (+{on - off:.0f} µs)")
+
+    for uri in args.storages:
+        if uri.startswith("sqlite"):
+            limit = 200
+            admitted = shared(uri, args.processes, limit)
+            print(f"shared across {args.processes} processes ({uri}): "
+                  f"{admitted} admitted for a limit of {limit}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Job page serialization benchmark.
+
+Compares the original list path (ORM entities -> Job.serialize() -> stdlib
+json) with column-tuple rows -> Job.serialize_row() -> FastJSONProvider,
+for 20- and 100-item pages against an in-memory SQLite database.
+
+    python -m benchmarks.bench_serialization
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.job import Job  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.utils.json import FastJSONProvider  # noqa: E402
+
+
+def seed(n):
+    client = User(username="bench", email="bench@example.com",
+                  password_hash="x", role="client")
+    db.session.add(client)
+    db.session.flush()
+    start = datetime(2025, 1, 1)
+    db.session.execute(db.insert(Job), [{
+        "title": f"Job {i}: fix kitchen sink and tiles",
+        "description": "Leaking pipe under the sink, some tiles loose. " * 4,
+        "price": 1500.0 + i,
+        "location_lat": -1.28 + i * 1e-4,
+        "location_lng": 36.82,
+        "created_at": start + timedelta(minutes=i),
+        "updated_at": start + timedelta(minutes=i, seconds=30),
+        "client_id": client.id,
+        "status": "open",
+        "job_metadata": {"location": "Westlands", "price_reason": "market rate"},
+    } for i in range(n)])
+    db.session.commit()
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app()
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    print(f"fast encoder: {'orjson' if fast.fast else 'stdlib (orjson not installed)'}")
+
+    with app.app_context():
+        db.create_all()
+        seed(max(args.sizes) * 10)
+        for size in args.sizes:
+            def legacy():
+                db.session.expunge_all()
+                jobs = Job.query.order_by(Job.created_at.desc()).limit(size).all()
+                stdlib.response({"items": [j.serialize() for j in jobs]})
+
+            def rows():
+                db.session.expunge_all()
+                page = db.session.query(*Job.row_columns()).order_by(
+                    Job.created_at.desc()).limit(size).all()
+                fast.response({"items": [Job.serialize_row(r) for r in page]})
+
+            a = timed(legacy, args.repeat)
+            b = timed(rows, args.repeat)
+            print(f"{size:>4} items | ORM + stdlib {a * 1e3:7.3f} ms | "
+                  f"rows + fast {b * 1e3:7.3f} ms | speedup {a / b:4.2f}x")
+
+            # Same payload either way
+            jobs = Job.query.order_by(Job.created_at.desc()).limit(size).all()
+            assert json.loads(stdlib.dumps([j.serialize() for j in jobs])) == \
+                json.loads(fast.dumps([j.serialize() for j in jobs]))
+
+
+if __name__ == "__main__":
+    main()
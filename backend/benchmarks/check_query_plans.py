@@ -0,0 +1,142 @@
+"""
+Check that the hot API paths only run index-backed queries.
+
+Migrates a fresh database with the Alembic migrations (so the check
+covers the migrated schema, not db.create_all), seeds it, sends each hot
+request through the test client and EXPLAINs every SELECT it issued.
+A full table scan fails the check (exit status 1). On PostgreSQL
+sequential scans are disabled for the EXPLAIN, so only queries with no
+usable index show one.
+
+    python -m benchmarks.check_query_plans
+    python -m benchmarks.check_query_plans --database-url postgresql://localhost/mboka_plans
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# "SCAN jobs" is a full scan; "SCAN jobs USING INDEX ..." walks an index
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def hot_requests(ctx):
+    """(name, method, path, json body, token) for each hot path."""
+    client, worker = ctx["client_token"], ctx["worker_token"]
+    return [
+        ("login", "POST", "/api/auth/login",
+         {"email": "worker0@bench.local", "password": ctx["password"]}, None),
+        ("feed newest", "GET", "/api/jobs/?per_page=20", None, None),
+        ("feed by status", "GET", "/api/jobs/?status=open&per_page=20", None, None),
+        ("feed next page", "GET", f"/api/jobs/?status=open&cursor={ctx['cursor']}", None, None),
+        ("feed nearby", "GET", "/api/jobs/?lat=-1.2864&lng=36.8172&radius_km=5", None, None),
+        ("feed by distance", "GET",
+         "/api/jobs/?lat=-1.2864&lng=36.8172&radius_km=5&sort=distance", None, None),
+        ("job detail", "GET", f"/api/jobs/{ctx['job_id']}", None, None),
+        ("nearby workers", "GET", "/api/workers/?lat=-1.2864&lng=36.8172&radius_km=5", None, None),
+        ("workers free Monday", "GET", "/api/workers/?lat=-1.2864&lng=36.8172&radius_km=5"
+         "&available_from=2025-12-15T07:00:00Z&available_until=2025-12-15T09:00:00Z", None, None),
+        ("worker schedule", "GET", f"/api/workers/{ctx['profile_id']}/schedule", None, None),
+        ("workers by rating", "GET",
+         "/api/workers/?lat=-1.2864&lng=36.8172&radius_km=5&sort=rating", None, None),
+        ("worker profile", "GET", f"/api/workers/{ctx['profile_id']}", None, None),
+        ("worker reviews", "GET", f"/api/reviews/worker/{ctx['worker_id']}", None, None),
+        ("apply", "POST", "/api/applications/", {"job_id": ctx["job_id"]}, worker),
+        ("apply duplicate", "POST", "/api/applications/", {"job_id": ctx["job_id"]}, worker),
+        ("list applications", "GET", f"/api/applications/job/{ctx['job_id']}", None, client),
+        ("my jobs export", "GET", "/api/jobs/export", None, client),
+    ]
+
+
+def explain(conn, statement, parameters):
+    """Plan lines for a statement, and the ones that are full table scans."""
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        lines = [row[-1] for row in rows]
+        return lines, [line for line in lines if SQLITE_FULL_SCAN.match(line)]
+    if conn.dialect.name == "postgresql":
+        with conn.begin():
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            lines = [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)]
+        return lines, [line.strip() for line in lines if "Seq Scan" in line]
+    raise SystemExit(f"Unsupported dialect {conn.dialect.name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url",
+                        default=f"sqlite:///{tempfile.mkdtemp()}/query_plans.db",
+                        help="an empty database; it is migrated and seeded")
+    parser.add_argument("--scale", type=float, default=0.001)
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["RATELIMIT_ENABLED"] = "false"
+    os.environ["SCORING_MODE"] = "off"
+    from flask_migrate import upgrade
+
+    from app import create_app
+    from app.extensions import db
+    from app.models import WorkerProfile
+    from app.models.job import Job
+    from app.utils.querycount import count_queries
+    from benchmarks.seed import PASSWORD, seed
+    from services.availability import get_availability_index
+
+    app = create_app()
+    client = app.test_client(use_cookies=False)
+    with app.app_context():
+        upgrade(directory=os.path.join(BACKEND_DIR, "migrations"))
+        seed(db, args.scale)
+        job = db.session.query(Job).filter_by(client_id=1).first()
+        profile = db.session.query(WorkerProfile).order_by(WorkerProfile.id).first()
+
+    def token(email):
+        r = client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+        return r.get_json()["access_token"]
+
+    ctx = {
+        "password": PASSWORD,
+        "job_id": job.id,
+        "profile_id": profile.id,
+        "worker_id": profile.user_id,
+        "client_token": token("client0@bench.local"),
+        "worker_token": token("worker0@bench.local"),
+        "cursor": client.get("/api/jobs/?status=open&per_page=5").get_json()["next_cursor"],
+    }
+
+    failures = 0
+    with app.app_context():
+        # Loaded in full once per AVAILABILITY_INDEX_TTL, not per request
+        get_availability_index()
+        engine = db.engine
+        for name, method, path, body, auth in hot_requests(ctx):
+            headers = {"Authorization": f"Bearer {auth}"} if auth else {}
+            with count_queries(engine) as counter:
+                status = client.open(path, method=method, json=body, headers=headers).status_code
+            selects = [(s, p) for s, p in zip(counter.statements, counter.parameters)
+                       if s.lstrip().upper().startswith(("SELECT", "WITH"))]
+            scans = []
+            with engine.connect() as conn:
+                for statement, parameters in selects:
+                    lines, bad = explain(conn, statement, parameters)
+                    scans.extend(bad)
+                    if args.verbose or bad:
+                        print(f"    {' '.join(statement.split())[:150]}")
+                        for line in lines:
+                            print(f"      {line}")
+            failures += bool(scans)
+            verdict = f"FULL SCAN: {', '.join(scans)}" if scans else "ok"
+            print(f"{name:<20} {status}  {len(selects)} selects  {verdict}")
+
+    if failures:
+        print(f"\n{failures} hot path(s) run a query without a usable index")
+        sys.exit(1)
+    print("\nall hot-path queries use an index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Scenario load test against a seeded database (see benchmarks/seed.py).
+
+Drives the real app either in-process through the Flask test client or
+over HTTP through a local gunicorn started for the run (or any running
+server with --target url). Each scenario runs on its own so its numbers
+are not mixed with the others. Results go to benchmarks/results/ as
+JSON named after the current commit; pass an earlier file to --compare
+to flag regressions. The apply scenario writes rows, so reseed with
+`python -m benchmarks.seed --drop` before runs meant to be compared.
+
+    python -m benchmarks.loadtest --target client
+    python -m benchmarks.loadtest --target gunicorn --workers 4 --concurrency 32
+    python -m benchmarks.loadtest --compare benchmarks/results/<old>.json
+
+Rate limiting is turned off for the run; login would otherwise hit it.
+Server logs go to benchmarks/results/server.log unless LOG_FILE is set.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlencode, urlparse
+
+from benchmarks.seed import CITIES, DEFAULT_DATABASE_URL, PASSWORD
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+SCENARIOS = ["login", "feed", "nearby", "apply", "applications"]
+TOKENS = 50  # logged-in users per role shared by the scenarios
+
+
+# -------- SESSIONS -------- #
+
+
+class ClientSession:
+    """In-process requests through the Flask test client."""
+
+    def __init__(self, app):
+        self.client = app.test_client(use_cookies=False)
+
+    def request(self, method, path, body=None, token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        r = self.client.open(path, method=method, json=body, headers=headers)
+        return r.status_code, r.get_json(silent=True)
+
+
+class HTTPSession:
+    """Keep-alive HTTP connection to a running server; one per thread."""
+
+    def __init__(self, base_url):
+        url = urlparse(base_url)
+        self.conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+
+    def request(self, method, path, body=None, token=None):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self.conn.request(method, path, payload, headers)
+            r = self.conn.getresponse()
+            data = r.read()
+        except (http.client.HTTPException, OSError):
+            self.conn.close()  # reconnects on the next request
+            raise
+        try:
+            return r.status, json.loads(data) if data else None
+        except ValueError:
+            return r.status, None
+
+
+# -------- SCENARIOS -------- #
+# Each takes (session, rng, ctx) and returns the status of its last request;
+# scenarios that page issue several requests, each timed separately by
+# the session wrapper.
+
+
+def login(session, rng, ctx):
+    user = rng.choice(["client", "worker"])
+    index = rng.randrange(ctx[f"{user}s"])
+    return session.request("POST", "/api/auth/login",
+                           {"email": f"{user}{index}@bench.local", "password": PASSWORD})[0]
+
+
+def feed(session, rng, ctx):
+    # First page plus up to four more by cursor, as a scrolling client would
+    query = {"per_page": 20, "status": "open"}
+    if rng.random() < 0.3:
+        _, lat, lng, _ = rng.choice(CITIES)
+        query.update(lat=lat, lng=lng, radius_km=10)
+    status, body = session.request("GET", f"/api/jobs/?{urlencode(query)}")
+    for _ in range(rng.randint(0, 4)):
+        if status != 200 or not body or not body.get("next_cursor"):
+            break
+        query["cursor"] = body["next_cursor"]
+        status, body = session.request("GET", f"/api/jobs/?{urlencode(query)}")
+    return status
+
+
+def nearby(session, rng, ctx):
+    _, lat, lng, _ = rng.choice(CITIES)
+    query = urlencode({"lat": lat + rng.uniform(-0.02, 0.02),
+                       "lng": lng + rng.uniform(-0.02, 0.02), "radius_km": 5})
+    return session.request("GET", f"/api/workers/?{query}")[0]
+
+
+def apply(session, rng, ctx):
+    return session.request("POST", "/api/applications/",
+                           {"job_id": rng.randint(1, ctx["jobs"]),
+                            "cover_letter": "Available this week"},
+                           rng.choice(ctx["worker_tokens"]))[0]
+
+
+def applications(session, rng, ctx):
+    job_id, token = rng.choice(ctx["owned_jobs"])
+    return session.request("GET", f"/api/applications/job/{job_id}", token=token)[0]
+
+
+SCENARIO_FUNCS = {"login": login, "feed": feed, "nearby": nearby,
+                  "apply": apply, "applications": applications}
+
+
+class TimedSession:
+    """Records latency and status of every request made through a session."""
+
+    def __init__(self, session):
+        self.session = session
+        self.samples = []
+
+    def request(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            status, body = self.session.request(*args, **kwargs)
+        except (http.client.HTTPException, OSError):
+            status, body = 599, None
+        self.samples.append((time.perf_counter() - start, status))
+        return status, body
+
+
+# -------- RUNNER -------- #
+
+
+def prepare(session, database_url):
+    """Counts and logged-in tokens the scenarios draw from."""
+    from sqlalchemy import create_engine, text
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        count = lambda sql: conn.execute(text(sql)).scalar()  # noqa: E731
+        ctx = {"clients": count("SELECT COUNT(*) FROM users WHERE role = 'client'"),
+               "workers": count("SELECT COUNT(*) FROM users WHERE role = 'worker'"),
+               "jobs": count("SELECT MAX(id) FROM jobs")}
+        owners = conn.execute(text(
+            "SELECT id, client_id FROM jobs WHERE client_id <= :n ORDER BY id LIMIT 500"),
+            {"n": TOKENS}).all()
+    engine.dispose()
+    if not ctx["jobs"]:
+        raise SystemExit("No jobs found; run python -m benchmarks.seed first")
+
+    def token(user, index):
+        status, body = session.request("POST", "/api/auth/login", {
+            "email": f"{user}{index}@bench.local", "password": PASSWORD})
+        if status != 200:
+            raise SystemExit(f"Login failed for {user}{index}: {status} {body}")
+        return body["access_token"]
+
+    client_tokens = {i + 1: token("client", i) for i in range(min(TOKENS, ctx["clients"]))}
+    ctx["worker_tokens"] = [token("worker", i) for i in range(min(TOKENS, ctx["workers"]))]
+    ctx["owned_jobs"] = [(job_id, client_tokens[client_id]) for job_id, client_id in owners]
+    return ctx
+
+
+def run_scenario(name, make_session, ctx, iterations, concurrency, seed):
+    local = threading.local()
+    sessions = []
+    lock = threading.Lock()
+
+    def one(i):
+        if not hasattr(local, "session"):
+            local.session = TimedSession(make_session())
+            with lock:
+                sessions.append(local.session)
+        SCENARIO_FUNCS[name](local.session, random.Random(seed * 1_000_003 + i), ctx)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(iterations)))
+    elapsed = time.perf_counter() - start
+    samples = [s for session in sessions for s in session.samples]
+    return summarize(samples, elapsed)
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency for latency, _ in samples)
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 \
+        else latencies * 99
+    statuses = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "requests": len(samples),
+        "errors": sum(n for status, n in statuses.items() if int(status) >= 500),
+        "statuses": statuses,
+        "rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_gunicorn(env, workers, threads):
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--workers", str(workers), "--threads", str(threads),
+         "--bind", f"127.0.0.1:{port}", "--log-level", "warning", "wsgi:app"],
+        cwd=BACKEND_DIR, env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit("gunicorn exited during startup")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("gunicorn did not start within 30s")
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                       text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(report, baseline=None, threshold=0.10):
+    """Print the table; with a baseline, mark p95 regressions and return them."""
+    print(f"\n{report['commit']} target={report['target']} concurrency={report['concurrency']}")
+    print(f"{'scenario':<13}{'requests':>9}{'errors':>7}{'req/s':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  vs baseline")
+    regressions = []
+    for name, r in report["scenarios"].items():
+        note = ""
+        old = (baseline or {}).get("scenarios", {}).get(name)
+        if old:
+            change = (r["p95_ms"] - old["p95_ms"]) / old["p95_ms"] if old["p95_ms"] else 0.0
+            rps = (r["rps"] - old["rps"]) / old["rps"] if old["rps"] else 0.0
+            note = f"p95 {change:+.0%}, req/s {rps:+.0%}"
+            if change > threshold:
+                note += "  REGRESSION"
+                regressions.append(name)
+        print(f"{name:<13}{r['requests']:>9}{r['errors']:>7}{r['rps']:>9.1f}"
+              f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}  {note}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target", choices=["client", "gunicorn", "url"], default="client")
+    parser.add_argument("--base-url", help="server to test with --target url")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--iterations", type=int, default=500, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads per worker")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="results file (default benchmarks/results/<commit>-<target>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="p95 increase reported as a regression (fraction)")
+    args = parser.parse_args()
+
+    env = dict(os.environ, DATABASE_URL=args.database_url, RATELIMIT_ENABLED="false",
+               SCORING_MODE=os.getenv("SCORING_MODE", "off"),
+               LOG_FILE=os.getenv("LOG_FILE", os.path.join(RESULTS_DIR, "server.log")))
+    proc = None
+    if args.target == "client":
+        os.environ.update(env)
+        from app import create_app
+        app = create_app()
+        make_session = lambda: ClientSession(app)  # noqa: E731
+    else:
+        base_url = args.base_url
+        if args.target == "gunicorn":
+            proc, base_url = start_gunicorn(env, args.workers, args.threads)
+        elif not base_url:
+            parser.error("--target url needs --base-url")
+        make_session = lambda: HTTPSession(base_url)  # noqa: E731
+
+    try:
+        ctx = prepare(make_session(), args.database_url)
+        report = {
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "target": args.target,
+            "concurrency": args.concurrency,
+            "iterations": args.iterations,
+            "workers": args.workers if args.target == "gunicorn" else None,
+            "threads": args.threads if args.target == "gunicorn" else None,
+            "dataset": {k: ctx[k] for k in ("clients", "workers", "jobs")},
+            "python": sys.version.split()[0],
+            "scenarios": {},
+        }
+        for name in args.scenarios:
+            report["scenarios"][name] = run_scenario(
+                name, make_session, ctx, args.iterations, args.concurrency, args.seed)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}-{args.target}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("dataset") != report["dataset"]:
+            print("warning: baseline was run against a different dataset")
+    regressions = print_report(report, baseline, args.threshold)
+    print(f"\nwrote {output}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
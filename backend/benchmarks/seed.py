@@ -0,0 +1,188 @@
+"""
+Seed a database with realistic volumes for load testing.
+
+At --scale 1 this is 1M jobs, 200k workers (with weekly schedules), 50k
+clients and 5M applications; the default --scale 0.01 takes a few seconds. Rows are
+generated deterministically from --seed, so two runs at the same scale
+produce the same data and their load-test results are comparable. Every
+seeded user has the password in PASSWORD.
+
+    python -m benchmarks.seed --database-url sqlite:///benchmarks/bench.db
+    python -m benchmarks.seed --scale 1 --database-url postgresql://localhost/mboka_bench
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+DEFAULT_DATABASE_URL = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'bench.db')}"
+
+JOBS = 1_000_000
+WORKERS = 200_000
+CLIENTS = 50_000
+APPLICATIONS_PER_JOB = 5
+PASSWORD = "benchpass123"
+CHUNK = 10_000
+
+CITIES = [
+    # name, lat, lng, share of rows
+    ("Nairobi", -1.2864, 36.8172, 0.45),
+    ("Mombasa", -4.0435, 39.6682, 0.15),
+    ("Kisumu", -0.0917, 34.7680, 0.12),
+    ("Nakuru", -0.3031, 36.0800, 0.10),
+    ("Eldoret", 0.5143, 35.2698, 0.10),
+    ("Thika", -1.0333, 37.0693, 0.08),
+]
+SKILLS = ["plumbing", "electrical", "carpentry", "painting", "cleaning", "masonry",
+          "welding", "gardening", "tiling", "roofing", "driving", "cooking"]
+TASKS = ["Fix a leaking {0} pipe", "Paint the {0}", "Repair the {0} door",
+         "Install {0} lights", "Clean the {0}", "Build a {0} shelf"]
+ROOMS = ["kitchen", "bathroom", "bedroom", "office", "shop", "garage", "veranda"]
+
+
+def _place(rng):
+    name, lat, lng, _ = rng.choices(CITIES, weights=[c[3] for c in CITIES])[0]
+    # ~5 km of jitter around the city centre
+    return name, lat + rng.uniform(-0.05, 0.05), lng + rng.uniform(-0.05, 0.05)
+
+
+def _chunks(rows, size=CHUNK):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(conn, table, rows, label):
+    start, total = time.perf_counter(), 0
+    for batch in _chunks(rows):
+        conn.execute(table.insert(), batch)
+        total += len(batch)
+    print(f"  {label:<13} {total:>9,} rows in {time.perf_counter() - start:6.1f}s")
+
+
+def seed(db, scale=0.01, rng_seed=42):
+    """Insert users, worker profiles, schedules, jobs and applications; returns the counts."""
+    from app.models.application import WorkerApplication
+    from app.models.availability import AvailabilitySlot
+    from app.models.job import Job
+    from app.models.user import User
+    from app.models.worker_profile import WorkerProfile
+    from app.utils.security import hash_password
+
+    rng = random.Random(rng_seed)
+    n_clients = max(int(CLIENTS * scale), 10)
+    n_workers = max(int(WORKERS * scale), 10)
+    n_jobs = max(int(JOBS * scale), 10)
+    # One hash for everyone: hashing 250k passwords would dominate seeding
+    password_hash = hash_password(PASSWORD)
+    now = datetime.utcnow()
+
+    def users():
+        for i in range(n_clients):
+            yield {"id": i + 1, "username": f"client{i}", "email": f"client{i}@bench.local",
+                   "password_hash": password_hash, "role": "client", "created_at": now}
+        for i in range(n_workers):
+            yield {"id": n_clients + i + 1, "username": f"worker{i}",
+                   "email": f"worker{i}@bench.local", "password_hash": password_hash,
+                   "role": "worker", "created_at": now}
+
+    def profiles():
+        for i in range(n_workers):
+            city, lat, lng = _place(rng)
+            yield {"id": i + 1, "user_id": n_clients + i + 1, "bio": "Reliable and experienced",
+                   "skills": ",".join(rng.sample(SKILLS, rng.randint(1, 3))),
+                   "location": city, "latitude": lat, "longitude": lng,
+                   "is_available": rng.random() < 0.8}
+
+    def schedules():
+        # Own generator so adding schedules left the other tables' data unchanged
+        srng = random.Random(rng_seed + 1)
+        for i in range(n_workers):
+            days = srng.sample(range(7), srng.randint(3, 6))
+            start = srng.choice([6, 7, 8, 9, 10]) * 60 + srng.choice([0, 30])
+            end = min(start + srng.randint(4, 10) * 60, 24 * 60)
+            for day in days:
+                yield {"worker_id": i + 1, "weekday": day, "start_minute": start, "end_minute": end}
+
+    def jobs():
+        for i in range(n_jobs):
+            city, lat, lng = _place(rng)
+            created = now - timedelta(seconds=rng.randint(0, 180 * 86400))
+            yield {"id": i + 1, "title": rng.choice(TASKS).format(rng.choice(ROOMS)),
+                   "description": f"{rng.choice(SKILLS).capitalize()} work needed in {city}",
+                   "price": float(rng.randrange(500, 20000, 50)),
+                   "location_lat": lat, "location_lng": lng,
+                   "created_at": created, "updated_at": created,
+                   "client_id": rng.randint(1, n_clients),
+                   "status": "open" if rng.random() < 0.7 else rng.choice(["assigned", "completed"]),
+                   "job_metadata": {"location": city}}
+
+    def applications():
+        # Workers for one job are spread by a fixed stride so they never repeat
+        stride = max(n_workers // APPLICATIONS_PER_JOB, 1)
+        for job_id in range(1, n_jobs + 1):
+            for j in range(min(APPLICATIONS_PER_JOB, n_workers)):
+                worker = (job_id * 131 + j * stride) % n_workers
+                yield {"job_id": job_id, "worker_id": n_clients + worker + 1,
+                       "cover_letter": "I can start tomorrow", "status": "pending",
+                       "ai_score": round(rng.random(), 4) if rng.random() < 0.6 else None,
+                       "created_at": now}
+
+    engine = db.engine
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        _insert(conn, User.__table__, users(), "users")
+        _insert(conn, WorkerProfile.__table__, profiles(), "profiles")
+        _insert(conn, AvailabilitySlot.__table__, schedules(), "slots")
+        _insert(conn, Job.__table__, jobs(), "jobs")
+        _insert(conn, WorkerApplication.__table__, applications(), "applications")
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            # Ids were inserted explicitly; move the sequences past them
+            for table in ("users", "worker_profiles", "jobs"):
+                conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT MAX(id) FROM {table}))")
+        conn.exec_driver_sql("ANALYZE")
+    return {"clients": n_clients, "workers": n_workers, "jobs": n_jobs,
+            "applications": n_jobs * min(APPLICATIONS_PER_JOB, n_workers)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--scale", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true", help="drop existing tables first")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SCORING_MODE", "off")
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    with app.app_context():
+        if args.drop:
+            db.drop_all()
+        db.create_all()
+        if db.session.execute(db.text("SELECT COUNT(*) FROM users")).scalar():
+            raise SystemExit("Database already has users; pass --drop to reseed")
+        print(f"Seeding {args.database_url} at scale {args.scale}")
+        start = time.perf_counter()
+        counts = seed(db, args.scale, args.seed)
+        print(f"Done in {time.perf_counter() - start:.1f}s: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Concurrency check for accepting applications.
+
+Seeds --jobs open jobs with --applicants pending applications each, then
+has --threads threads fire POST /api/applications/<id>/accept for every
+application of every job (--taps times each, to include double taps) in
+random order. Afterwards every job must be assigned to the worker of its
+one accepted application, with all others rejected; every 200 for a job
+must name that same application and every other answer must be a 409.
+Any violation, or any 5xx, fails the run (exit status 1).
+
+Runs against SQLite in WAL mode by default; pass an empty PostgreSQL
+database to check it there.
+
+    python -m benchmarks.stress_accept
+    python -m benchmarks.stress_accept --threads 32 --database-url postgresql://localhost/mboka_stress
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+
+def seed(db, client_id, jobs, applicants):
+    from app.models.application import WorkerApplication
+    from app.models.job import Job
+    from app.models.user import User
+
+    now = datetime.utcnow()
+    with db.engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": client_id + 1 + i, "username": f"worker{i}", "email": f"worker{i}@stress.local",
+             "password_hash": "-", "role": "worker", "created_at": now}
+            for i in range(applicants)])
+        conn.execute(Job.__table__.insert(), [
+            {"id": j, "title": f"Job {j}", "description": "Stress", "location_lat": -1.29,
+             "location_lng": 36.78, "client_id": client_id, "status": "open",
+             "created_at": now, "updated_at": now}
+            for j in range(1, jobs + 1)])
+        conn.execute(WorkerApplication.__table__.insert(), [
+            {"job_id": j, "worker_id": client_id + 1 + i, "status": "pending", "created_at": now}
+            for j in range(1, jobs + 1) for i in range(applicants)])
+
+
+def hammer(app, token, attempts, threads):
+    """Run the attempts from `threads` threads; [(job_id, application_id, status, seconds)]."""
+    results, lock = [], threading.Lock()
+    pending = iter(attempts)
+    start_line = threading.Barrier(threads)
+
+    def run():
+        client = app.test_client(use_cookies=False)
+        headers = {"Authorization": f"Bearer {token}"}
+        local = []
+        start_line.wait()
+        while True:
+            with lock:
+                attempt = next(pending, None)
+            if attempt is None:
+                break
+            job_id, application_id = attempt
+            began = time.perf_counter()
+            status = client.post(f"/api/applications/{application_id}/accept",
+                                 headers=headers).status_code
+            local.append((job_id, application_id, status, time.perf_counter() - began))
+        with lock:
+            results.extend(local)
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return results
+
+
+def check(db, results):
+    """Invariant violations, as messages."""
+    from sqlalchemy import select
+    from app.models.application import WorkerApplication
+    from app.models.job import Job
+
+    problems = []
+    winners = defaultdict(set)
+    for job_id, application_id, status, _ in results:
+        if status == 200:
+            winners[job_id].add(application_id)
+        elif status != 409:
+            problems.append(f"job {job_id}: accept of application {application_id} got {status}")
+
+    jobs = {j.id: j for j in db.session.execute(select(Job.id, Job.status, Job.worker_id))}
+    applications = defaultdict(list)
+    for a in db.session.execute(select(WorkerApplication.id, WorkerApplication.job_id,
+                                       WorkerApplication.worker_id, WorkerApplication.status)):
+        applications[a.job_id].append(a)
+    for job_id, job in jobs.items():
+        accepted = [a for a in applications[job_id] if a.status == "accepted"]
+        others = Counter(a.status for a in applications[job_id] if a.status != "accepted")
+        if job.status != "assigned" or len(accepted) != 1:
+            problems.append(f"job {job_id}: status {job.status}, {len(accepted)} accepted")
+            continue
+        if job.worker_id != accepted[0].worker_id:
+            problems.append(f"job {job_id}: assigned to {job.worker_id}, "
+                            f"accepted worker is {accepted[0].worker_id}")
+        if set(others) - {"rejected"}:
+            problems.append(f"job {job_id}: other applications {dict(others)}")
+        if winners[job_id] != {accepted[0].id}:
+            problems.append(f"job {job_id}: 200s for {sorted(winners[job_id])}, "
+                            f"accepted {accepted[0].id}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url",
+                        default=f"sqlite:///{tempfile.mkdtemp()}/stress_accept.db",
+                        help="an empty database; tables are created and seeded")
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--applicants", type=int, default=20)
+    parser.add_argument("--taps", type=int, default=2, help="accepts sent per application")
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    os.environ.update({
+        "DATABASE_URL": args.database_url, "RATELIMIT_ENABLED": "false",
+        "SCORING_MODE": "off", "LOG_FILE": "", "LOG_LEVEL": "ERROR",
+        "LOG_ACCESS_SAMPLE_RATE": "0",
+    })
+    from app import create_app
+    from app.extensions import db
+    from app.models.user import User
+
+    app = create_app()
+    client = app.test_client(use_cookies=False)
+    with app.app_context():
+        db.create_all()
+        dialect = db.engine.dialect.name
+    # Registered first so the seeded users' explicit ids come after it
+    client.post("/api/auth/register", json={
+        "username": "stressclient", "email": "client@stress.local",
+        "password": "stresspass123", "role": "client"})
+    token = client.post("/api/auth/login", json={
+        "email": "client@stress.local", "password": "stresspass123"}).get_json()["access_token"]
+    with app.app_context():
+        seed(db, User.query.filter_by(username="stressclient").one().id,
+             args.jobs, args.applicants)
+
+    # Application ids are 1..jobs*applicants, in job order
+    attempts = [(j, (j - 1) * args.applicants + i + 1)
+                for j in range(1, args.jobs + 1) for i in range(args.applicants)] * args.taps
+    random.Random(42).shuffle(attempts)
+
+    began = time.perf_counter()
+    results = hammer(app, token, attempts, args.threads)
+    elapsed = time.perf_counter() - began
+    latencies = sorted(r[3] for r in results)
+    statuses = Counter(r[2] for r in results)
+    print(f"{len(results)} accepts from {args.threads} threads on {dialect} "
+          f"in {elapsed:.2f}s ({len(results) / elapsed:.0f}/s): "
+          f"{', '.join(f'{n} x {s}' for s, n in sorted(statuses.items()))}; "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+
+    with app.app_context():
+        problems = check(db, results)
+    for problem in problems[:20]:
+        print(f"  {problem}")
+    if problems:
+        raise SystemExit(f"{len(problems)} invariant violations")
+    print(f"all {args.jobs} jobs assigned exactly once")
+
+
+if __name__ == "__main__":
+    main()
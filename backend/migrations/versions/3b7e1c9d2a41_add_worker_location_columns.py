@@ -0,0 +1,30 @@
+"""add worker location columns
+
+Revision ID: 3b7e1c9d2a41
+Revises: cdcaaa607954
+Create Date: 2025-11-29 10:12:31.401772
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e1c9d2a41'
+down_revision = 'cdcaaa607954'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('worker_profiles', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+        batch_op.create_index('ix_worker_profiles_lat_lng', ['latitude', 'longitude'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('worker_profiles', schema=None) as batch_op:
+        batch_op.drop_index('ix_worker_profiles_lat_lng')
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
@@ -0,0 +1,53 @@
+"""add reviews and denormalized worker rating
+
+Revision ID: 4a8c2e6d1f93
+Revises: e2a7c4f9b351
+Create Date: 2025-12-12 14:08:37.215904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a8c2e6d1f93'
+down_revision = 'e2a7c4f9b351'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('reviews',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('reviewer_id', sa.Integer(), nullable=False),
+    sa.Column('worker_id', sa.Integer(), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=False),
+    sa.Column('comment', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint('rating BETWEEN 1 AND 5', name='ck_reviews_rating'),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+    sa.ForeignKeyConstraint(['reviewer_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['worker_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('job_id', name='uq_reviews_job_id')
+    )
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.create_index('ix_reviews_worker_created_at', ['worker_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('worker_profiles', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating', sa.Float(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('worker_profiles', schema=None) as batch_op:
+        batch_op.drop_column('rating')
+        batch_op.drop_column('rating_sum')
+        batch_op.drop_column('rating_count')
+
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.drop_index('ix_reviews_worker_created_at')
+
+    op.drop_table('reviews')
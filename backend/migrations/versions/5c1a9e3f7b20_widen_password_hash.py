@@ -0,0 +1,33 @@
+"""widen password hash
+
+Revision ID: 5c1a9e3f7b20
+Revises: 8f2d4a6c1e07
+Create Date: 2025-12-01 09:41:07.553190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1a9e3f7b20'
+down_revision = '8f2d4a6c1e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # scrypt hashes with explicit parameters are ~162 characters
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+               existing_type=sa.String(length=128),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=128),
+               existing_nullable=False)
@@ -0,0 +1,60 @@
+"""add weekly availability slots and exceptions
+
+Revision ID: 7b3f9a1c5e28
+Revises: 4a8c2e6d1f93
+Create Date: 2025-12-16 10:21:54.480213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b3f9a1c5e28'
+down_revision = '4a8c2e6d1f93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('availability_slots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('worker_id', sa.Integer(), nullable=False),
+    sa.Column('weekday', sa.SmallInteger(), nullable=False),
+    sa.Column('start_minute', sa.SmallInteger(), nullable=False),
+    sa.Column('end_minute', sa.SmallInteger(), nullable=False),
+    sa.CheckConstraint('weekday BETWEEN 0 AND 6', name='ck_availability_slots_weekday'),
+    sa.CheckConstraint('start_minute >= 0 AND end_minute <= 1440 AND start_minute < end_minute', name='ck_availability_slots_minutes'),
+    sa.ForeignKeyConstraint(['worker_id'], ['worker_profiles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('availability_slots', schema=None) as batch_op:
+        batch_op.create_index('ix_availability_slots_worker', ['worker_id', 'weekday'], unique=False)
+
+    op.create_table('availability_exceptions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('worker_id', sa.Integer(), nullable=False),
+    sa.Column('starts_at', sa.DateTime(), nullable=False),
+    sa.Column('ends_at', sa.DateTime(), nullable=False),
+    sa.Column('available', sa.Boolean(), nullable=False),
+    sa.Column('note', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint('starts_at < ends_at', name='ck_availability_exceptions_range'),
+    sa.ForeignKeyConstraint(['worker_id'], ['worker_profiles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('availability_exceptions', schema=None) as batch_op:
+        batch_op.create_index('ix_availability_exceptions_worker', ['worker_id', 'ends_at'], unique=False)
+        batch_op.create_index('ix_availability_exceptions_ends_at', ['ends_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('availability_exceptions', schema=None) as batch_op:
+        batch_op.drop_index('ix_availability_exceptions_ends_at')
+        batch_op.drop_index('ix_availability_exceptions_worker')
+
+    op.drop_table('availability_exceptions')
+    with op.batch_alter_table('availability_slots', schema=None) as batch_op:
+        batch_op.drop_index('ix_availability_slots_worker')
+
+    op.drop_table('availability_slots')
@@ -0,0 +1,30 @@
+"""add job feed indexes
+
+Revision ID: 8f2d4a6c1e07
+Revises: 3b7e1c9d2a41
+Create Date: 2025-11-30 14:03:52.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f2d4a6c1e07'
+down_revision = '3b7e1c9d2a41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_jobs_status_created_at', ['status', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_jobs_created_at', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_jobs_lat_lng', ['location_lat', 'location_lng'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_jobs_lat_lng')
+        batch_op.drop_index('ix_jobs_created_at')
+        batch_op.drop_index('ix_jobs_status_created_at')
@@ -0,0 +1,28 @@
+"""add worker availability columns
+
+Revision ID: 9d4e2b7a6f13
+Revises: 5c1a9e3f7b20
+Create Date: 2025-12-02 16:25:44.907321
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4e2b7a6f13'
+down_revision = '5c1a9e3f7b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('worker_profiles', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_available', sa.Boolean(), nullable=False, server_default=sa.true()))
+        batch_op.add_column(sa.Column('available_hours', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('worker_profiles', schema=None) as batch_op:
+        batch_op.drop_column('available_hours')
+        batch_op.drop_column('is_available')
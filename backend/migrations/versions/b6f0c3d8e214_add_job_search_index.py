@@ -0,0 +1,47 @@
+"""add job search index
+
+Revision ID: b6f0c3d8e214
+Revises: 9d4e2b7a6f13
+Create Date: 2025-12-03 11:08:19.270514
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6f0c3d8e214'
+down_revision = '9d4e2b7a6f13'
+branch_labels = None
+depends_on = None
+
+# Must match PostgresFTSBackend.DOCUMENT in services/search.py
+PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(job_metadata->>'location', '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(f"CREATE INDEX ix_jobs_search ON jobs USING GIN (({PG_DOCUMENT}))")
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+            "title, description, location, tokenize='unicode61')"
+        )
+        op.execute(
+            "INSERT INTO jobs_fts(rowid, title, description, location) "
+            "SELECT id, title, description, "
+            "coalesce(json_extract(job_metadata, '$.location'), '') FROM jobs"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_jobs_search")
+    elif dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS jobs_fts")
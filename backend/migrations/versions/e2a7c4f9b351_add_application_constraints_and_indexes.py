@@ -0,0 +1,42 @@
+"""add application unique constraint and hot path indexes
+
+Revision ID: e2a7c4f9b351
+Revises: b6f0c3d8e214
+Create Date: 2025-12-05 09:42:11.630287
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a7c4f9b351'
+down_revision = 'b6f0c3d8e214'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The old read-then-insert check could race; keep the first application
+    # of any duplicate pair so the unique constraint can be created
+    op.execute(
+        "DELETE FROM worker_applications WHERE id NOT IN ("
+        "SELECT MIN(id) FROM worker_applications GROUP BY job_id, worker_id)"
+    )
+    with op.batch_alter_table('worker_applications', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_worker_applications_job_worker', ['job_id', 'worker_id'])
+        batch_op.create_index('ix_worker_applications_worker_created_at', ['worker_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_jobs_client_id', ['client_id', 'id'], unique=False)
+        batch_op.create_index('ix_jobs_worker_id', ['worker_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_jobs_worker_id')
+        batch_op.drop_index('ix_jobs_client_id')
+
+    with op.batch_alter_table('worker_applications', schema=None) as batch_op:
+        batch_op.drop_index('ix_worker_applications_worker_created_at')
+        batch_op.drop_constraint('uq_worker_applications_job_worker', type_='unique')
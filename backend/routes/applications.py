@@ -1,40 +1,68 @@
-from flask import Blueprint, request, jsonify
-from app.extensions import db
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy.orm import selectinload
+from app.extensions import limiter
 from app.models.application import WorkerApplication
 from app.models.job import Job
+from app.models.user import User
 from app.utils.security import login_required
+from services.ai_service import request_scoring
+from services.assignments import (
+    TransitionError, accept_application, reject_application, submit_application)
 
 application_bp = Blueprint("application_bp", __name__, url_prefix="/applications")
 
+# Pre-ranked: best scores first, unscored applications last
+RANKED_ORDER = (
+    WorkerApplication.ai_score.is_(None),
+    WorkerApplication.ai_score.desc(),
+    WorkerApplication.created_at,
+)
+
 # ------------------------
 # Worker applies to job
 # ------------------------
 @application_bp.post("/")
+@limiter.limit(lambda: current_app.config["RATELIMIT_APPLY"])
 @login_required
 def apply_to_job(current_user):
     data = request.json
     job_id = data.get("job_id")
     cover_letter = data.get("cover_letter", "")
 
-    # Check if job exists
-    job = Job.query.get(job_id)
-    if not job:
-        return jsonify({"error": "Job not found"}), 404
+    # One conditional INSERT: applications are only taken while the job is
+    # open, including against a concurrent accept or cancel
+    try:
+        application_id = submit_application(job_id, current_user.id, cover_letter)
+    except TransitionError as err:
+        return jsonify({"error": str(err)}), err.status
 
-    # Prevent duplicate application
-    existing = WorkerApplication.query.filter_by(job_id=job_id, worker_id=current_user.id).first()
-    if existing:
-        return jsonify({"error": "You have already applied to this job"}), 400
+    # Scored in a batch off the request path; ai_score fills in shortly
+    request_scoring(job_id)
+    return jsonify({"message": "Application submitted", "application_id": application_id}), 201
+
+# ------------------------
+# Client hires an applicant / turns one down
+# ------------------------
+@application_bp.post("/<int:application_id>/accept")
+@login_required
+def accept(current_user, application_id):
+    # Compare-and-set UPDATEs: of concurrent accepts for one job exactly one
+    # wins, the rest get 409; repeating the winning accept returns 200 again
+    try:
+        result = accept_application(application_id, current_user.id)
+    except TransitionError as err:
+        return jsonify({"error": str(err)}), err.status
+    return jsonify({"message": "Application accepted", **result})
 
-    app = WorkerApplication(
-        job_id=job_id,
-        worker_id=current_user.id,
-        cover_letter=cover_letter
-    )
 
-    db.session.add(app)
-    db.session.commit()
-    return jsonify({"message": "Application submitted", "application_id": app.id}), 201
+@application_bp.post("/<int:application_id>/reject")
+@login_required
+def reject(current_user, application_id):
+    try:
+        reject_application(application_id, current_user.id)
+    except TransitionError as err:
+        return jsonify({"error": str(err)}), err.status
+    return jsonify({"message": "Application rejected"})
 
 # ------------------------
 # List applications for a job (client view)
@@ -50,13 +78,33 @@ def list_applications(current_user, job_id):
     if job.client_id != current_user.id:
         return jsonify({"error": "Unauthorized"}), 403
 
+    # Optional expansions, e.g. ?include=worker,profile
+    include = set(filter(None, request.args.get("include", "").split(",")))
+    unknown = include - {"worker", "profile"}
+    if unknown:
+        return jsonify({"error": f"Unknown include: {', '.join(sorted(unknown))}"}), 400
+
+    query = WorkerApplication.query.filter_by(job_id=job_id).order_by(*RANKED_ORDER)
+    # Batch-load expansions in one extra query each instead of one per row
+    if include:
+        worker_load = selectinload(WorkerApplication.worker)
+        if "profile" in include:
+            worker_load = worker_load.selectinload(User.worker_profile)
+        query = query.options(worker_load)
+
     result = []
-    for app in job.applications:
-        result.append({
+    for app in query:
+        item = {
             "id": app.id,
             "worker_id": app.worker_id,
             "cover_letter": app.cover_letter,
             "status": app.status,
             "ai_score": app.ai_score
-        })
+        }
+        if "worker" in include:
+            item["worker"] = app.worker.serialize_public()
+        if "profile" in include:
+            profile = app.worker.worker_profile
+            item["profile"] = profile.serialize() if profile else None
+        result.append(item)
     return jsonify(result)
@@ -1,42 +1,19 @@
 from flask import Blueprint, request, jsonify, current_app, make_response
 from app.models.user import User
-from app.extensions import db
-from app.utils.security import hash_password, verify_password, create_access_token, create_refresh_token, decode_token
+from app.extensions import db, limiter
+from app.utils.security import hash_password, verify_password, password_needs_rehash, create_access_token, create_refresh_token, decode_token, login_required
 from app.schemas import RegisterSchema, LoginSchema
 from marshmallow import ValidationError
-from flask import g
-from functools import wraps
-import datetime
 
 auth_bp = Blueprint("auth_bp", __name__, url_prefix="/auth")
 
-# -------------------------
-# AUTH DECORATOR
-# -------------------------
-
-
-def login_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = request.cookies.get("access_token")
-        if not token:
-            return jsonify({"error": "Authentication required"}), 401
-        try:
-            payload = decode_token(token)
-            user = User.query.get(payload["sub"])
-            if not user:
-                return jsonify({"error": "User not found"}), 404
-        except Exception as e:
-            return jsonify({"error": "Invalid or expired token"}), 401
-        return f(user, *args, **kwargs)
-    return decorated
-
 # -------------------------
 # REGISTER
 # -------------------------
 
 
 @auth_bp.post("/register")
+@limiter.limit(lambda: current_app.config["RATELIMIT_REGISTER"])
 def register():
     data = request.json or {}
     schema = RegisterSchema()
@@ -76,6 +53,7 @@ def register():
 
 
 @auth_bp.post("/login")
+@limiter.limit(lambda: current_app.config["RATELIMIT_LOGIN"])
 def login():
     data = request.json or {}
     schema = LoginSchema()
@@ -92,7 +70,12 @@ def login():
         if not user or not verify_password(user.password_hash, password):
             return jsonify({"error": "Invalid credentials"}), 401
 
-        access_token = create_access_token(user.id)
+        # Transparently upgrade hashes written with old cost parameters
+        if password_needs_rehash(user.password_hash):
+            user.password_hash = hash_password(password)
+            db.session.commit()
+
+        access_token = create_access_token(user.id, user.role, user.username)
         refresh_token = create_refresh_token(user.id)
 
         # Prepare JSON response: include tokens to simplify Postman testing.
@@ -137,10 +120,13 @@ def refresh():
         return jsonify({"error": "Refresh token missing"}), 401
     try:
         payload = decode_token(refresh_token)
-        user = User.query.get(payload["sub"])
+        if payload.get("type") != "refresh":
+            return jsonify({"error": "Invalid or expired refresh token"}), 401
+        # Refresh re-reads the user so role changes reach new access tokens
+        user = db.session.get(User, int(payload["sub"]))
         if not user:
             return jsonify({"error": "User not found"}), 404
-        new_access = create_access_token(user.id)
+        new_access = create_access_token(user.id, user.role, user.username)
     except Exception as e:
         return jsonify({"error": "Invalid or expired refresh token"}), 401
 
@@ -1,7 +1,22 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from sqlalchemy import tuple_, text
+from sqlalchemy.orm import selectinload
 from app.extensions import db
 from app.models.job import Job
 from app.utils.security import login_required
+from app.utils.geo import haversine_many, bounding_box, valid_coordinates
+from app.utils.pagination import (
+    encode_cursor, decode_cursor, parse_datetime, InvalidCursor)
+from app.utils.text import tokenize
+from app.utils.http_cache import cached_json, job_feed_key, job_item_key, invalidate_jobs
+from services.assignments import TransitionError, transition_job
+from services.geocoder import UnknownLocation, resolve_coordinates
+from services.match_index import get_match_index
+from services.search import get_search_backend, search_jobs
+from services.job_io import iter_records, import_jobs, export_jobs, UnsupportedFormat
+from services.job_stream import (
+    SSE_HEADERS, StreamParamError, ThreadSubscription, get_job_stream, iter_events,
+    parse_stream_args, publish_jobs)
 
 jobs_bp = Blueprint("jobs", __name__, url_prefix="/jobs")
 
@@ -18,14 +33,14 @@ def create_job(current_user):
         if field not in data:
             return jsonify({"error": f"Missing field: {field}"}), 400
 
-    # Accept either explicit lat/lng or a location string. For testing, if lat/lng
-    # are not provided, store 0.0 and keep the original location in metadata.
-    location_lat = data.get("location_lat")
-    location_lng = data.get("location_lng")
+    # Accept either explicit lat/lng or a location string, geocoded offline.
+    # The original string is kept in metadata either way.
     location_str = data.get("location")
-    if location_lat is None or location_lng is None:
-        location_lat = 0.0
-        location_lng = 0.0
+    try:
+        location_lat, location_lng = resolve_coordinates(
+            location_str, data.get("location_lat"), data.get("location_lng"))
+    except UnknownLocation as err:
+        return jsonify({"error": str(err), "suggestions": err.suggestions}), 400
 
     job = Job(
         title=data["title"],
@@ -38,44 +53,402 @@ def create_job(current_user):
     )
 
     db.session.add(job)
+    db.session.flush()
+    get_search_backend().index_job(job)
     db.session.commit()
+    invalidate_jobs()
+    serialized = job.serialize()
+    publish_jobs([serialized])
+
+    return jsonify({"message": "Job created", "job": serialized}), 201
+
+
+# ---------------- BULK IMPORT / EXPORT ---------------- #
+@jobs_bp.post("/bulk")
+@login_required
+def bulk_import_jobs(current_user):
+    """Import NDJSON or CSV rows (same fields as create_job) as the current user."""
+    try:
+        records = iter_records(request.stream, request.mimetype)
+        result = import_jobs(records, current_user.id)
+    except UnsupportedFormat as e:
+        return jsonify({"error": str(e)}), 415
 
-    return jsonify({"message": "Job created", "job": job.serialize()}), 201
+    if result["inserted"]:
+        invalidate_jobs()
+    status = 201 if result["inserted"] else 400
+    return jsonify({"message": "Bulk import finished", **result}), status
+
+
+@jobs_bp.get("/export")
+@login_required
+def export_my_jobs(current_user):
+    status = request.args.get("status")
+    if status and status not in JOB_STATUSES:
+        return jsonify({"error": f"status must be one of {', '.join(JOB_STATUSES)}"}), 400
+    # direct_passthrough: after_request hooks sizing the body must not buffer it
+    return Response(stream_with_context(export_jobs(current_user.id, status)),
+                    mimetype="application/x-ndjson", direct_passthrough=True)
 
 
 # ---------------- GET ALL JOBS ---------------- #
+JOB_STATUSES = ("open", "assigned", "completed", "cancelled")
+MAX_RADIUS_KM = 50.0
+JOB_INCLUDES = ("client", "worker")
+
+
+class FeedParamError(ValueError):
+    pass
+
+
+def _parse_include(args):
+    include = set(filter(None, args.get("include", "").split(",")))
+    unknown = include - set(JOB_INCLUDES)
+    if unknown:
+        raise FeedParamError(f"Unknown include: {', '.join(sorted(unknown))}")
+    return include
+
+
+def _include_options(include):
+    """Batch loaders for ?include=client,worker so each adds one query, not one per job."""
+    return [selectinload(getattr(Job, name)) for name in sorted(include)]
+
+
+def _job_rows(query, include):
+    """
+    Without expansions, select plain column tuples: rows skip ORM identity
+    map and instance-state bookkeeping and serialize the same way.
+    """
+    if include:
+        return query.options(*_include_options(include))
+    return query.with_entities(*Job.row_columns())
+
+
+def _serialize_job(job, include):
+    item = Job.serialize_row(job)
+    for name in include:
+        related = getattr(job, name)
+        item[name] = related.serialize_public() if related else None
+    return item
+
+
+def parse_feed_args(args):
+    """Validate the job feed query string into a plain dict."""
+    try:
+        params = {
+            "per_page": int(args.get("per_page", 20)),
+            "page": int(args["page"]) if "page" in args else None,
+            "lat": float(args["lat"]) if "lat" in args else None,
+            "lng": float(args["lng"]) if "lng" in args else None,
+            "radius_km": float(args["radius_km"]) if "radius_km" in args else None,
+            "min_price": float(args["min_price"]) if "min_price" in args else None,
+            "max_price": float(args["max_price"]) if "max_price" in args else None,
+        }
+    except ValueError:
+        raise FeedParamError("Invalid pagination or filter parameters")
+
+    params["per_page"] = min(max(params["per_page"], 1), 100)
+    params["status"] = args.get("status")
+    params["sort"] = args.get("sort", "newest")
+    params["cursor"] = args.get("cursor")
+    params["include_total"] = args.get("include_total")
+    params["include"] = _parse_include(args)
+
+    if params["status"] and params["status"] not in JOB_STATUSES:
+        raise FeedParamError(f"status must be one of {', '.join(JOB_STATUSES)}")
+    if params["sort"] not in ("newest", "distance"):
+        raise FeedParamError("sort must be 'newest' or 'distance'")
+    if params["include_total"] not in (None, "exact", "estimate"):
+        raise FeedParamError("include_total must be 'exact' or 'estimate'")
+
+    has_point = params["lat"] is not None or params["lng"] is not None
+    if has_point and not valid_coordinates(params["lat"], params["lng"]):
+        raise FeedParamError("lat & lng must both be valid coordinates")
+    if params["radius_km"] is not None:
+        if not has_point:
+            raise FeedParamError("radius_km requires lat & lng")
+        if params["radius_km"] <= 0:
+            raise FeedParamError("radius_km must be positive")
+        params["radius_km"] = min(params["radius_km"], MAX_RADIUS_KM)
+    if params["sort"] == "distance":
+        if not has_point:
+            raise FeedParamError("sort=distance requires lat & lng")
+        params["radius_km"] = params["radius_km"] or MAX_RADIUS_KM
+    return params
+
+
+def feed_filters(params):
+    """SQL criteria for the status, price and bounding-box feed filters."""
+    criteria = []
+    if params["status"]:
+        criteria.append(Job.status == params["status"])
+    if params["min_price"] is not None:
+        criteria.append(Job.price >= params["min_price"])
+    if params["max_price"] is not None:
+        criteria.append(Job.price <= params["max_price"])
+    if params["radius_km"] is not None:
+        min_lat, max_lat, min_lng, max_lng = bounding_box(
+            params["lat"], params["lng"], params["radius_km"])
+        criteria.append(Job.location_lat.between(min_lat, max_lat))
+        criteria.append(Job.location_lng.between(min_lng, max_lng))
+    return criteria
+
+
+def feed_cursor_key(params):
+    """(created_at, id) position encoded in a newest-first cursor, or None."""
+    if not params["cursor"]:
+        return None
+    position = decode_cursor(params["cursor"])
+    try:
+        return (parse_datetime(position["created_at"]), int(position["id"]))
+    except (KeyError, TypeError, ValueError):
+        raise InvalidCursor("Malformed cursor")
+
+
+def _filtered_jobs(params):
+    """Base query with status, price and bounding-box filters applied."""
+    return Job.query.filter(*feed_filters(params))
+
+
+def _distances(params, jobs):
+    if params["lat"] is None or not jobs:
+        return [None] * len(jobs)
+    return haversine_many(params["lat"], params["lng"],
+                          [j.location_lat for j in jobs],
+                          [j.location_lng for j in jobs]).tolist()
+
+
+def _newest_page(query, params):
+    """
+    Keyset pagination over (created_at, id) descending. Each page seeks
+    straight to the cursor position via the index instead of scanning
+    and discarding OFFSET rows.
+    """
+    per_page = params["per_page"]
+    ordered = _job_rows(query, params["include"]).order_by(
+        Job.created_at.desc(), Job.id.desc())
+    key = feed_cursor_key(params)
+    batch_query = ordered
+    if key is not None:
+        batch_query = ordered.filter(tuple_(Job.created_at, Job.id) < key)
+    elif params["page"] is not None:
+        # Legacy page-number access; still OFFSET based for the first batch
+        batch_query = ordered.offset((max(params["page"], 1) - 1) * per_page)
+
+    # Rows in the bounding box corners fail the exact radius check, so keep
+    # pulling batches until the page (plus one look-ahead row) is full.
+    page = []
+    batch_size = per_page + 1
+    while len(page) <= per_page:
+        batch = batch_query.limit(batch_size).all()
+        for job, dist in zip(batch, _distances(params, batch)):
+            if params["radius_km"] is None or dist <= params["radius_km"]:
+                page.append((job, dist))
+        if len(batch) < batch_size:
+            break
+        key = (batch[-1].created_at, batch[-1].id)
+        batch_query = ordered.filter(tuple_(Job.created_at, Job.id) < key)
+        batch_size = per_page * 2
+
+    next_cursor = None
+    if len(page) > per_page:
+        page = page[:per_page]
+        last = page[-1][0]
+        next_cursor = encode_cursor({"created_at": last.created_at, "id": last.id})
+    return page, next_cursor
+
+
+def _distance_page(query, params):
+    """
+    Nearest-first ordering. Candidates are bounded by the radius box, so
+    only (id, lat, lng) are loaded for ranking and full rows are fetched
+    for the requested page alone.
+    """
+    per_page = params["per_page"]
+    offset = 0
+    if params["cursor"]:
+        try:
+            offset = int(decode_cursor(params["cursor"])["offset"])
+        except (KeyError, TypeError, ValueError):
+            raise InvalidCursor("Malformed cursor")
+    elif params["page"] is not None:
+        offset = (max(params["page"], 1) - 1) * per_page
+
+    candidates = query.with_entities(
+        Job.id, Job.location_lat, Job.location_lng).all()
+    ranked = []
+    if candidates:
+        dists = haversine_many(params["lat"], params["lng"],
+                               [c.location_lat for c in candidates],
+                               [c.location_lng for c in candidates])
+        ranked = sorted((float(d), c.id) for d, c in zip(dists, candidates)
+                        if d <= params["radius_km"])
+
+    window = ranked[offset:offset + per_page]
+    jobs = {j.id: j for j in _job_rows(Job.query, params["include"]).filter(
+        Job.id.in_([i for _, i in window]))}
+    page = [(jobs[i], d) for d, i in window if i in jobs]
+    next_cursor = None
+    if offset + per_page < len(ranked):
+        next_cursor = encode_cursor({"offset": offset + per_page})
+    return page, next_cursor
+
+
+def _total(query, params):
+    if params["include_total"] == "estimate" and db.engine.dialect.name == "postgresql":
+        unfiltered = not (params["status"] or params["radius_km"] is not None
+                          or params["min_price"] is not None
+                          or params["max_price"] is not None)
+        if unfiltered:
+            # Planner statistics; avoids a full COUNT(*) on a large table
+            estimate = db.session.execute(text(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = 'jobs'"
+            )).scalar()
+            if estimate is not None and estimate >= 0:
+                return int(estimate)
+    # Bounding-box rows outside the radius are included in this count
+    return query.order_by(None).count()
+
+
 @jobs_bp.get("/")
 def get_all_jobs():
-    # Pagination support
+    # Revalidated by ETag and served from the response cache until a job write
+    return cached_json(job_feed_key(), _build_feed)
+
+
+def _build_feed():
     try:
-        page = int(request.args.get("page", 1))
-        per_page = int(request.args.get("per_page", 20))
-    except ValueError:
-        return jsonify({"error": "Invalid pagination parameters"}), 400
+        params = parse_feed_args(request.args)
+        query = _filtered_jobs(params)
+        if params["sort"] == "distance":
+            page, next_cursor = _distance_page(query, params)
+        else:
+            page, next_cursor = _newest_page(query, params)
+    except (FeedParamError, InvalidCursor) as e:
+        return jsonify({"error": str(e)}), 400, None
 
-    if per_page > 100:
-        per_page = 100
+    items = []
+    for job, dist in page:
+        item = _serialize_job(job, params["include"])
+        if dist is not None:
+            item["distance_km"] = round(dist, 3)
+        items.append(item)
 
-    pagination = Job.query.paginate(
-        page=page, per_page=per_page, error_out=False)
-    jobs = pagination.items
     result = {
-        "items": [job.serialize() for job in jobs],
-        "page": page,
-        "per_page": per_page,
-        "total": pagination.total,
-        "pages": pagination.pages,
+        "items": items,
+        "per_page": params["per_page"],
+        "next_cursor": next_cursor,
     }
-    return jsonify(result), 200
+    if params["page"] is not None:
+        result["page"] = params["page"]
+    if params["include_total"]:
+        result["total"] = _total(query, params)
+    # No Last-Modified: a job deleted, assigned or cancelled leaves the page
+    # and its newest updated_at can go back, so If-Modified-Since would 304
+    # a changed page. The body-hash ETag covers revalidation.
+    return jsonify(result), 200, None
+
+
+# ---------------- LIVE JOB STREAM ---------------- #
+@jobs_bp.get("/stream")
+def stream_jobs():
+    """Server-Sent Events: each job created within radius_km of lat/lng."""
+    try:
+        lat, lng, radius_km = parse_stream_args(request.args, MAX_RADIUS_KM)
+    except StreamParamError as e:
+        return jsonify({"error": str(e)}), 400
+
+    config = current_app.config
+    if not config["JOB_STREAM_MAX_WSGI_STREAMS"]:
+        return jsonify({"error": "The job stream is only served by the ASGI app"}), 503
+    broker = get_job_stream()
+    # Holds this worker thread until the client disconnects; the hub caps
+    # how many threads streams may take (JOB_STREAM_MAX_WSGI_STREAMS)
+    sub = ThreadSubscription(lat, lng, radius_km, config["JOB_STREAM_QUEUE_SIZE"])
+    if not broker.hub.subscribe(sub):
+        return jsonify({"error": "Too many open streams, retry later"}), 503
+    broker.start()
+    return Response(iter_events(broker.hub, sub, config["JOB_STREAM_HEARTBEAT"]),
+                    mimetype="text/event-stream", headers=SSE_HEADERS, direct_passthrough=True)
+
+
+# ---------------- SEARCH JOBS ---------------- #
+@jobs_bp.get("/search")
+def search():
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "q query param required"}), 400
+
+    try:
+        limit = min(max(int(request.args.get("limit", 20)), 1), 50)
+        lat = request.args.get("lat", type=float)
+        lng = request.args.get("lng", type=float)
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+    if (lat is not None or lng is not None) and not valid_coordinates(lat, lng):
+        return jsonify({"error": "lat & lng must both be valid coordinates"}), 400
+
+    status = request.args.get("status")
+    if status and status not in JOB_STATUSES:
+        return jsonify({"error": f"status must be one of {', '.join(JOB_STATUSES)}"}), 400
+
+    items = []
+    for job, score, dist in search_jobs(q, lat, lng, status, limit):
+        item = job.serialize()
+        item["score"] = round(score, 4)
+        if dist is not None:
+            item["distance_km"] = round(dist, 3)
+        items.append(item)
+    return jsonify({"items": items, "q": q}), 200
 
 
 # ---------------- GET SINGLE JOB ---------------- #
 @jobs_bp.get("/<int:job_id>")
 def get_single_job(job_id):
-    job = Job.query.get(job_id)
+    def build():
+        try:
+            include = _parse_include(request.args)
+        except FeedParamError as e:
+            return jsonify({"error": str(e)}), 400, None
+        job = db.session.get(Job, job_id, options=_include_options(include))
+        if not job:
+            return jsonify({"error": "Job not found"}), 404, None
+        return jsonify(_serialize_job(job, include)), 200, job.updated_at
+
+    return cached_json(job_item_key(job_id), build)
+
+
+# ---------------- RECOMMENDED WORKERS ---------------- #
+@jobs_bp.get("/<int:job_id>/recommended-workers")
+@login_required
+def recommended_workers(current_user, job_id):
+    job = db.session.get(Job, job_id)
     if not job:
         return jsonify({"error": "Job not found"}), 404
-    return jsonify(job.serialize()), 200
+
+    if job.client_id != current_user.id:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    try:
+        limit = min(max(int(request.args.get("limit", 10)), 1), 50)
+        radius_km = request.args.get("radius_km", type=float)
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+
+    # Jobs without real coordinates are stored at (0, 0)
+    has_location = bool(job.location_lat or job.location_lng)
+    matches = get_match_index().recommend(
+        set(tokenize(f"{job.title} {job.description}")),
+        job.location_lat if has_location else None,
+        job.location_lng if has_location else None,
+        limit=limit,
+        radius_km=radius_km if has_location else None,
+    )
+    return jsonify([{
+        "worker_id": worker_id,
+        "score": round(score, 4),
+        "distance_km": round(dist, 3) if dist is not None else None,
+    } for worker_id, score, dist in matches]), 200
 
 
 # ---------------- UPDATE JOB ---------------- #
@@ -91,19 +464,48 @@ def update_job(current_user, job_id):
     if job.client_id != current_user.id:
         return jsonify({"error": "Unauthorized"}), 403
 
+    # A new location without coordinates moves the job to the geocoded place
+    if data.get("location") and (data.get("location_lat") is None
+                                 or data.get("location_lng") is None):
+        try:
+            data["location_lat"], data["location_lng"] = resolve_coordinates(data["location"])
+        except UnknownLocation as err:
+            return jsonify({"error": str(err), "suggestions": err.suggestions}), 400
+
     job.title = data.get("title", job.title)
     job.description = data.get("description", job.description)
     job.price = data.get("price", job.price)
     job.location_lat = data.get("location_lat", job.location_lat)
     job.location_lng = data.get("location_lng", job.location_lng)
     if data.get("location"):
-        job.job_metadata = job.job_metadata or {}
-        job.job_metadata["location"] = data.get("location")
+        # Assign a new dict: in-place edits of a JSON column are not tracked
+        job.job_metadata = {**(job.job_metadata or {}), "location": data.get("location")}
 
+    get_search_backend().index_job(job)
     db.session.commit()
+    invalidate_jobs(job.id)
     return jsonify({"message": "Job updated", "job": job.serialize()}), 200
 
 
+# ---------------- STATUS TRANSITIONS ---------------- #
+# Assignment happens by accepting an application (POST /api/applications/<id>/accept)
+JOB_TRANSITIONS = {
+    "complete": (("assigned",), "completed"),
+    "cancel": (("open", "assigned"), "cancelled"),
+}
+
+
+@jobs_bp.post("/<int:job_id>/<any(complete, cancel):action>")
+@login_required
+def change_job_status(current_user, job_id, action):
+    from_statuses, to_status = JOB_TRANSITIONS[action]
+    try:
+        transition_job(job_id, current_user.id, from_statuses, to_status)
+    except TransitionError as err:
+        return jsonify({"error": str(err)}), err.status
+    return jsonify({"message": f"Job {to_status}", "status": to_status})
+
+
 # ---------------- DELETE JOB ---------------- #
 @jobs_bp.delete("/<int:job_id>")
 @login_required
@@ -115,6 +517,8 @@ def delete_job(current_user, job_id):
     if job.client_id != current_user.id:
         return jsonify({"error": "Unauthorized"}), 403
 
+    get_search_backend().remove_job(job.id)
     db.session.delete(job)
     db.session.commit()
+    invalidate_jobs(job_id)
     return jsonify({"message": "Job deleted"}), 200
@@ -0,0 +1,91 @@
+from flask import Blueprint, request, jsonify
+from marshmallow import ValidationError
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import Review, WorkerProfile
+from app.models.job import Job
+from app.schemas import ReviewCreateSchema
+from app.utils.pagination import encode_cursor, decode_cursor, parse_datetime, InvalidCursor
+from app.utils.security import login_required
+from services.match_index import sync_rating
+from services.reviews import ReviewError, add_review
+
+reviews_bp = Blueprint("reviews_bp", __name__, url_prefix="/reviews")
+
+# ------------------------
+# Client reviews the worker on their job
+# ------------------------
+@reviews_bp.post("/")
+@login_required
+def create_review(current_user):
+    try:
+        data = ReviewCreateSchema().load(request.json or {})
+    except ValidationError as err:
+        return jsonify({"error": "Invalid input", "details": err.messages}), 400
+
+    job = db.session.get(Job, data["job_id"])
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    # Review insert and rating aggregates commit together or not at all;
+    # the job_id unique constraint rejects a second review, concurrent or not
+    try:
+        review, profile = add_review(job, current_user.id, data["rating"], data["comment"])
+        db.session.commit()
+    except ReviewError as err:
+        db.session.rollback()
+        return jsonify({"error": str(err)}), err.status
+    except IntegrityError:
+        db.session.rollback()
+        if Review.query.filter_by(job_id=job.id).first():
+            return jsonify({"error": "This job has already been reviewed"}), 400
+        raise
+
+    sync_rating(profile.id, profile.rating)
+    return jsonify({
+        "message": "Review submitted",
+        "review": review.serialize(),
+        "worker": {"rating": profile.rating, "rating_count": profile.rating_count},
+    }), 201
+
+# ------------------------
+# A worker's reviews, newest first
+# ------------------------
+@reviews_bp.get("/worker/<int:worker_id>")
+def list_worker_reviews(worker_id):
+    """worker_id is the worker's user id, as on jobs and applications."""
+    try:
+        per_page = min(max(int(request.args.get("per_page", 20)), 1), 100)
+    except ValueError:
+        return jsonify({"error": "per_page must be an integer"}), 400
+
+    # Keyset over (created_at, id) on ix_reviews_worker_created_at
+    query = Review.query.filter_by(worker_id=worker_id).order_by(
+        Review.created_at.desc(), Review.id.desc())
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            key = (parse_datetime(position["created_at"]), int(position["id"]))
+        except (InvalidCursor, KeyError, TypeError, ValueError):
+            return jsonify({"error": "Malformed cursor"}), 400
+        query = query.filter(tuple_(Review.created_at, Review.id) < key)
+
+    reviews = query.limit(per_page + 1).all()
+    next_cursor = None
+    if len(reviews) > per_page:
+        reviews = reviews[:per_page]
+        last = reviews[-1]
+        next_cursor = encode_cursor({"created_at": last.created_at, "id": last.id})
+
+    # Summary comes from the denormalized profile columns, not an aggregate
+    profile = db.session.execute(
+        select(WorkerProfile.rating, WorkerProfile.rating_count)
+        .where(WorkerProfile.user_id == worker_id)).first()
+    return jsonify({
+        "items": [r.serialize() for r in reviews],
+        "next_cursor": next_cursor,
+        "rating": profile.rating if profile else None,
+        "rating_count": profile.rating_count if profile else 0,
+    })
@@ -1,6 +1,17 @@
-from flask import Blueprint, request, jsonify
-from app.models import WorkerProfile
+from datetime import datetime
+import numpy as np
+from flask import Blueprint, current_app, request, jsonify
+from marshmallow import ValidationError
+from sqlalchemy import select
+from app.models import AvailabilityException, AvailabilitySlot, WorkerProfile
 from app.extensions import db
+from app.schemas import AvailabilityExceptionSchema, ScheduleSchema
+from app.utils.geo import haversine_many, bounding_box, valid_coordinates
+from app.utils.security import login_required
+from app.utils.text import parse_skills
+from services.availability import (
+    AvailabilityParamError, get_availability_index, parse_window, sync_availability)
+from services.match_index import sync_worker
 
 worker_bp = Blueprint('worker_bp', __name__, url_prefix="/workers")
 
@@ -15,9 +26,12 @@ def get_worker(worker_id):
 
     return jsonify({
         "id": worker.id,
+        "user_id": worker.user_id,
         "skills": worker.skills,
         "bio": worker.bio,
+        # Denormalized by the review insert; no aggregate over reviews here
         "rating": worker.rating,
+        "rating_count": worker.rating_count,
         "is_available": worker.is_available,
         "available_hours": worker.available_hours,
         "location": {
@@ -41,10 +55,12 @@ def update_skills(worker_id):
     if not worker:
         return jsonify({"error": "Worker not found"}), 404
 
-    worker.skills = new_skills
+    # Stored as comma separated text
+    worker.skills = ",".join(parse_skills(new_skills))
     db.session.commit()
+    sync_worker(worker)
 
-    return jsonify({"message": "Skills updated", "skills": worker.skills})
+    return jsonify({"message": "Skills updated", "skills": parse_skills(worker.skills)})
 
 # -------------------------------
 # Toggle availability
@@ -62,6 +78,8 @@ def update_availability(worker_id):
     worker.available_hours = hours
 
     db.session.commit()
+    sync_worker(worker)
+    sync_availability(worker)
 
     return jsonify({
         "message": "Availability updated",
@@ -80,43 +98,245 @@ def update_location(worker_id):
 
     if lat is None or lng is None:
         return jsonify({"error": "lat & lng required"}), 400
+    if not valid_coordinates(lat, lng):
+        return jsonify({"error": "lat/lng out of range"}), 400
 
     worker = WorkerProfile.query.get(worker_id)
     if not worker:
         return jsonify({"error": "Worker not found"}), 404
 
-    worker.latitude = lat
-    worker.longitude = lng
+    worker.latitude = float(lat)
+    worker.longitude = float(lng)
     db.session.commit()
+    sync_worker(worker)
 
     return jsonify({"message": "Location updated"})
 
 # -------------------------------
-# Nearby workers (simple radius)
+# Weekly schedule and one-off exceptions
 # -------------------------------
+def _own_profile(worker_id, current_user):
+    """(profile, None) when current_user owns it, else (None, error response)."""
+    worker = db.session.get(WorkerProfile, worker_id)
+    if not worker:
+        return None, (jsonify({"error": "Worker not found"}), 404)
+    if worker.user_id != current_user.id:
+        return None, (jsonify({"error": "Unauthorized"}), 403)
+    return worker, None
+
+
+@worker_bp.get("/<int:worker_id>/schedule")
+def get_schedule(worker_id):
+    if not db.session.get(WorkerProfile, worker_id):
+        return jsonify({"error": "Worker not found"}), 404
+
+    slots = AvailabilitySlot.query.filter_by(worker_id=worker_id).order_by(
+        AvailabilitySlot.weekday, AvailabilitySlot.start_minute)
+    exceptions = AvailabilityException.query.filter(
+        AvailabilityException.worker_id == worker_id,
+        AvailabilityException.ends_at > datetime.utcnow(),
+    ).order_by(AvailabilityException.starts_at)
+    return jsonify({
+        "timezone": current_app.config["AVAILABILITY_TIMEZONE"],
+        "slots": [s.serialize() for s in slots],
+        "exceptions": [e.serialize() for e in exceptions],
+    })
+
+
+@worker_bp.put("/<int:worker_id>/schedule")
+@login_required
+def replace_schedule(current_user, worker_id):
+    """Replace the weekly slots: {"slots": [{"weekday": 0, "start": "08:00", "end": "17:00"}]}"""
+    worker, error = _own_profile(worker_id, current_user)
+    if error:
+        return error
+    try:
+        data = ScheduleSchema().load(request.json or {})
+    except ValidationError as err:
+        return jsonify({"error": "Invalid input", "details": err.messages}), 400
+
+    AvailabilitySlot.query.filter_by(worker_id=worker_id).delete(synchronize_session=False)
+    db.session.add_all(AvailabilitySlot(worker_id=worker_id, **slot) for slot in data["slots"])
+    db.session.commit()
+    sync_availability(worker)
+
+    return jsonify({"message": "Schedule updated", "slots": len(data["slots"])})
+
+
+@worker_bp.post("/<int:worker_id>/exceptions")
+@login_required
+def add_exception(current_user, worker_id):
+    """Time off ("available": false) or extra hours outside the weekly slots."""
+    worker, error = _own_profile(worker_id, current_user)
+    if error:
+        return error
+    try:
+        data = AvailabilityExceptionSchema().load(request.json or {})
+    except ValidationError as err:
+        return jsonify({"error": "Invalid input", "details": err.messages}), 400
+
+    exception = AvailabilityException(worker_id=worker_id, **data)
+    db.session.add(exception)
+    db.session.commit()
+    sync_availability(worker)
+
+    return jsonify(exception.serialize()), 201
+
+
+@worker_bp.delete("/<int:worker_id>/exceptions/<int:exception_id>")
+@login_required
+def delete_exception(current_user, worker_id, exception_id):
+    worker, error = _own_profile(worker_id, current_user)
+    if error:
+        return error
+    deleted = AvailabilityException.query.filter_by(
+        id=exception_id, worker_id=worker_id).delete(synchronize_session=False)
+    if not deleted:
+        return jsonify({"error": "Exception not found"}), 404
+    db.session.commit()
+    sync_availability(worker)
+
+    return jsonify({"message": "Exception deleted"})
+
+# -------------------------------
+# Nearby workers (bounding box + haversine)
+# -------------------------------
+DEFAULT_RADIUS_KM = 3.0
+MAX_RADIUS_KM = 50.0
+NEARBY_SORTS = ("distance", "rating")
+# Up to this many workers free in the requested window are pushed into the
+# box query as an id list; past it the box query's rows are filtered instead
+AVAILABLE_IN_LIST_MAX = 500
+
+
+class NearbyParamError(ValueError):
+    pass
+
+
+def parse_nearby_args(args):
+    """
+    Validate lat/lng/radius_km/sort/page/per_page and the optional
+    available_from/available_until window for the nearby-workers query.
+    """
+    lat = args.get("lat", type=float)
+    lng = args.get("lng", type=float)
+
+    if lat is None or lng is None:
+        raise NearbyParamError("lat & lng query params required")
+    if not valid_coordinates(lat, lng):
+        raise NearbyParamError("lat/lng out of range")
+
+    try:
+        radius_km = float(args.get("radius_km", DEFAULT_RADIUS_KM))
+        page = int(args.get("page", 1))
+        per_page = int(args.get("per_page", 20))
+    except ValueError:
+        raise NearbyParamError("Invalid radius or pagination parameters")
+
+    if radius_km <= 0:
+        raise NearbyParamError("radius_km must be positive")
+    sort = args.get("sort", "distance")
+    if sort not in NEARBY_SORTS:
+        raise NearbyParamError(f"sort must be one of: {', '.join(NEARBY_SORTS)}")
+    try:
+        window = parse_window(args)
+    except AvailabilityParamError as e:
+        raise NearbyParamError(str(e))
+    return {
+        "lat": lat,
+        "lng": lng,
+        "radius_km": min(radius_km, MAX_RADIUS_KM),
+        "sort": sort,
+        "window": window,
+        "page": max(page, 1),
+        "per_page": min(max(per_page, 1), 100),
+    }
+
+
+def nearby_statement(params):
+    """Index-backed prefilter: only rows inside the enclosing box are loaded."""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(
+        params["lat"], params["lng"], params["radius_km"])
+    return select(
+        WorkerProfile.id,
+        WorkerProfile.skills,
+        WorkerProfile.latitude,
+        WorkerProfile.longitude,
+        WorkerProfile.rating,
+        WorkerProfile.rating_count,
+    ).where(
+        WorkerProfile.latitude.between(min_lat, max_lat),
+        WorkerProfile.longitude.between(min_lng, max_lng),
+    )
+
+
+def rank_nearby(candidates, params):
+    """
+    Exact distance on the candidate set in one vectorized pass, then sort
+    and paginate into the response body. sort=rating orders by the stored
+    rating (unrated workers last), nearest first among equals.
+    """
+    matches = []
+    if candidates:
+        dists = haversine_many(params["lat"], params["lng"],
+                               [c.latitude for c in candidates],
+                               [c.longitude for c in candidates])
+        order = dists.argsort(kind="stable")
+        matches = [(float(dists[i]), candidates[i]) for i in order
+                   if dists[i] <= params["radius_km"]]
+        if params["sort"] == "rating":
+            # Stable: distance order is kept within equal ratings
+            matches.sort(key=lambda m: (m[1].rating is None, -(m[1].rating or 0)))
+
+    page, per_page = params["page"], params["per_page"]
+    start = (page - 1) * per_page
+    items = [{
+        "id": w.id,
+        "skills": w.skills,
+        "lat": w.latitude,
+        "lng": w.longitude,
+        "rating": w.rating,
+        "rating_count": w.rating_count,
+        "distance_km": round(dist, 3)
+    } for dist, w in matches[start:start + per_page]]
+
+    return {
+        "items": items,
+        "page": page,
+        "per_page": per_page,
+        "total": len(matches),
+        "radius_km": params["radius_km"],
+        "sort": params["sort"],
+    }
+
+
 @worker_bp.get("/")
 def workers_nearby():
-    lat = request.args.get("lat", type=float)
-    lng = request.args.get("lng", type=float)
+    try:
+        params = parse_nearby_args(request.args)
+    except NearbyParamError as e:
+        return jsonify({"error": str(e)}), 400
 
-    if lat is None or lng is None:
-        return jsonify({"error": "lat & lng query params required"}), 400
-
-    workers = WorkerProfile.query.all()
-
-    results = []
-    for w in workers:
-        if w.latitude is None or w.longitude is None:
-            continue
-
-        dist = ((w.latitude - lat)**2 + (w.longitude - lng)**2) ** 0.5
-        if dist <= 0.05:  # approx 3km (placeholder)
-            results.append({
-                "id": w.id,
-                "skills": w.skills,
-                "lat": w.latitude,
-                "lng": w.longitude,
-                "distance": round(dist, 4)
-            })
-
-    return jsonify(results)
+    statement = nearby_statement(params)
+    if params["window"] is None:
+        candidates = db.session.execute(statement).all()
+    else:
+        candidates = available_candidates(statement, *params["window"])
+    return jsonify(rank_nearby(candidates, params))
+
+
+def available_candidates(statement, start, end):
+    """
+    Box query rows restricted to workers free for all of [start, end).
+    The availability index answers which workers are free; the cheaper
+    side of the two narrows the other.
+    """
+    free = get_availability_index().free_workers(start, end)
+    if len(free) <= AVAILABLE_IN_LIST_MAX:
+        if not len(free):
+            return []
+        return db.session.execute(statement.where(WorkerProfile.id.in_(free.tolist()))).all()
+    rows = db.session.execute(statement).all()
+    keep = np.isin(np.fromiter((r.id for r in rows), dtype=np.int64, count=len(rows)), free,
+                   assume_unique=True)
+    return [r for r, k in zip(rows, keep) if k]
@@ -0,0 +1,177 @@
+import logging
+import queue
+import threading
+
+import click
+import numpy as np
+from flask import current_app
+from sqlalchemy import update
+
+from app.extensions import db
+from app.models.application import WorkerApplication
+from app.models.job import Job
+from app.models.worker_profile import WorkerProfile
+from app.utils.geo import haversine_many
+from app.utils.text import tokenize, skill_tokens
+
+logger = logging.getLogger(__name__)
+
+# Feature weights; scores land in [0, 1]
+SKILL_WEIGHT = 0.6
+DISTANCE_WEIGHT = 0.25
+RATING_WEIGHT = 0.15
+# Distance at which the proximity feature decays to 1/e
+DISTANCE_SCALE_KM = 10.0
+# Neutral value for features that cannot be computed (no skills/location/reviews)
+NEUTRAL = 0.5
+
+
+# -------- SCORING -------- #
+
+def score_features(job_tokens: set, worker_skills: list, distances_km, ratings=None):
+    """
+    Vectorized application scores.
+
+    job_tokens: tokens of the job title and description.
+    worker_skills: one skill-token set per application.
+    distances_km: array of job-to-worker distances, NaN when unknown.
+    ratings: array of the workers' stored 1-5 ratings, NaN when unrated.
+    """
+    n = len(worker_skills)
+    skill = np.full(n, NEUTRAL)
+    if job_tokens:
+        # Share of the worker's skill tokens mentioned in the job; a worker
+        # who listed no skills is unknown, not a mismatch
+        sizes = np.fromiter((len(s) for s in worker_skills), dtype=float, count=n)
+        hits = np.fromiter((len(s & job_tokens) for s in worker_skills), dtype=float, count=n)
+        has_skills = sizes > 0
+        skill = np.where(has_skills, hits / np.maximum(sizes, 1.0), NEUTRAL)
+
+    distances_km = np.asarray(distances_km, dtype=float)
+    proximity = np.where(np.isnan(distances_km), NEUTRAL,
+                         np.exp(-np.nan_to_num(distances_km) / DISTANCE_SCALE_KM))
+
+    ratings = np.full(n, np.nan) if ratings is None else np.asarray(ratings, dtype=float)
+    reputation = np.where(np.isnan(ratings), NEUTRAL, (np.nan_to_num(ratings) - 1) / 4)
+
+    return SKILL_WEIGHT * skill + DISTANCE_WEIGHT * proximity + RATING_WEIGHT * reputation
+
+
+def score_job_applications(job_id: int) -> int:
+    """Score every pending application of a job in one batch. Returns the count."""
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return 0
+
+    rows = db.session.query(
+        WorkerApplication.id,
+        WorkerProfile.skills,
+        WorkerProfile.latitude,
+        WorkerProfile.longitude,
+        WorkerProfile.rating,
+    ).outerjoin(
+        WorkerProfile, WorkerProfile.user_id == WorkerApplication.worker_id
+    ).filter(
+        WorkerApplication.job_id == job_id,
+        WorkerApplication.status == "pending",
+    ).all()
+    if not rows:
+        return 0
+
+    job_tokens = set(tokenize(f"{job.title} {job.description}"))
+    skills = [skill_tokens(r.skills) for r in rows]
+    lats = np.array([np.nan if r.latitude is None else r.latitude for r in rows])
+    lngs = np.array([np.nan if r.longitude is None else r.longitude for r in rows])
+    # Jobs without real coordinates are stored at (0, 0)
+    if job.location_lat or job.location_lng:
+        distances = haversine_many(job.location_lat, job.location_lng, lats, lngs)
+    else:
+        distances = np.full(len(rows), np.nan)
+
+    ratings = [np.nan if r.rating is None else r.rating for r in rows]
+
+    scores = score_features(job_tokens, skills, distances, ratings)
+    db.session.execute(
+        update(WorkerApplication),
+        [{"id": r.id, "ai_score": round(float(s), 4)} for r, s in zip(rows, scores)],
+    )
+    db.session.commit()
+    return len(rows)
+
+
+# -------- BACKGROUND QUEUE -------- #
+
+class ScoringQueue:
+    """
+    In-process queue of job ids to (re)score.
+
+    A single daemon thread drains it inside an app context. Requests for
+    a job that is already queued are coalesced, so a burst of applications
+    to one job costs one batch. The queue is not durable: run
+    `flask score-applications` after a restart to catch up.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def enqueue(self, job_id: int):
+        with self._lock:
+            if job_id in self._pending:
+                return
+            self._pending.add(job_id)
+            # Started lazily so the thread belongs to the serving process
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="scoring-queue", daemon=True)
+                self._thread.start()
+        self._queue.put(job_id)
+
+    def join(self):
+        """Block until all queued jobs are scored (used by scripts and tests)."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                self._pending.discard(job_id)
+            try:
+                with self.app.app_context():
+                    score_job_applications(job_id)
+            except Exception:
+                logger.exception("Scoring failed for job %s", job_id)
+            finally:
+                self._queue.task_done()
+
+
+def request_scoring(job_id: int):
+    """
+    Schedule scoring for a job's pending applications according to
+    SCORING_MODE: "background" (default), "sync" or "off".
+    """
+    mode = current_app.config.get("SCORING_MODE", "background")
+    if mode == "sync":
+        score_job_applications(job_id)
+    elif mode == "background":
+        current_app.extensions["scoring_queue"].enqueue(job_id)
+
+
+def init_scoring(app):
+    app.extensions["scoring_queue"] = ScoringQueue(app)
+
+    @app.cli.command("score-applications")
+    @click.option("--all", "rescore_all", is_flag=True,
+                  help="Rescore every job with pending applications, not only unscored ones.")
+    def score_applications_command(rescore_all):
+        """Score pending worker applications in batches per job."""
+        query = db.session.query(WorkerApplication.job_id).filter(
+            WorkerApplication.status == "pending")
+        if not rescore_all:
+            query = query.filter(WorkerApplication.ai_score.is_(None))
+        job_ids = [job_id for (job_id,) in query.distinct()]
+        total = sum(score_job_applications(job_id) for job_id in job_ids)
+        click.echo(f"Scored {total} applications across {len(job_ids)} jobs")
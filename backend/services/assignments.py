@@ -0,0 +1,204 @@
+"""
+Job and application state transitions as compare-and-set UPDATEs.
+
+Every transition is gated by a single UPDATE whose WHERE clause carries
+the state it expects (status = 'open', status = 'pending', ...). Whoever's UPDATE
+matches the row wins; a concurrent or repeated request matches nothing
+and is told so from the rowcount. Nothing is read-then-written and no
+SELECT ... FOR UPDATE lock is held while the application thinks: the only
+row locks are the ones each UPDATE takes until its transaction commits,
+a few statements later.
+
+    open --accept--> assigned --complete--> completed
+    open | assigned --cancel--> cancelled
+    (new) --apply--> pending, only while the job is open
+    pending --accept--> accepted; the job's other pending applications --> rejected
+    pending --reject--> rejected
+"""
+from datetime import datetime
+
+from sqlalchemy import case, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.application import WorkerApplication
+from app.models.job import Job
+from app.utils.http_cache import invalidate_jobs
+
+
+class TransitionError(ValueError):
+    """A transition the current state does not allow; carries the HTTP status."""
+
+    def __init__(self, message: str, status: int = 409):
+        super().__init__(message)
+        self.status = status
+
+
+def submit_application(job_id: int, worker_id: int, cover_letter: str = "") -> int:
+    """
+    Insert a pending application if, and only if, the job is open; returns
+    its id. The job's status is checked by the INSERT itself, so an apply
+    racing an accept or a cancel either commits before the job leaves
+    "open" (and is settled with the job's other applications) or inserts
+    nothing. FOR SHARE makes PostgreSQL wait for a concurrent transition
+    and re-check the status; SQLite serializes the writes anyway.
+    """
+    open_job = (
+        select(literal(job_id), literal(worker_id), literal(cover_letter),
+               literal("pending"), literal(datetime.utcnow()))
+        .where(Job.id == job_id, Job.status == "open")
+        .with_for_update(read=True)
+    )
+    try:
+        application_id = db.session.execute(
+            insert(WorkerApplication)
+            .from_select(["job_id", "worker_id", "cover_letter", "status", "created_at"], open_job)
+            .returning(WorkerApplication.id)
+        ).scalar()
+        db.session.commit()
+    except IntegrityError:
+        # (job_id, worker_id) is unique, which also catches concurrent double submits
+        db.session.rollback()
+        raise TransitionError("You have already applied to this job", 400)
+    if application_id is None:
+        status = db.session.execute(select(Job.status).where(Job.id == job_id)).scalar()
+        if status is None:
+            raise TransitionError("Job not found", 404)
+        raise TransitionError(f"Job is {status}")
+    return application_id
+
+
+def _application(application_id: int, client_id: int):
+    """An application on one of client_id's jobs, with its job's status and worker."""
+    row = db.session.execute(
+        select(WorkerApplication.id, WorkerApplication.job_id, WorkerApplication.worker_id,
+               WorkerApplication.status, Job.client_id, Job.status.label("job_status"),
+               Job.worker_id.label("job_worker_id"))
+        .join(Job, Job.id == WorkerApplication.job_id)
+        .where(WorkerApplication.id == application_id)
+    ).first()
+    if row is None:
+        raise TransitionError("Application not found", 404)
+    if row.client_id != client_id:
+        raise TransitionError("Unauthorized", 403)
+    # End the read transaction before writing: on SQLite-WAL a write from a
+    # snapshot that another commit has overtaken fails at once rather than
+    # waiting out busy_timeout
+    db.session.rollback()
+    return row
+
+
+def _current(application_id: int):
+    """Committed state after a lost race, shaped like _application's row."""
+    return db.session.execute(
+        select(WorkerApplication.status, Job.status.label("job_status"),
+               Job.worker_id.label("job_worker_id"))
+        .join(Job, Job.id == WorkerApplication.job_id)
+        .where(WorkerApplication.id == application_id)
+    ).first()
+
+
+def _lost(application, state) -> dict:
+    """Outcome of an accept whose job is not open: a repeat of the winning
+    accept succeeds again, anything else is a conflict."""
+    if (state is not None and state.job_status == "assigned"
+            and state.job_worker_id == application.worker_id and state.status == "accepted"):
+        return _accepted(application, rejected=0)
+    if state is not None and state.job_status == "open":
+        raise TransitionError("Application is no longer pending")
+    raise TransitionError("Job is no longer open")
+
+
+def accept_application(application_id: int, client_id: int) -> dict:
+    """
+    Assign the application's worker to its job, accept it and reject the
+    job's other pending applications, in one transaction of two UPDATEs.
+    Repeating an accept that already won (a double tap) succeeds again.
+    """
+    application = _application(application_id, client_id)
+    if application.job_status != "open" or application.status != "pending":
+        # Already decided: answer from the read instead of queueing for the
+        # write lock (SQLite takes it even for an UPDATE that matches nothing)
+        return _lost(application, application)
+
+    # 1. The job is the gate: only one accept can move it out of "open"
+    assigned = db.session.execute(
+        update(Job)
+        .where(Job.id == application.job_id, Job.status == "open", Job.worker_id.is_(None))
+        .values(status="assigned", worker_id=application.worker_id,
+                updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not assigned:
+        db.session.rollback()
+        return _lost(application, _current(application.id))
+
+    # 2. Settle every pending application of the job in the same statement
+    settled = db.session.execute(
+        update(WorkerApplication)
+        .where(WorkerApplication.job_id == application.job_id,
+               WorkerApplication.status == "pending")
+        .values(status=case((WorkerApplication.id == application.id, "accepted"),
+                            else_="rejected"))
+        .returning(WorkerApplication.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    if application.id not in settled:
+        # Rejected (or accepted) since it was read; undo the assignment too
+        db.session.rollback()
+        raise TransitionError("Application is no longer pending")
+
+    db.session.commit()
+    invalidate_jobs(application.job_id)
+    return _accepted(application, rejected=len(settled) - 1)
+
+
+def _accepted(application, rejected: int) -> dict:
+    return {"application_id": application.id, "job_id": application.job_id,
+            "worker_id": application.worker_id, "rejected": rejected}
+
+
+def reject_application(application_id: int, client_id: int):
+    """pending -> rejected; rejecting an already rejected application is a no-op."""
+    application = _application(application_id, client_id)
+    rejected = db.session.execute(
+        update(WorkerApplication)
+        .where(WorkerApplication.id == application.id, WorkerApplication.status == "pending")
+        .values(status="rejected")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    if not rejected:
+        current = _current(application.id)
+        if current is not None and current.status != "rejected":
+            raise TransitionError(f"Application is already {current.status}")
+
+
+def transition_job(job_id: int, client_id: int, from_statuses: tuple, to_status: str):
+    """Move one of client_id's jobs from any of from_statuses to to_status."""
+    moved = db.session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.client_id == client_id, Job.status.in_(from_statuses))
+        .values(status=to_status, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not moved:
+        db.session.rollback()
+        job = db.session.execute(select(Job.status, Job.client_id).where(Job.id == job_id)).first()
+        if job is None:
+            raise TransitionError("Job not found", 404)
+        if job.client_id != client_id:
+            raise TransitionError("Unauthorized", 403)
+        if job.status == to_status:
+            return
+        raise TransitionError(f"Job is {job.status}")
+
+    if to_status == "cancelled":
+        # Nobody can be hired for a cancelled job
+        db.session.execute(
+            update(WorkerApplication)
+            .where(WorkerApplication.job_id == job_id, WorkerApplication.status == "pending")
+            .values(status="rejected")
+            .execution_options(synchronize_session=False))
+    db.session.commit()
+    invalidate_jobs(job_id)
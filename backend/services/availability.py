@@ -0,0 +1,268 @@
+"""
+Which workers are free for a whole time window, without scanning profiles.
+
+Workers keep weekly recurring slots (wall-clock time in
+AVAILABILITY_TIMEZONE) plus one-off exceptions in UTC: time off, or extra
+hours outside their slots. The index splits the week into
+AVAILABILITY_BUCKET_MINUTES buckets and keeps one bitmap of workers per
+bucket, so "free for the whole window" is an AND over the window's
+buckets, done a 64-worker word at a time. Slots are rounded inwards to
+whole buckets and windows outwards, so a match is never a false positive.
+
+Exceptions are few and short-lived; they sit in a list sorted by start,
+and a query only visits the ones that can overlap its window. Time off
+clears the worker's bit; workers with extra hours in the window get it
+checked bucket by bucket.
+
+Like the match index the index is per process, kept current by the
+schedule endpoints and rebuilt after AVAILABILITY_INDEX_TTL seconds.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.availability import AvailabilityException, AvailabilitySlot
+from app.models.worker_profile import WorkerProfile
+
+MINUTES_PER_DAY = 24 * 60
+MAX_WINDOW = timedelta(days=7)
+# Window length when only available_from is given
+DEFAULT_WINDOW = timedelta(hours=1)
+# Longest exception accepted; bounds how far back a query looks for
+# exceptions that started before its window
+MAX_EXCEPTION = timedelta(days=90)
+
+
+class AvailabilityParamError(ValueError):
+    pass
+
+
+def parse_instant(value: str) -> datetime:
+    """'now' or an ISO 8601 time as naive UTC; naive input is taken as UTC."""
+    if value == "now":
+        return datetime.utcnow()
+    try:
+        instant = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise AvailabilityParamError(f"Invalid time {value!r}; use ISO 8601 or 'now'")
+    if instant.tzinfo is not None:
+        instant = instant.astimezone(timezone.utc).replace(tzinfo=None)
+    return instant
+
+
+def parse_window(args):
+    """(start, end) in UTC from available_from/available_until, or None."""
+    raw_from, raw_until = args.get("available_from"), args.get("available_until")
+    if raw_from is None and raw_until is None:
+        return None
+    start = parse_instant(raw_from or "now")
+    end = parse_instant(raw_until) if raw_until else start + DEFAULT_WINDOW
+    if end <= start:
+        raise AvailabilityParamError("available_until must be after available_from")
+    if end - start > MAX_WINDOW:
+        raise AvailabilityParamError("Availability window is limited to 7 days")
+    return start, end
+
+
+# -------- INDEX -------- #
+
+
+class AvailabilityIndex:
+    """Bitmap of workers per bucket of the week, plus pending exceptions."""
+
+    def __init__(self, bucket_minutes: int = 15, tz: str = "Africa/Nairobi"):
+        if MINUTES_PER_DAY % bucket_minutes:
+            raise ValueError("bucket_minutes must divide a day")
+        self.bucket_minutes = bucket_minutes
+        self.buckets = 7 * MINUTES_PER_DAY // bucket_minutes
+        self.tz = ZoneInfo(tz)
+        self._lock = threading.RLock()
+        self._reset(0)
+        self.built_at = None
+
+    def _reset(self, capacity):
+        words = max(-(-capacity // 64), 1)
+        self._bits = np.zeros((self.buckets, words), dtype=np.uint64)
+        self._active = np.zeros(words, dtype=np.uint64)  # is_available
+        self._position = {}  # profile id -> bit
+        self._ids = np.full(words * 64, -1, dtype=np.int64)  # bit -> profile id
+        self._exceptions = {}  # profile id -> [(start, end, available)]
+        self._by_start = []  # (start, end, profile id, available), sorted
+        self._max_span = timedelta(0)
+
+    def __len__(self):
+        return len(self._position)
+
+    # ---- writes ---- #
+
+    def build(self, profiles, slots, exceptions):
+        """
+        Replace the contents from (id, is_available) profile rows,
+        (worker_id, weekday, start_minute, end_minute) slot rows and
+        (worker_id, starts_at, ends_at, available) exception rows.
+        """
+        profiles = list(profiles)
+        with self._lock:
+            self._reset(len(profiles))
+            for worker_id, is_available in profiles:
+                self._set_active(self._bit(worker_id), is_available)
+            for worker_id, weekday, start, end in slots:
+                if worker_id in self._position:
+                    self._add_slot(self._position[worker_id], weekday, start, end)
+            for worker_id, starts_at, ends_at, available in exceptions:
+                self._add_exception(worker_id, starts_at, ends_at, available)
+            self.built_at = time.monotonic()
+
+    def update_worker(self, worker_id: int, is_available: bool, slots, exceptions):
+        """Replace one worker's flag, (weekday, start, end) slots and
+        (starts_at, ends_at, available) exceptions."""
+        with self._lock:
+            bit = self._bit(worker_id)
+            word, mask = bit // 64, np.uint64(1 << (bit % 64))
+            self._bits[:, word] &= ~mask
+            self._set_active(bit, is_available)
+            for weekday, start, end in slots:
+                self._add_slot(bit, weekday, start, end)
+            if self._exceptions.pop(worker_id, None):
+                self._by_start = [e for e in self._by_start if e[2] != worker_id]
+            for starts_at, ends_at, available in exceptions:
+                self._add_exception(worker_id, starts_at, ends_at, available)
+
+    def _bit(self, worker_id):
+        bit = self._position.get(worker_id)
+        if bit is None:
+            bit = self._position[worker_id] = len(self._position)
+            if bit >= len(self._ids):
+                # Double the capacity; a rebuild sizes it to the table
+                words = self._bits.shape[1]
+                self._bits = np.hstack([self._bits, np.zeros_like(self._bits)])
+                self._active = np.concatenate([self._active, np.zeros(words, np.uint64)])
+                self._ids = np.concatenate([self._ids, np.full(words * 64, -1, np.int64)])
+            self._ids[bit] = worker_id
+        return bit
+
+    def _set_active(self, bit, is_available):
+        mask = np.uint64(1 << (bit % 64))
+        if is_available:
+            self._active[bit // 64] |= mask
+        else:
+            self._active[bit // 64] &= ~mask
+
+    def _add_slot(self, bit, weekday, start, end):
+        # Inwards: only buckets the slot covers completely
+        first = (weekday * MINUTES_PER_DAY + start + self.bucket_minutes - 1) // self.bucket_minutes
+        last = (weekday * MINUTES_PER_DAY + end) // self.bucket_minutes
+        if first < last:
+            self._bits[first:last, bit // 64] |= np.uint64(1 << (bit % 64))
+
+    def _add_exception(self, worker_id, starts_at, ends_at, available):
+        self._exceptions.setdefault(worker_id, []).append((starts_at, ends_at, available))
+        insort(self._by_start, (starts_at, ends_at, worker_id, available))
+        self._max_span = max(self._max_span, ends_at - starts_at)
+
+    # ---- queries ---- #
+
+    def free_workers(self, start: datetime, end: datetime) -> np.ndarray:
+        """Sorted profile ids free for the whole of [start, end) (naive UTC)."""
+        step = timedelta(minutes=self.bucket_minutes)
+        local = start.replace(tzinfo=timezone.utc).astimezone(self.tz)
+        minute = local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute
+        # Outwards: every bucket the window touches
+        first = start - timedelta(minutes=minute % self.bucket_minutes, seconds=local.second,
+                                  microseconds=local.microsecond)
+        count = -(-(end - first) // step)
+        rows = (minute // self.bucket_minutes + np.arange(count)) % self.buckets
+
+        window_end = first + count * step
+        with self._lock:
+            free = np.bitwise_and.reduce(self._bits[rows], axis=0) & self._active
+            lo = bisect_left(self._by_start, (first - self._max_span,))
+            hi = bisect_left(self._by_start, (window_end,))
+            blocked, extra = set(), set()
+            for s, e, worker_id, available in self._by_start[lo:hi]:
+                if e > first:
+                    (extra if available else blocked).add(worker_id)
+            # Time off touching any bucket of the window rules a worker out
+            bits = np.fromiter((self._position[w] for w in blocked if w in self._position),
+                               dtype=np.int64)
+            np.bitwise_and.at(free, bits // 64, ~(np.uint64(1) << (bits % 64).astype(np.uint64)))
+            # Extra hours may fill gaps in the weekly slots: check bucket by bucket
+            for worker_id in extra - blocked:
+                bit = self._position.get(worker_id)
+                if bit is None:
+                    continue
+                word, mask = bit // 64, np.uint64(1 << (bit % 64))
+                weekly = (self._bits[rows, word] & mask) != 0
+                spans = self._exceptions[worker_id]
+                ok = bool(self._active[word] & mask) and all(
+                    _bucket_free(weekly[k], first + k * step, first + (k + 1) * step, spans)
+                    for k in range(count))
+                free[word] = (free[word] | mask) if ok else (free[word] & ~mask)
+            ids = self._ids[:len(free) * 64]
+            bits = np.unpackbits(free.astype("<u8").view(np.uint8), bitorder="little")
+        return np.sort(ids[bits.astype(bool)])
+
+
+def _bucket_free(weekly, start, end, spans):
+    """Free for [start, end): a slot or extra hours cover it and no time off touches it."""
+    covered = weekly
+    for s, e, available in spans:
+        if available:
+            covered = covered or (s <= start and e >= end)
+        elif s < end and e > start:
+            return False
+    return covered
+
+
+# -------- APP INTEGRATION -------- #
+
+
+def _unexpired(query):
+    return query.where(AvailabilityException.ends_at > datetime.utcnow())
+
+
+def get_availability_index() -> AvailabilityIndex:
+    """The app's availability index, (re)built when missing or stale."""
+    index = current_app.extensions["availability_index"]
+    ttl = current_app.config["AVAILABILITY_INDEX_TTL"]
+    if index.built_at is None or time.monotonic() - index.built_at > ttl:
+        session = db.session
+        index.build(
+            session.execute(select(WorkerProfile.id, WorkerProfile.is_available)),
+            session.execute(select(
+                AvailabilitySlot.worker_id, AvailabilitySlot.weekday,
+                AvailabilitySlot.start_minute, AvailabilitySlot.end_minute,
+            ).execution_options(yield_per=5000)),
+            session.execute(_unexpired(select(
+                AvailabilityException.worker_id, AvailabilityException.starts_at,
+                AvailabilityException.ends_at, AvailabilityException.available,
+            ))),
+        )
+    return index
+
+
+def sync_availability(worker: WorkerProfile):
+    """Push a committed schedule or availability change into the index if built."""
+    index = current_app.extensions.get("availability_index")
+    if index is None or index.built_at is None:
+        return
+    slots = db.session.execute(select(
+        AvailabilitySlot.weekday, AvailabilitySlot.start_minute, AvailabilitySlot.end_minute,
+    ).where(AvailabilitySlot.worker_id == worker.id)).all()
+    exceptions = db.session.execute(_unexpired(select(
+        AvailabilityException.starts_at, AvailabilityException.ends_at,
+        AvailabilityException.available,
+    ).where(AvailabilityException.worker_id == worker.id))).all()
+    index.update_worker(worker.id, worker.is_available, slots, exceptions)
+
+
+def init_availability(app):
+    app.extensions["availability_index"] = AvailabilityIndex(
+        app.config["AVAILABILITY_BUCKET_MINUTES"], app.config["AVAILABILITY_TIMEZONE"])
@@ -0,0 +1,330 @@
+import csv
+import os
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+import click
+from sqlalchemy import and_, select, update
+
+from app.extensions import db
+from app.models.job import Job
+from app.utils.http_cache import invalidate_jobs
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), "data", "kenya_gazetteer.csv")
+
+# More specific places win when a string names several ("Nyali, Mombasa")
+KIND_RANK = {"landmark": 3, "estate": 2, "town": 1, "county": 0}
+# Filler that appears in addresses but never identifies a place
+STOPWORDS = frozenset({
+    "kenya", "county", "near", "opposite", "opp", "next", "to", "along", "off",
+    "behind", "area", "the", "in", "at", "estate", "road", "rd", "street", "st",
+    "avenue", "ave", "plot", "house", "no", "ward", "stage", "of", "and", "po", "box",
+})
+# Minimum similarity (1 - edits / length) for a misspelt token to count as
+# a gazetteer word: one edit from 5 letters, two from 10
+FUZZY_CUTOFF = 0.8
+MAX_EDITS = 2
+# Results below this are guesses: a name prefix ("Park" -> Parklands) scores
+# 0.5, so by default only whole (possibly misspelt) names place a job
+MIN_CONFIDENCE = 0.6
+# Candidate places listed when a location is too vague to resolve
+SUGGESTIONS = 5
+_TERMINAL = "$"
+
+Place = namedtuple("Place", "name kind county lat lng")
+GeocodeResult = namedtuple("GeocodeResult", "lat lng name kind county confidence")
+
+
+class UnknownLocation(ValueError):
+    """A location string that cannot place a job; suggestions are place names."""
+
+    def __init__(self, message: str, suggestions=()):
+        super().__init__(message)
+        self.suggestions = list(suggestions)
+
+
+def normalize(text: str) -> list:
+    """Lowercase ASCII tokens of a place string, without filler or numbers."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    text = re.sub(r"['’`]", "", text.lower())
+    return [t for t in re.split(r"[^a-z0-9]+", text)
+            if t and t not in STOPWORDS and not t.isdigit()]
+
+
+def _edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance. Typos leave most of a word intact, so the
+    shared prefix and suffix are stripped before the DP."""
+    while a and b and a[0] == b[0]:
+        a, b = a[1:], b[1:]
+    while a and b and a[-1] == b[-1]:
+        a, b = a[:-1], b[:-1]
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def _deletes(word: str, depth: int) -> set:
+    """word with up to depth characters removed, word included."""
+    out, frontier = {word}, {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        out |= frontier
+    return out
+
+
+# -------- INDEX -------- #
+
+
+class Geocoder:
+    """
+    Offline geocoder over a bundled gazetteer of Kenyan towns, estates and
+    landmarks.
+
+    Names and aliases are held in a word trie, so every place named
+    anywhere in a free-text address is found in one pass over its tokens.
+    Tokens that are not gazetteer words are first corrected to the closest
+    word within two edits ("Kilimanii" -> "kilimani"), found through a
+    symmetric-delete index rather than by comparing against every word. When
+    nothing matches whole words, a sorted list of names answers prefix
+    queries ("Kenyatta Univ"). Resolved strings are kept in an LRU cache,
+    so repeat lookups are a dict hit.
+    """
+
+    def __init__(self, entries, cache_size: int = 4096,
+                 min_confidence: float = MIN_CONFIDENCE):
+        """entries: (Place, [normalized name tokens, ...]) pairs."""
+        self.min_confidence = min_confidence
+        self.places = []
+        self._trie = {}
+        self._vocabulary = set()
+        self._fuzzy = {}
+        names = {}
+        for place_id, (place, keys) in enumerate(entries):
+            self.places.append(place)
+            for tokens in keys:
+                node = self._trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node.setdefault(_TERMINAL, []).append(place_id)
+                self._vocabulary.update(tokens)
+                names.setdefault(" ".join(tokens), place_id)
+        for word in self._vocabulary:
+            if len(word) >= 4:
+                for key in _deletes(word, MAX_EDITS):
+                    self._fuzzy.setdefault(key, set()).add(word)
+        self._names = sorted(names)
+        self._name_ids = [names[n] for n in self._names]
+        self.geocode = lru_cache(maxsize=cache_size)(self._geocode)
+        # Misspellings repeat across addresses; cache their corrections too
+        self._correct = lru_cache(maxsize=cache_size)(self._correct)
+
+    @classmethod
+    def from_csv(cls, path: str = GAZETTEER_PATH, cache_size: int = 4096,
+                 min_confidence: float = MIN_CONFIDENCE):
+        """Load name,kind,county,lat,lng,aliases rows; aliases are |-separated."""
+        entries = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                place = Place(row["name"], row["kind"], row["county"],
+                              float(row["lat"]), float(row["lng"]))
+                keys = [normalize(n) for n in [row["name"], *row["aliases"].split("|")]]
+                entries.append((place, [k for k in keys if k]))
+        return cls(entries, cache_size, min_confidence)
+
+    def _correct(self, token: str):
+        """(gazetteer word, similarity) for a token, or (None, 0)."""
+        if token in self._vocabulary:
+            return token, 1.0
+        if len(token) < 4:
+            return None, 0.0
+        # Symmetric deletes: a word within N edits shares a key with the
+        # token after at most N deletions from each
+        candidates = set()
+        for key in _deletes(token, MAX_EDITS):
+            candidates |= self._fuzzy.get(key, set())
+        best, best_ratio = None, 0.0
+        for word in sorted(candidates):
+            ratio = 1 - _edit_distance(token, word) / max(len(token), len(word))
+            if ratio > best_ratio:
+                best, best_ratio = word, ratio
+        return (best, best_ratio) if best_ratio >= FUZZY_CUTOFF else (None, 0.0)
+
+    def _matches(self, tokens: list):
+        """[(place ids, tokens spanned, confidence)] for every name in tokens."""
+        corrected = [self._correct(t) for t in tokens]
+        found = []
+        for start in range(len(tokens)):
+            node, confidence = self._trie, 1.0
+            for span, (word, ratio) in enumerate(corrected[start:], start=1):
+                node = node.get(word) if word else None
+                if node is None:
+                    break
+                confidence = min(confidence, ratio)
+                if _TERMINAL in node:
+                    found.append((node[_TERMINAL], span, confidence))
+        return found
+
+    def _geocode(self, text: str):
+        tokens = normalize(text or "")
+        if not tokens:
+            return None
+        matches = self._matches(tokens)
+        if not matches:
+            return self._prefix(" ".join(tokens))
+
+        # Counties named by any match break ties between places sharing a
+        # name, so "Milimani, Kisumu" resolves to the Kisumu estate
+        support = Counter()
+        for ids, _, _ in matches:
+            for county in {self.places[i].county for i in ids}:
+                support[county] += 1
+        best, best_key = None, None
+        for ids, span, confidence in matches:
+            for place_id in ids:
+                place = self.places[place_id]
+                key = (KIND_RANK.get(place.kind, 0), support[place.county],
+                       span, confidence, -place_id)
+                if best_key is None or key > best_key:
+                    best, best_key = (place, confidence), key
+        place, confidence = best
+        return GeocodeResult(place.lat, place.lng, place.name, place.kind,
+                             place.county, round(confidence, 2))
+
+    def _prefix(self, query: str):
+        """Best place whose name starts with query, at reduced confidence."""
+        if len(query) < 3:
+            return None
+        ids = []
+        i = bisect_left(self._names, query)
+        while i < len(self._names) and self._names[i].startswith(query):
+            ids.append(self._name_ids[i])
+            i += 1
+        if not ids:
+            return None
+        place = self.places[max(ids, key=lambda p: (KIND_RANK.get(self.places[p].kind, 0), -p))]
+        return GeocodeResult(place.lat, place.lng, place.name, place.kind, place.county, 0.5)
+
+    def resolve(self, text: str):
+        """geocode() when the result is confident enough to place a job, else None."""
+        result = self.geocode(text)
+        return result if result and result.confidence >= self.min_confidence else None
+
+    def suggest(self, prefix: str, limit: int = 10) -> list:
+        """Places whose name or alias starts with prefix, for autocomplete."""
+        query = " ".join(normalize(prefix))
+        if not query:
+            return []
+        seen, out = set(), []
+        i = bisect_left(self._names, query)
+        while i < len(self._names) and self._names[i].startswith(query) and len(out) < limit:
+            place_id = self._name_ids[i]
+            if place_id not in seen:
+                seen.add(place_id)
+                out.append(self.places[place_id])
+            i += 1
+        return out
+
+
+_geocoder = None
+_lock = threading.Lock()
+
+
+def get_geocoder() -> Geocoder:
+    """The process-wide geocoder, loaded from the gazetteer on first use."""
+    global _geocoder
+    if _geocoder is None:
+        with _lock:
+            if _geocoder is None:
+                _geocoder = Geocoder.from_csv()
+    return _geocoder
+
+
+def resolve_coordinates(location: str, lat=None, lng=None):
+    """
+    (lat, lng) for a job: the explicit pair when both are given, otherwise
+    the geocoded location string. Raises UnknownLocation rather than
+    falling back to (0, 0) or to a low-confidence guess; a vague string
+    carries the places it could mean.
+    """
+    if lat is not None and lng is not None:
+        return lat, lng
+    geocoder = get_geocoder()
+    result = geocoder.resolve(location) if location else None
+    if result is not None:
+        return result.lat, result.lng
+    suggestions = [p.name for p in geocoder.suggest(location, SUGGESTIONS)] if location else []
+    if suggestions:
+        raise UnknownLocation(
+            f"Ambiguous location '{location}' (did you mean {', '.join(suggestions)}?); "
+            "send a full place name or location_lat and location_lng", suggestions)
+    raise UnknownLocation(
+        f"Unknown location '{location}'; send location_lat and location_lng")
+
+
+# -------- BACKFILL -------- #
+
+
+def backfill_jobs(batch_size: int = 500, regeocode: bool = False, dry_run: bool = False):
+    """
+    Geocode jobs stored at (0, 0), or every job with regeocode, from the
+    location string in job_metadata. Walks the table by id in batches,
+    one UPDATE and commit per batch. Returns (updated, unresolved
+    location strings with their counts).
+    """
+    geocoder = get_geocoder()
+    query = select(Job.id, Job.job_metadata).order_by(Job.id).limit(batch_size)
+    if not regeocode:
+        query = query.where(and_(Job.location_lat == 0.0, Job.location_lng == 0.0))
+    updated, unresolved, last_id = 0, Counter(), 0
+    while True:
+        rows = db.session.execute(query.where(Job.id > last_id)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        changes = []
+        for row in rows:
+            location = (row.job_metadata or {}).get("location")
+            result = geocoder.resolve(location) if location else None
+            if result is None:
+                unresolved[location] += 1
+                continue
+            changes.append({"id": row.id, "location_lat": result.lat,
+                            "location_lng": result.lng})
+        if changes and not dry_run:
+            # ORM bulk UPDATE by primary key: one executemany per batch
+            db.session.execute(update(Job), changes)
+            db.session.commit()
+            invalidate_jobs(*(change["id"] for change in changes))
+        updated += len(changes)
+    return updated, unresolved
+
+
+def init_geocoding(app):
+    """Load the gazetteer at startup and register `flask geocode-jobs`."""
+    global _geocoder
+    with _lock:
+        _geocoder = Geocoder.from_csv(app.config["GEOCODER_GAZETTEER"] or GAZETTEER_PATH,
+                                      app.config["GEOCODER_CACHE_SIZE"],
+                                      app.config["GEOCODER_MIN_CONFIDENCE"])
+
+    @app.cli.command("geocode-jobs")
+    @click.option("--batch-size", default=500, show_default=True)
+    @click.option("--all", "regeocode", is_flag=True,
+                  help="Geocode every job, not only those stored at (0, 0).")
+    @click.option("--dry-run", is_flag=True, help="Report what would change without writing.")
+    def geocode_jobs_command(batch_size, regeocode, dry_run):
+        """Fill job coordinates from their location strings."""
+        updated, unresolved = backfill_jobs(batch_size, regeocode, dry_run)
+        verb = "Would update" if dry_run else "Updated"
+        click.echo(f"{verb} {updated} jobs; {sum(unresolved.values())} unresolved")
+        for location, count in unresolved.most_common(20):
+            click.echo(f"  {count:>6}  {location!r}")
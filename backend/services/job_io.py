@@ -0,0 +1,179 @@
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+from types import SimpleNamespace
+
+from flask import current_app
+from marshmallow import ValidationError
+from sqlalchemy import insert, select
+
+from app.extensions import db
+from app.models.job import Job
+from app.schemas import JobCreateSchema
+from services.job_stream import publish_jobs
+from services.search import get_search_backend
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+CSV_TYPES = ("text/csv", "application/csv")
+# Cap on per-row errors echoed back; the count is always exact
+MAX_REPORTED_ERRORS = 1000
+
+
+class UnsupportedFormat(ValueError):
+    pass
+
+
+# -------- IMPORT -------- #
+
+def iter_records(stream, mimetype: str):
+    """
+    Yield (line_number, dict or error message) from an NDJSON or CSV
+    request body, reading it incrementally.
+    """
+    # surrogateescape keeps bytes that are not UTF-8 as lone surrogates, so
+    # they fail only their own row instead of the whole request
+    text = io.TextIOWrapper(stream, encoding="utf-8", errors="surrogateescape", newline="")
+    if mimetype in NDJSON_TYPES:
+        for n, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            if not _is_utf8(line):
+                yield n, "Invalid UTF-8"
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield n, "Invalid JSON"
+                continue
+            yield n, record if isinstance(record, dict) else "Expected a JSON object"
+    elif mimetype in CSV_TYPES:
+        # Physical line a record ends on: quoted cells may span lines and
+        # blank lines are skipped. Empty cells count as missing.
+        reader = csv.DictReader(text)
+        for row in reader:
+            record = {k: v for k, v in row.items() if k and v not in (None, "")}
+            if all(_is_utf8(k) and _is_utf8(v) for k, v in record.items()):
+                yield reader.line_num, record
+            else:
+                yield reader.line_num, "Invalid UTF-8"
+    else:
+        raise UnsupportedFormat(
+            f"Content-Type must be one of {', '.join(NDJSON_TYPES + CSV_TYPES)}")
+
+
+def _is_utf8(text: str) -> bool:
+    """False when text holds undecodable bytes (lone surrogates, see iter_records)."""
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _to_row(data: dict, client_id: int, now: datetime) -> dict:
+    # JobCreateSchema has already geocoded rows without coordinates
+    return {
+        "title": data["title"],
+        "description": data["description"],
+        "price": data["price"],
+        "location_lat": data["location_lat"],
+        "location_lng": data["location_lng"],
+        "client_id": client_id,
+        "status": "open",
+        "created_at": now,
+        "updated_at": now,
+        "job_metadata": {"location": data["location"]},
+    }
+
+
+def import_jobs(records, client_id: int, chunk_size: int = None) -> dict:
+    """
+    Validate and insert records chunk by chunk. Each chunk is one
+    multi-row INSERT in its own transaction, so a failure only loses that
+    chunk and memory stays bounded by the chunk size. Committed chunks
+    are pushed to the live job stream.
+    """
+    chunk_size = chunk_size or current_app.config["BULK_CHUNK_SIZE"]
+    schema = JobCreateSchema()
+    search = get_search_backend()
+    inserted = 0
+    error_count = 0
+    errors = []
+
+    def report(line, message):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "errors": message})
+
+    for chunk in _chunks(records, chunk_size):
+        lines, rows = [], []
+        now = datetime.utcnow()
+        for line, record in chunk:
+            if isinstance(record, str):
+                report(line, record)
+                continue
+            try:
+                data = schema.load(record)
+            except ValidationError as err:
+                report(line, err.messages)
+                continue
+            lines.append(line)
+            rows.append(_to_row(data, client_id, now))
+        if not rows:
+            continue
+
+        try:
+            # executemany with RETURNING where the dialect supports it, so
+            # the new ids can be fed to the search index in the same batch
+            result = db.session.execute(
+                insert(Job).returning(Job.id, sort_by_parameter_order=True), rows)
+            ids = [row.id for row in result]
+            search.index_rows(
+                {"id": job_id, "title": row["title"], "description": row["description"],
+                 "location": row["job_metadata"]["location"]}
+                for job_id, row in zip(ids, rows))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception("Bulk job import chunk failed")
+            for line in lines:
+                report(line, "Chunk insert failed")
+            continue
+        inserted += len(rows)
+        publish_jobs(Job.serialize_row(SimpleNamespace(id=job_id, worker_id=None, **row))
+                     for job_id, row in zip(ids, rows))
+
+    return {"inserted": inserted, "error_count": error_count, "errors": errors}
+
+
+# -------- EXPORT -------- #
+
+def export_jobs(client_id: int, status: str = None, batch_size: int = 1000):
+    """
+    Yield NDJSON lines for a client's jobs. Rows are fetched in batches
+    from a server-side cursor where the driver supports one, so memory
+    use does not grow with the number of jobs.
+    """
+    stmt = select(*Job.row_columns()).where(Job.client_id == client_id).order_by(Job.id)
+    if status:
+        stmt = stmt.where(Job.status == status)
+    result = db.session.execute(
+        stmt.execution_options(stream_results=True, yield_per=batch_size))
+    dumps = current_app.json.dumps
+    try:
+        for partition in result.partitions():
+            yield "".join(dumps(Job.serialize_row(row)) + "\n" for row in partition).encode()
+    finally:
+        result.close()
@@ -0,0 +1,321 @@
+"""
+Push newly created jobs to subscribers near them over Server-Sent Events.
+
+Subscribers are indexed by the grid cells their radius covers, so
+publishing a job only looks at the subscribers of the job's own cell
+before the exact distance check. Each subscriber has a small bounded
+queue; a client that stops reading loses events rather than holding up
+the publisher.
+
+Jobs reach the hub through a broker. "memory://" hands them straight to
+this process's hub. With several worker processes use a redis:// URL:
+every process publishes to one channel and dispatches what it receives to
+its own subscribers.
+"""
+import asyncio
+import json
+import math
+import queue
+import threading
+import time
+
+from flask import current_app
+
+from app.utils.geo import KM_PER_DEG_LAT, bounding_box, haversine_km, valid_coordinates
+
+try:
+    import redis
+except ImportError:  # only needed for a redis:// JOB_STREAM_BROKER_URL
+    redis = None
+
+# A subscription covering more cells than this is checked on every
+# publish instead (only reachable near the poles)
+MAX_CELLS_PER_SUBSCRIPTION = 400
+
+# First chunk of every stream: sends the headers straight away and sets
+# the EventSource reconnect delay
+STREAM_OPEN = b"retry: 5000\n\n"
+KEEPALIVE = b": keepalive\n\n"
+# Keep proxies (nginx) from buffering or caching the stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_frame(event: str, data: bytes, event_id=None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode() + b"data: " + data + b"\n\n"
+
+
+# -------- SUBSCRIPTIONS -------- #
+
+
+class Subscription:
+    """A subscriber's area and its queue of pending SSE frames."""
+
+    def __init__(self, lat: float, lng: float, radius_km: float, maxsize: int):
+        self.lat, self.lng, self.radius_km = lat, lng, radius_km
+        self.maxsize = maxsize
+        self.dropped = 0
+
+    def matches(self, lat: float, lng: float) -> bool:
+        return haversine_km(self.lat, self.lng, lat, lng) <= self.radius_km
+
+
+class ThreadSubscription(Subscription):
+    """For WSGI handlers: the request thread blocks on get()."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._queue = queue.Queue(self.maxsize)
+
+    def put(self, frame: bytes):
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+
+    def get(self, timeout: float):
+        """Next frame, or None after timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncSubscription(Subscription):
+    """For the ASGI handler: a coroutine awaits get(); put() is thread-safe."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self.maxsize)
+
+    def put(self, frame: bytes):
+        self._loop.call_soon_threadsafe(self._put, frame)
+
+    def _put(self, frame):
+        try:
+            self._queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def get(self, timeout: float):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+# -------- HUB -------- #
+
+
+class JobStreamHub:
+    """Per-process subscriptions keyed on (lat, lng) grid cells."""
+
+    def __init__(self, cell_km: float = 5.0, max_subscribers: int = 10000,
+                 max_thread_subscribers: int = 2):
+        self.cell_deg = cell_km / KM_PER_DEG_LAT
+        self.max_subscribers = max_subscribers
+        # Each ThreadSubscription pins a WSGI worker thread while it is open
+        self.max_thread_subscribers = max_thread_subscribers
+        self._threads = 0
+        self._cells = {}
+        self._wide = set()
+        self._covered = {}
+        self._lock = threading.Lock()
+
+    def cell(self, lat: float, lng: float):
+        return math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg)
+
+    def _cells_for(self, sub: Subscription):
+        min_lat, max_lat, min_lng, max_lng = bounding_box(sub.lat, sub.lng, sub.radius_km)
+        (lat0, lng0), (lat1, lng1) = self.cell(min_lat, min_lng), self.cell(max_lat, max_lng)
+        if (lat1 - lat0 + 1) * (lng1 - lng0 + 1) > MAX_CELLS_PER_SUBSCRIPTION:
+            return None
+        return [(i, j) for i in range(lat0, lat1 + 1) for j in range(lng0, lng1 + 1)]
+
+    def __len__(self):
+        return len(self._covered)
+
+    def subscribe(self, sub: Subscription) -> bool:
+        """
+        Register sub; False when the process is at max_subscribers, or at
+        max_thread_subscribers for a ThreadSubscription.
+        """
+        cells = self._cells_for(sub)
+        threaded = isinstance(sub, ThreadSubscription)
+        with self._lock:
+            if len(self._covered) >= self.max_subscribers:
+                return False
+            if threaded and self._threads >= self.max_thread_subscribers:
+                return False
+            self._threads += threaded
+            self._covered[sub] = cells
+            if cells is None:
+                self._wide.add(sub)
+            else:
+                for cell in cells:
+                    self._cells.setdefault(cell, set()).add(sub)
+        return True
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub not in self._covered:
+                return
+            cells = self._covered.pop(sub)
+            self._threads -= isinstance(sub, ThreadSubscription)
+            self._wide.discard(sub)
+            for cell in cells or ():
+                subs = self._cells.get(cell)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._cells[cell]
+
+    def dispatch(self, lat: float, lng: float, frame: bytes) -> int:
+        """Queue frame for every subscriber within range of (lat, lng)."""
+        with self._lock:
+            candidates = list(self._cells.get(self.cell(lat, lng), ()))
+            candidates.extend(self._wide)
+        delivered = 0
+        for sub in candidates:
+            if sub.matches(lat, lng):
+                sub.put(frame)
+                delivered += 1
+        return delivered
+
+
+# -------- BROKERS -------- #
+
+
+class LocalBroker:
+    """Single-process broker, and the stand-in for tests: publish is dispatch."""
+
+    def __init__(self, hub: JobStreamHub):
+        self.hub = hub
+
+    def publish(self, lat: float, lng: float, frame: bytes):
+        self.hub.dispatch(lat, lng, frame)
+
+    def start(self):
+        pass
+
+
+class RedisBroker:
+    """
+    Fan out through a Redis pub/sub channel so subscribers on every
+    worker process see jobs created on any of them. A daemon thread per
+    process, started with the first subscriber, feeds the local hub.
+    """
+
+    CHANNEL = "kazilink:jobs:new"
+
+    def __init__(self, hub: JobStreamHub, url: str):
+        if redis is None:
+            raise RuntimeError("redis package is required for a redis:// JOB_STREAM_BROKER_URL")
+        self.hub = hub
+        self._client = redis.Redis.from_url(url)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def publish(self, lat: float, lng: float, frame: bytes):
+        self._client.publish(self.CHANNEL, f"{lat},{lng}\n".encode() + frame)
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._listen, name="job-stream-broker", daemon=True)
+                self._thread.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.CHANNEL)
+                for message in pubsub.listen():
+                    head, frame = message["data"].split(b"\n", 1)
+                    lat, lng = map(float, head.split(b","))
+                    self.hub.dispatch(lat, lng, frame)
+            except redis.ConnectionError:
+                # Jobs published while disconnected are missed; clients
+                # catch up from the feed when they reconnect
+                time.sleep(1)
+
+
+def make_broker(url: str, hub: JobStreamHub):
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBroker(hub, url)
+    if url.startswith("memory://"):
+        return LocalBroker(hub)
+    raise ValueError(f"Unsupported JOB_STREAM_BROKER_URL: {url}")
+
+
+def init_job_stream(app):
+    hub = JobStreamHub(app.config["JOB_STREAM_CELL_KM"], app.config["JOB_STREAM_MAX_SUBSCRIBERS"],
+                       app.config["JOB_STREAM_MAX_WSGI_STREAMS"])
+    app.extensions["job_stream"] = make_broker(app.config["JOB_STREAM_BROKER_URL"], hub)
+
+
+def get_job_stream():
+    return current_app.extensions["job_stream"]
+
+
+def publish_jobs(rows):
+    """
+    Push serialized jobs (Job.serialize_row dicts) to nearby subscribers.
+    Call after the commit, so nobody sees a job that was rolled back; a
+    broker failure is logged and never fails the write.
+    """
+    broker = get_job_stream()
+    try:
+        for row in rows:
+            data = json.dumps(row, separators=(",", ":"), default=str).encode()
+            broker.publish(row["location_lat"], row["location_lng"],
+                           sse_frame("job", data, row["id"]))
+    except Exception:
+        current_app.logger.exception("Publishing new jobs to the stream failed")
+
+
+def iter_events(hub: JobStreamHub, sub: ThreadSubscription, heartbeat: float):
+    """SSE chunks for a WSGI response; unsubscribes when the client goes away."""
+    try:
+        yield STREAM_OPEN
+        while True:
+            frame = sub.get(heartbeat)
+            # A keepalive also surfaces a dead connection on the next write
+            yield frame if frame is not None else KEEPALIVE
+    finally:
+        hub.unsubscribe(sub)
+
+
+async def aiter_events(hub: JobStreamHub, sub: AsyncSubscription, heartbeat: float):
+    """Async counterpart of iter_events for the ASGI app."""
+    try:
+        yield STREAM_OPEN
+        while True:
+            frame = await sub.get(heartbeat)
+            yield frame if frame is not None else KEEPALIVE
+    finally:
+        hub.unsubscribe(sub)
+
+
+# -------- PARAMS -------- #
+
+
+class StreamParamError(ValueError):
+    pass
+
+
+def parse_stream_args(args, max_radius_km: float):
+    """(lat, lng, radius_km) from the stream query string."""
+    try:
+        lat, lng = float(args["lat"]), float(args["lng"])
+        radius_km = float(args.get("radius_km", 10))
+    except (KeyError, ValueError):
+        raise StreamParamError("lat & lng are required; radius_km must be a number")
+    if not valid_coordinates(lat, lng):
+        raise StreamParamError("lat & lng must both be valid coordinates")
+    # nan passes every comparison below, so rule out non-finite values first
+    if not math.isfinite(radius_km) or radius_km <= 0:
+        raise StreamParamError("radius_km must be a positive number")
+    return lat, lng, min(radius_km, max_radius_km)
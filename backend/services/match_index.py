@@ -0,0 +1,182 @@
+import threading
+import time
+
+import numpy as np
+from flask import current_app
+
+from app.extensions import db
+from app.models.worker_profile import WorkerProfile
+from app.utils.geo import GeoIndex, haversine_many
+from app.utils.text import skill_tokens
+from services.ai_service import score_features
+
+
+class MatchIndex:
+    """
+    In-memory job-to-worker match index.
+
+    Holds an inverted index of skill token -> worker profile ids, each
+    worker's token set and position, and the set of available workers.
+    A recommendation only touches workers sharing at least one token with
+    the job, and ranks them with the same features used to score
+    applications, their stored rating included. When no skill matches, it falls back to the nearest
+    available workers.
+
+    The index is per process and kept current by the worker PATCH
+    endpoints and new reviews. It is rebuilt after MATCH_INDEX_TTL seconds so changes made
+    through other processes are picked up.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}
+        self._tokens = {}
+        self._coords = {}
+        self._available = set()
+        self._ratings = {}
+        self._geo = GeoIndex()
+        self.built_at = None
+
+    def build(self, rows):
+        """Replace the contents from (id, skills, lat, lng, is_available, rating) rows."""
+        postings, tokens, coords, available, ratings = {}, {}, {}, set(), {}
+        for worker_id, skills, lat, lng, is_available, rating in rows:
+            toks = skill_tokens(skills)
+            tokens[worker_id] = toks
+            for tok in toks:
+                postings.setdefault(tok, set()).add(worker_id)
+            if lat is not None and lng is not None:
+                coords[worker_id] = (lat, lng)
+            if is_available:
+                available.add(worker_id)
+            if rating is not None:
+                ratings[worker_id] = rating
+        geo = GeoIndex.from_rows((i, lat, lng) for i, (lat, lng) in coords.items())
+        with self._lock:
+            self._postings, self._tokens = postings, tokens
+            self._coords, self._available = coords, available
+            self._ratings = ratings
+            self._geo = geo
+            self.built_at = time.monotonic()
+
+    def update_worker(self, worker: WorkerProfile):
+        """Apply a profile's current skills, location and availability."""
+        with self._lock:
+            self._remove_tokens(worker.id)
+            toks = skill_tokens(worker.skills)
+            self._tokens[worker.id] = toks
+            for tok in toks:
+                self._postings.setdefault(tok, set()).add(worker.id)
+
+            if worker.latitude is not None and worker.longitude is not None:
+                self._coords[worker.id] = (worker.latitude, worker.longitude)
+                self._geo.upsert(worker.id, worker.latitude, worker.longitude)
+            else:
+                self._coords.pop(worker.id, None)
+                self._geo.remove(worker.id)
+
+            if worker.is_available:
+                self._available.add(worker.id)
+            else:
+                self._available.discard(worker.id)
+            self._set_rating(worker.id, worker.rating)
+
+    def update_rating(self, worker_id: int, rating):
+        with self._lock:
+            self._set_rating(worker_id, rating)
+
+    def _set_rating(self, worker_id, rating):
+        if rating is None:
+            self._ratings.pop(worker_id, None)
+        else:
+            self._ratings[worker_id] = rating
+
+    def remove_worker(self, worker_id: int):
+        with self._lock:
+            self._remove_tokens(worker_id)
+            self._tokens.pop(worker_id, None)
+            self._coords.pop(worker_id, None)
+            self._available.discard(worker_id)
+            self._ratings.pop(worker_id, None)
+            self._geo.remove(worker_id)
+
+    def _remove_tokens(self, worker_id):
+        for tok in self._tokens.get(worker_id, ()):
+            ids = self._postings.get(tok)
+            if ids is not None:
+                ids.discard(worker_id)
+                if not ids:
+                    del self._postings[tok]
+
+    def recommend(self, job_tokens: set, lat: float = None, lng: float = None,
+                  limit: int = 10, radius_km: float = None):
+        """Return [(worker_id, score, distance_km or None)], best first."""
+        with self._lock:
+            candidates = set()
+            for tok in job_tokens:
+                candidates |= self._postings.get(tok, set())
+            candidates &= self._available
+            if not candidates and lat is not None:
+                nearest = self._geo.nearest(lat, lng, limit * 4)
+                candidates = {i for i, _ in nearest if i in self._available}
+            if not candidates:
+                return []
+            ids = list(candidates)
+            tokens = [self._tokens.get(i, set()) for i in ids]
+            coords = [self._coords.get(i, (np.nan, np.nan)) for i in ids]
+            ratings = np.array([self._ratings.get(i, np.nan) for i in ids], dtype=float)
+
+        if lat is not None:
+            lats, lngs = zip(*coords)
+            distances = haversine_many(lat, lng, lats, lngs)
+        else:
+            distances = np.full(len(ids), np.nan)
+        if radius_km is not None:
+            # NaN (unknown location) compares False and is dropped too
+            keep = distances <= radius_km
+            ids = [i for i, k in zip(ids, keep) if k]
+            tokens = [t for t, k in zip(tokens, keep) if k]
+            distances = distances[keep]
+            ratings = ratings[keep]
+            if not ids:
+                return []
+
+        scores = score_features(job_tokens, tokens, distances, ratings)
+        top = np.argsort(-scores, kind="stable")[:limit]
+        return [(ids[i], float(scores[i]),
+                 None if np.isnan(distances[i]) else float(distances[i]))
+                for i in top]
+
+
+def _load_rows():
+    return db.session.query(
+        WorkerProfile.id,
+        WorkerProfile.skills,
+        WorkerProfile.latitude,
+        WorkerProfile.longitude,
+        WorkerProfile.is_available,
+        WorkerProfile.rating,
+    ).yield_per(5000)
+
+
+def get_match_index() -> MatchIndex:
+    """The app's match index, (re)built from the database when missing or stale."""
+    index = current_app.extensions.setdefault("match_index", MatchIndex())
+    ttl = current_app.config.get("MATCH_INDEX_TTL", 300)
+    if index.built_at is None or time.monotonic() - index.built_at > ttl:
+        index.build(_load_rows())
+    return index
+
+
+def sync_worker(worker: WorkerProfile):
+    """Push a committed profile change into the index if it has been built."""
+    index = current_app.extensions.get("match_index")
+    if index is not None and index.built_at is not None:
+        index.update_worker(worker)
+
+
+def sync_rating(worker_id: int, rating):
+    """Push a committed review's new profile rating into the index if built."""
+    index = current_app.extensions.get("match_index")
+    if index is not None and index.built_at is not None:
+        index.update_rating(worker_id, rating)
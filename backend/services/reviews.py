@@ -0,0 +1,171 @@
+"""
+Worker reviews and the rating aggregates denormalized on WorkerProfile.
+
+Each review insert bumps the worker's rating_count and rating_sum and
+recomputes the Bayesian average in one UPDATE, inside the insert's
+transaction, so profile reads and rating sorts never aggregate over the
+reviews table. `flask reconcile-ratings` recomputes the aggregates from
+the reviews in batches and repairs any drift (rows edited by hand, a
+changed prior).
+"""
+import click
+from flask import current_app
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.review import Review
+from app.models.worker_profile import WorkerProfile
+
+
+class ReviewError(ValueError):
+    """A review the job's state does not allow; carries the HTTP status."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def _prior():
+    """(prior mean, prior weight) for the Bayesian average."""
+    return (current_app.config["REVIEW_PRIOR_MEAN"],
+            current_app.config["REVIEW_PRIOR_WEIGHT"])
+
+
+def bayesian_rating(rating_sum: int, rating_count: int, prior_mean: float, prior_weight: float):
+    """
+    Average rating shrunk towards prior_mean as if the worker also had
+    prior_weight reviews at that value; None with no reviews. One
+    five-star review does not outrank fifty 4.8s.
+    """
+    if not rating_count:
+        return None
+    return (prior_mean * prior_weight + rating_sum) / (prior_weight + rating_count)
+
+
+# -------- WRITES -------- #
+
+
+def add_review(job, reviewer_id: int, rating: int, comment: str = None):
+    """
+    Insert a review of the job's worker and fold it into their profile
+    aggregates in the same transaction, creating the profile on the
+    worker's first review. Returns the review and the profile's new
+    rating aggregates. The caller commits; the job's unique
+    constraint rejects a second review with IntegrityError.
+    """
+    if job.client_id != reviewer_id:
+        raise ReviewError("Only the job's client can review it", 403)
+    if job.worker_id is None or job.status not in ("assigned", "completed"):
+        raise ReviewError("Job has no assigned worker to review")
+
+    review = Review(job_id=job.id, reviewer_id=reviewer_id, worker_id=job.worker_id,
+                    rating=rating, comment=comment)
+    db.session.add(review)
+    db.session.flush()
+    return review, _apply_rating(job.worker_id, rating)
+
+
+def _apply_rating(worker_id: int, rating: int):
+    """Fold one rating into the worker's profile; returns its id, rating and rating_count."""
+    # SET expressions read the pre-update row, and the row lock taken here
+    # serializes concurrent reviews of the same worker
+    prior_mean, prior_weight = _prior()
+    bump = (
+        update(WorkerProfile)
+        .where(WorkerProfile.user_id == worker_id)
+        .values(
+            rating_count=WorkerProfile.rating_count + 1,
+            rating_sum=WorkerProfile.rating_sum + rating,
+            rating=(prior_mean * prior_weight + WorkerProfile.rating_sum + rating)
+            / (prior_weight + WorkerProfile.rating_count + 1),
+        )
+        .returning(WorkerProfile.id, WorkerProfile.rating, WorkerProfile.rating_count)
+        .execution_options(synchronize_session=False)
+    )
+    profile = db.session.execute(bump).first()
+    if profile is not None:
+        return profile
+
+    # Workers can take jobs before filling in a profile; start one. A
+    # concurrent first review may create it first, then bump that row.
+    try:
+        with db.session.begin_nested():
+            created = WorkerProfile(user_id=worker_id, rating_count=1, rating_sum=rating,
+                                    rating=bayesian_rating(rating, 1, prior_mean, prior_weight))
+            db.session.add(created)
+        return created
+    except IntegrityError:
+        return db.session.execute(bump).one()
+
+
+# -------- RECONCILIATION -------- #
+
+
+def reconcile_ratings(batch_size: int = 1000, dry_run: bool = False) -> tuple:
+    """
+    Recompute every profile's aggregates from its reviews, one batch of
+    profiles (keyset by id) and one grouped query per batch, and write
+    back the rows that drifted. Returns (profiles checked, drifted).
+    """
+    prior_mean, prior_weight = _prior()
+    profiles = select(
+        WorkerProfile.id, WorkerProfile.user_id, WorkerProfile.rating_count,
+        WorkerProfile.rating_sum, WorkerProfile.rating,
+    ).order_by(WorkerProfile.id).limit(batch_size)
+    checked, repaired, last_id = 0, 0, 0
+    while True:
+        rows = db.session.execute(profiles.where(WorkerProfile.id > last_id)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        checked += len(rows)
+        totals = {worker_id: (count, total) for worker_id, count, total in db.session.execute(
+            select(Review.worker_id, func.count(), func.sum(Review.rating))
+            .where(Review.worker_id.in_([r.user_id for r in rows]))
+            .group_by(Review.worker_id))}
+
+        changes = []
+        for row in rows:
+            count, total = totals.get(row.user_id, (0, 0))
+            rating = bayesian_rating(total, count, prior_mean, prior_weight)
+            drifted = (row.rating_count != count or row.rating_sum != total
+                       or (rating is None) != (row.rating is None)
+                       or (rating is not None and abs(rating - row.rating) > 1e-9))
+            if drifted:
+                changes.append({"b_id": row.id, "b_count": row.rating_count,
+                                "b_sum": row.rating_sum, "count": count,
+                                "total": total, "rating": rating})
+        if changes and not dry_run:
+            db.session.execute(_REPAIR, changes)
+            db.session.commit()
+        else:
+            db.session.rollback()
+        repaired += len(changes)
+    return checked, repaired
+
+
+# Compare-and-set on the aggregates read above: a review committed since
+# then already moved the row on and is picked up by the next run instead
+# of being overwritten. One executemany per batch.
+_REPAIR = (
+    update(WorkerProfile.__table__)
+    .where(
+        WorkerProfile.id == bindparam("b_id"),
+        WorkerProfile.rating_count == bindparam("b_count"),
+        WorkerProfile.rating_sum == bindparam("b_sum"),
+    )
+    .values(rating_count=bindparam("count"), rating_sum=bindparam("total"),
+            rating=bindparam("rating"))
+)
+
+
+def init_reviews(app):
+    @app.cli.command("reconcile-ratings")
+    @click.option("--batch-size", default=1000, show_default=True)
+    @click.option("--dry-run", is_flag=True, help="Report drifted profiles without writing.")
+    def reconcile_ratings_command(batch_size, dry_run):
+        """Repair worker rating aggregates from the reviews table."""
+        checked, repaired = reconcile_ratings(batch_size, dry_run)
+        verb = "would repair" if dry_run else "repaired"
+        click.echo(f"Checked {checked} worker profiles; {verb} {repaired}")
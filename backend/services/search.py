@@ -0,0 +1,199 @@
+import math
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import DDL, event, text
+
+from app.extensions import db
+from app.models.job import Job
+from app.utils.geo import haversine_many
+from app.utils.text import tokenize
+
+# Blend of text relevance, freshness and proximity for the final ranking
+TEXT_WEIGHT = 0.6
+RECENCY_WEIGHT = 0.25
+DISTANCE_WEIGHT = 0.15
+RECENCY_HALF_LIFE_DAYS = 14.0
+DISTANCE_SCALE_KM = 10.0
+# Text matches considered for re-ranking, as a multiple of the page size
+CANDIDATE_FACTOR = 5
+
+
+class SearchBackend:
+    """
+    Full-text index over job title, description and location.
+
+    index_job/remove_job run on the caller's session, so index changes
+    commit or roll back together with the job row. match returns
+    [(job_id, relevance)] with higher relevance meaning a better match,
+    restricted to jobs with the given status when one is passed.
+    """
+
+    def index_job(self, job: Job):
+        pass
+
+    def index_rows(self, rows):
+        """Index new jobs from dicts with id, title, description and location."""
+        pass
+
+    def remove_job(self, job_id: int):
+        pass
+
+    def match(self, terms: list, limit: int, status: str = None):
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """SQLite FTS5 table keyed by job id (rowid), ranked with bm25."""
+
+    # Column weights for bm25: title, description, location
+    WEIGHTS = (4.0, 1.0, 2.0)
+
+    def index_job(self, job):
+        self.remove_job(job.id)
+        db.session.execute(text(
+            "INSERT INTO jobs_fts(rowid, title, description, location) "
+            "VALUES (:id, :title, :description, :location)"
+        ), {
+            "id": job.id,
+            "title": job.title,
+            "description": job.description,
+            "location": (job.job_metadata or {}).get("location") or "",
+        })
+
+    def index_rows(self, rows):
+        rows = list(rows)
+        if rows:
+            db.session.execute(text(
+                "INSERT INTO jobs_fts(rowid, title, description, location) "
+                "VALUES (:id, :title, :description, :location)"
+            ), rows)
+
+    def remove_job(self, job_id):
+        db.session.execute(text("DELETE FROM jobs_fts WHERE rowid = :id"), {"id": job_id})
+
+    def match(self, terms, limit, status=None):
+        # Quoted prefix terms, implicitly AND-ed; quoting neutralises FTS syntax
+        query = " ".join(f'"{t}"*' for t in terms)
+        # Status is filtered in the match itself so LIMIT counts only survivors
+        rows = db.session.execute(text(
+            "SELECT jobs_fts.rowid, bm25(jobs_fts, :w1, :w2, :w3) AS score FROM jobs_fts "
+            "JOIN jobs ON jobs.id = jobs_fts.rowid WHERE jobs_fts MATCH :q "
+            + ("AND jobs.status = :status " if status else "")
+            + "ORDER BY score LIMIT :limit"
+        ), {"q": query, "limit": limit, "status": status, "w1": self.WEIGHTS[0],
+            "w2": self.WEIGHTS[1], "w3": self.WEIGHTS[2]}).all()
+        # bm25 is negative, lower is better
+        return [(job_id, -score) for job_id, score in rows]
+
+
+class PostgresFTSBackend(SearchBackend):
+    """
+    Postgres full-text search over an expression GIN index (see the
+    add_job_search_index migration). The index is maintained by Postgres
+    itself, so index_job/remove_job have nothing to do.
+    """
+
+    DOCUMENT = (
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(job_metadata->>'location', '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+    )
+
+    def match(self, terms, limit, status=None):
+        query = " & ".join(f"{t}:*" for t in terms)
+        rows = db.session.execute(text(
+            f"SELECT id, ts_rank_cd({self.DOCUMENT}, to_tsquery('simple', :q)) AS score "
+            f"FROM jobs WHERE {self.DOCUMENT} @@ to_tsquery('simple', :q) "
+            + ("AND status = :status " if status else "")
+            + "ORDER BY score DESC LIMIT :limit"
+        ), {"q": query, "limit": limit, "status": status}).all()
+        return [(job_id, score) for job_id, score in rows]
+
+
+class LikeBackend(SearchBackend):
+    """Unindexed fallback for other databases: every term must appear somewhere."""
+
+    def match(self, terms, limit, status=None):
+        query = db.session.query(Job.id)
+        if status:
+            query = query.filter(Job.status == status)
+        for t in terms:
+            pattern = f"%{t}%"
+            query = query.filter(Job.title.ilike(pattern) | Job.description.ilike(pattern))
+        return [(job_id, 1.0) for (job_id,) in query.order_by(Job.id.desc()).limit(limit)]
+
+
+# SQLite's FTS table rides along with the jobs table under db.create_all();
+# migrated databases get it from add_job_search_index
+CREATE_FTS_TABLE = DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+    "title, description, location, tokenize='unicode61')"
+).execute_if(dialect="sqlite")
+DROP_FTS_TABLE = DDL("DROP TABLE IF EXISTS jobs_fts").execute_if(dialect="sqlite")
+
+
+def init_search(app):
+    """Hook the FTS table DDL onto the jobs table; nothing runs per request."""
+    table = Job.__table__
+    if not event.contains(table, "after_create", CREATE_FTS_TABLE):
+        event.listen(table, "after_create", CREATE_FTS_TABLE)
+        event.listen(table, "before_drop", DROP_FTS_TABLE)
+
+
+BACKENDS = {
+    "sqlite": SQLiteFTSBackend,
+    "postgresql": PostgresFTSBackend,
+}
+
+
+def get_search_backend() -> SearchBackend:
+    backend = current_app.extensions.get("job_search")
+    if backend is None:
+        backend = BACKENDS.get(db.engine.dialect.name, LikeBackend)()
+        current_app.extensions["job_search"] = backend
+    return backend
+
+
+def search_jobs(q: str, lat: float = None, lng: float = None,
+                status: str = None, limit: int = 20):
+    """
+    Return [(job, score, distance_km or None)] for a free-text query.
+
+    The text index supplies the best CANDIDATE_FACTOR * limit matches
+    with the requested status, which are re-ranked by text relevance,
+    recency and (when lat/lng are given) distance.
+    """
+    terms = tokenize(q)
+    if not terms:
+        return []
+    matches = get_search_backend().match(terms, limit * CANDIDATE_FACTOR, status)
+    if not matches:
+        return []
+
+    query = Job.query.filter(Job.id.in_([job_id for job_id, _ in matches]))
+    if status:
+        query = query.filter(Job.status == status)
+    jobs = {job.id: job for job in query}
+    matches = [(jobs[job_id], rel) for job_id, rel in matches if job_id in jobs]
+    if not matches:
+        return []
+
+    best = max(rel for _, rel in matches) or 1.0
+    now = datetime.utcnow()
+    distances = [None] * len(matches)
+    if lat is not None and lng is not None:
+        distances = haversine_many(lat, lng,
+                                   [job.location_lat for job, _ in matches],
+                                   [job.location_lng for job, _ in matches]).tolist()
+
+    ranked = []
+    for (job, rel), dist in zip(matches, distances):
+        age_days = (now - job.created_at).total_seconds() / 86400 if job.created_at else 365.0
+        score = TEXT_WEIGHT * (rel / best) + \
+            RECENCY_WEIGHT * math.pow(0.5, max(age_days, 0.0) / RECENCY_HALF_LIFE_DAYS)
+        if dist is not None:
+            score += DISTANCE_WEIGHT * math.exp(-dist / DISTANCE_SCALE_KM)
+        ranked.append((job, score, dist))
+    ranked.sort(key=lambda r: r[1], reverse=True)
+    return ranked[:limit]
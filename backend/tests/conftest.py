@@ -0,0 +1,78 @@
+"""
+Fixtures shared by the test suite. Run from backend/:
+
+    python -m pytest tests
+    TEST_POSTGRES_URL=postgresql://localhost/mboka_test python -m pytest tests
+
+Tests taking the `app` fixture run once per database backend: SQLite in
+WAL mode on a temporary file, and PostgreSQL when TEST_POSTGRES_URL names
+an empty database (its tables are dropped after each test).
+"""
+import os
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.utils.security import create_access_token
+
+BACKENDS = {"sqlite": "dev-sqlite", "postgresql": "prod-postgres"}
+
+
+@pytest.fixture(params=list(BACKENDS))
+def database_url(request, tmp_path):
+    if request.param == "sqlite":
+        return f"sqlite:///{tmp_path}/test.db"
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    return url
+
+
+@pytest.fixture
+def make_app(database_url):
+    """create_app() on the backend under test, with test settings plus `overrides`."""
+    def make(**overrides):
+        return create_app(BACKENDS[database_url.split(":", 1)[0].split("+", 1)[0]], {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": database_url,
+            "RATELIMIT_ENABLED": False,
+            "SCORING_MODE": "off",
+            "LOG_FILE": "",
+            "LOG_LEVEL": "ERROR",
+            "LOG_ACCESS_SAMPLE_RATE": 0.0,
+            **overrides,
+        })
+    return make
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        # Primary only: a replica bind (test_db_routing.py) reads the same tables
+        db.create_all(bind_key=None)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        if db.engine.dialect.name != "sqlite":
+            db.drop_all(bind_key=None)
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def token_for(app):
+    """Access token for a user id."""
+    def token(user_id, role="worker"):
+        with app.app_context():
+            return create_access_token(user_id, role)
+    return token
+
+
+@pytest.fixture
+def headers_for(token_for):
+    """Authorization header for a user id."""
+    def headers(user_id, role="worker"):
+        return {"Authorization": f"Bearer {token_for(user_id, role)}"}
+    return headers
@@ -0,0 +1,110 @@
+"""
+Accept and apply under concurrency, on every backend in conftest.py.
+
+The invariants are the ones benchmarks/stress_accept.py checks at a larger
+scale: each job ends up assigned exactly once, to the worker of its one
+accepted application, with no application left pending beside it.
+"""
+import random
+import threading
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.application import WorkerApplication
+from app.models.user import User
+from benchmarks.stress_accept import check, hammer, seed
+
+CLIENT_ID = 1
+JOBS = 12
+APPLICANTS = 6
+THREADS = 8
+
+
+def seed_jobs(app, late_workers=0):
+    """Open jobs 1..JOBS with APPLICANTS pending applications each, plus
+    `late_workers` users who have not applied yet; returns the late ids."""
+    now = datetime.utcnow()
+    late = list(range(CLIENT_ID + APPLICANTS + 1, CLIENT_ID + APPLICANTS + 1 + late_workers))
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(User.__table__.insert(), [
+                {"id": user_id, "username": f"user{user_id}", "email": f"user{user_id}@test.local",
+                 "password_hash": "-", "role": "client" if user_id == CLIENT_ID else "worker",
+                 "created_at": now}
+                for user_id in [CLIENT_ID] + late])
+        seed(db, CLIENT_ID, JOBS, APPLICANTS)
+    return late
+
+
+def accept_attempts(app, taps=2):
+    with app.app_context():
+        rows = db.session.execute(select(WorkerApplication.job_id, WorkerApplication.id)).all()
+    attempts = [tuple(row) for row in rows] * taps
+    random.Random(7).shuffle(attempts)
+    return attempts
+
+
+def test_concurrent_accepts_assign_each_job_once(app, token_for):
+    seed_jobs(app)
+    results = hammer(app, token_for(CLIENT_ID, "client"), accept_attempts(app), THREADS)
+
+    with app.app_context():
+        assert check(db, results) == []
+    assert sum(status == 200 for _, _, status, _ in results) >= JOBS
+
+
+def test_apply_racing_accept_is_settled_or_refused(app, token_for, headers_for):
+    late = seed_jobs(app, late_workers=4)
+    applies = [(worker_id, job_id) for worker_id in late for job_id in range(1, JOBS + 1)]
+    random.Random(11).shuffle(applies)
+    statuses, lock = [], threading.Lock()
+
+    def apply_all(share):
+        client = app.test_client(use_cookies=False)
+        for worker_id, job_id in share:
+            status = client.post("/api/applications/", json={"job_id": job_id},
+                                 headers=headers_for(worker_id)).status_code
+            with lock:
+                statuses.append(status)
+
+    appliers = [threading.Thread(target=apply_all, args=(applies[i::len(late)],))
+                for i in range(len(late))]
+    for t in appliers:
+        t.start()
+    results = hammer(app, token_for(CLIENT_ID, "client"), accept_attempts(app), THREADS)
+    for t in appliers:
+        t.join()
+
+    assert set(statuses) <= {201, 409}
+    with app.app_context():
+        # check() also fails any application still pending on an assigned job
+        assert check(db, results) == []
+        late_rows = db.session.execute(select(WorkerApplication.status).where(
+            WorkerApplication.worker_id.in_(late))).scalars().all()
+    assert len(late_rows) == statuses.count(201)
+
+
+def test_apply_only_while_open(app, headers_for):
+    late = seed_jobs(app, late_workers=2)
+    client = app.test_client(use_cookies=False)
+
+    response = client.post("/api/applications/", json={"job_id": 1}, headers=headers_for(late[0]))
+    assert response.status_code == 201
+    duplicate = client.post("/api/applications/", json={"job_id": 1}, headers=headers_for(late[0]))
+    assert duplicate.status_code == 400
+
+    accepted = client.post(f"/api/applications/{response.get_json()['application_id']}/accept",
+                           headers=headers_for(CLIENT_ID, "client"))
+    assert accepted.status_code == 200
+    assert accepted.get_json()["rejected"] == APPLICANTS
+
+    refused = client.post("/api/applications/", json={"job_id": 1}, headers=headers_for(late[1]))
+    assert refused.status_code == 409
+    missing = client.post("/api/applications/", json={"job_id": JOBS + 1},
+                          headers=headers_for(late[1]))
+    assert missing.status_code == 404
+    with app.app_context():
+        assert db.session.execute(select(WorkerApplication.id).where(
+            WorkerApplication.worker_id == late[1])).first() is None
@@ -0,0 +1,83 @@
+"""
+The replica bind gets REPLICA_ENGINE_OPTIONS while the primary stays
+writable, and recent writers read from the primary on both serving paths.
+"""
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import text
+
+from app import asgi
+from app.asgi import AsyncAPI
+from app.extensions import db
+from app.models.user import User
+
+
+def test_only_the_replica_bind_is_read_only(make_app, database_url):
+    if not database_url.startswith("postgres"):
+        pytest.skip("default_transaction_read_only is a PostgreSQL setting")
+    # Both binds on one database: the setting comes from the engine options
+    app = make_app(SQLALCHEMY_BINDS={"replica": database_url})
+    show = text("SHOW default_transaction_read_only")
+    with app.app_context():
+        try:
+            with db.engines[None].connect() as conn:
+                assert conn.execute(show).scalar() == "off"
+            with db.engines["replica"].connect() as conn:
+                assert conn.execute(show).scalar() == "on"
+            assert db.engines["replica"].pool.size() == app.config["REPLICA_ENGINE_OPTIONS"]["pool_size"]
+        finally:
+            for engine in db.engines.values():
+                engine.dispose()
+
+    async def async_settings(api):
+        try:
+            async with api.primary.connect() as conn:
+                primary = (await conn.execute(show)).scalar()
+            async with api.replica.connect() as conn:
+                replica = (await conn.execute(show)).scalar()
+            return primary, replica
+        finally:
+            await api.aclose()
+    assert asyncio.run(async_settings(AsyncAPI(app))) == ("off", "on")
+
+
+def test_writers_read_their_writes_without_the_cookie(make_app, database_url, tmp_path,
+                                                      headers_for):
+    if not database_url.startswith("sqlite"):
+        pytest.skip("uses an empty SQLite file as the lagging replica")
+    # The replica has the schema but none of the rows, like one far behind
+    app = make_app(SQLALCHEMY_BINDS={"replica": f"sqlite:///{tmp_path}/replica.db"},
+                   RESPONSE_CACHE_TTL=0)
+    with app.app_context():
+        db.create_all(bind_key=None)
+        db.metadata.create_all(db.engines["replica"])
+        db.session.add_all([User(id=user_id, username=f"user{user_id}", role="client",
+                                 email=f"user{user_id}@test.local", password_hash="-")
+                            for user_id in (1, 2)])
+        db.session.commit()
+    writer, other = headers_for(1, "client"), headers_for(2, "client")
+    # No cookies: stickiness must come from the token subject
+    client = app.test_client(use_cookies=False)
+    created = client.post("/api/jobs/", headers=writer, json={
+        "title": "Fix a tap", "description": "Leaking kitchen tap", "location": "Nairobi",
+        "location_lat": -1.29, "location_lng": 36.82})
+    assert created.status_code == 201
+    job_id = created.get_json()["job"]["id"]
+
+    assert client.get(f"/api/jobs/{job_id}", headers=writer).status_code == 200
+    assert client.get(f"/api/jobs/{job_id}", headers=other).status_code == 404
+
+    async def list_applications(headers):
+        api = AsyncAPI(app)
+        api.route("GET", "/api/applications/job/<int:job_id>")(asgi.list_applications)
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api),
+                                         base_url="http://test") as http:
+                response = await http.get(f"/api/applications/job/{job_id}", headers=headers)
+                return response.status_code
+        finally:
+            await api.aclose()
+    assert asyncio.run(list_applications(writer)) == 200
+    assert asyncio.run(list_applications(other)) == 404
@@ -0,0 +1,53 @@
+"""Job locations: vague strings are refused, backfills refresh cached jobs."""
+import pytest
+
+from app.extensions import db
+from app.models.job import Job
+from app.models.user import User
+from services.geocoder import backfill_jobs
+
+JOB = {"title": "Fix a tap", "description": "Leaking kitchen tap"}
+
+
+@pytest.fixture
+def client_id(app):
+    with app.app_context():
+        user = User(username="locator", email="locator@test.local", role="client",
+                    password_hash="-")
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def test_prefix_guess_is_refused_with_suggestions(app, client_id, headers_for):
+    client, headers = app.test_client(), headers_for(client_id, "client")
+    res = client.post("/api/jobs/", json={**JOB, "location": "Park"}, headers=headers)
+    assert res.status_code == 400
+    assert "Parklands" in res.get_json()["suggestions"]
+
+    res = client.post("/api/jobs/", json={**JOB, "location": "Kilimanii"}, headers=headers)
+    assert res.status_code == 201
+    job_id = res.get_json()["job"]["id"]
+    res = client.put(f"/api/jobs/{job_id}", json={"location": "Park"}, headers=headers)
+    assert res.status_code == 400
+
+    csv = b"title,description,location\nFix a tap,Leaking tap,Park\n"
+    res = client.post("/api/jobs/bulk", data=csv,
+                      headers={**headers, "Content-Type": "text/csv"})
+    assert res.get_json()["inserted"] == 0
+    assert "Parklands" in str(res.get_json()["errors"])
+
+
+def test_backfill_refreshes_cached_jobs(app, client_id):
+    client = app.test_client()
+    with app.app_context():
+        job = Job(**JOB, location_lat=0.0, location_lng=0.0, client_id=client_id,
+                  job_metadata={"location": "Parklands"})
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+    assert client.get(f"/api/jobs/{job_id}").get_json()["location_lat"] == 0.0
+
+    with app.app_context():
+        assert backfill_jobs()[0] == 1
+    assert client.get(f"/api/jobs/{job_id}").get_json()["location_lat"] == pytest.approx(-1.261)
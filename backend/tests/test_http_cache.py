@@ -0,0 +1,46 @@
+"""Conditional GETs of the job feed after jobs leave it."""
+import pytest
+
+from app.extensions import db
+from app.models.user import User
+
+JOB = {"description": "Leaking kitchen tap", "location": "Nairobi",
+       "location_lat": -1.29, "location_lng": 36.82}
+
+
+@pytest.fixture
+def owner(app, headers_for):
+    with app.app_context():
+        user = User(username="owner", email="owner@test.local", role="client", password_hash="-")
+        db.session.add(user)
+        db.session.commit()
+        return headers_for(user.id, "client")
+
+
+def post_jobs(client, headers, count):
+    return [client.post("/api/jobs/", json={**JOB, "title": f"Job {i}"}, headers=headers)
+            .get_json()["job"]["id"] for i in range(count)]
+
+
+@pytest.mark.parametrize("remove", ["delete", "cancel"])
+def test_feed_revalidates_after_the_newest_job_leaves(app, owner, remove):
+    client = app.test_client()
+    older, newer = post_jobs(client, owner, 2)
+    url = "/api/jobs/?status=open"
+    first = client.get(url)
+    assert first.status_code == 200
+    # Last-Modified would go back once the newest job leaves the page
+    assert "Last-Modified" not in first.headers
+
+    if remove == "delete":
+        assert client.delete(f"/api/jobs/{newer}", headers=owner).status_code == 200
+    else:
+        assert client.post(f"/api/jobs/{newer}/cancel", headers=owner).status_code == 200
+
+    since = client.get(url, headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert since.status_code == 200
+    assert [item["id"] for item in since.get_json()["items"]] == [older]
+    stale = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert stale.status_code == 200
+    fresh = client.get(url, headers={"If-None-Match": since.headers["ETag"]})
+    assert fresh.status_code == 304
@@ -0,0 +1,59 @@
+"""POST /api/jobs/bulk: rows that cannot be decoded fail on their own."""
+import json
+
+import pytest
+
+from app.extensions import db
+from app.models.user import User
+
+ROW = {"title": "Fix a tap", "description": "Leaking kitchen tap", "price": 1500,
+       "location": "Nairobi", "location_lat": -1.29, "location_lng": 36.82}
+
+
+@pytest.fixture
+def client_headers(app, headers_for):
+    with app.app_context():
+        user = User(username="importer", email="importer@test.local", role="client",
+                    password_hash="-")
+        db.session.add(user)
+        db.session.commit()
+        return headers_for(user.id, "client")
+
+
+def test_ndjson_with_latin1_line(app, client_headers):
+    good = json.dumps(ROW).encode()
+    bad = json.dumps({**ROW, "title": "Café repairs"}, ensure_ascii=False).encode("latin-1")
+    response = app.test_client().post(
+        "/api/jobs/bulk", data=b"\n".join([good, bad, good]) + b"\n",
+        headers={**client_headers, "Content-Type": "application/x-ndjson"})
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["inserted"] == 2
+    assert body["errors"] == [{"line": 2, "errors": "Invalid UTF-8"}]
+
+
+def test_csv_with_latin1_row(app, client_headers):
+    header = ",".join(ROW).encode()
+    good = ",".join(str(v) for v in ROW.values()).encode()
+    bad = good.replace(b"Fix a tap", "Café repairs".encode("latin-1"))
+    response = app.test_client().post(
+        "/api/jobs/bulk", data=b"\n".join([header, good, bad]) + b"\n",
+        headers={**client_headers, "Content-Type": "text/csv"})
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["inserted"] == 1
+    assert body["errors"] == [{"line": 3, "errors": "Invalid UTF-8"}]
+
+
+def test_csv_errors_report_physical_lines(app, client_headers):
+    header = ",".join(ROW).encode()
+    good = ",".join(str(v) for v in ROW.values()).encode()
+    multiline = good.replace(b"Leaking kitchen tap", b'"Leaking\nkitchen tap"')
+    bad = good.replace(b"Fix a tap", "Café repairs".encode("latin-1"))
+    # header, two-line record, blank line, bad row on line 5
+    response = app.test_client().post(
+        "/api/jobs/bulk", data=b"\n".join([header, multiline, b"", bad]) + b"\n",
+        headers={**client_headers, "Content-Type": "text/csv"})
+    body = response.get_json()
+    assert body["inserted"] == 1
+    assert body["errors"] == [{"line": 5, "errors": "Invalid UTF-8"}]
@@ -0,0 +1,31 @@
+"""GET /api/jobs/stream on the WSGI app: parameter checks and the thread cap."""
+import pytest
+
+
+@pytest.mark.parametrize("radius", ["nan", "inf", "-inf", "0"])
+def test_non_finite_radius_is_rejected(app, radius):
+    response = app.test_client().get(
+        f"/api/jobs/stream?lat=-1.29&lng=36.82&radius_km={radius}", buffered=False)
+    assert response.status_code == 400
+
+
+def test_wsgi_streams_are_capped(make_app):
+    app = make_app(JOB_STREAM_MAX_WSGI_STREAMS=1)
+    client = app.test_client()
+    url = "/api/jobs/stream?lat=-1.29&lng=36.82"
+
+    first = client.get(url, buffered=False)
+    assert first.status_code == 200
+    # Start the body as a server would; closing it then frees the slot
+    next(first.response)
+    assert client.get(url, buffered=False).status_code == 503
+    first.close()
+    second = client.get(url, buffered=False)
+    assert second.status_code == 200
+    next(second.response)
+    second.close()
+
+
+def test_wsgi_streams_can_be_left_to_asgi(make_app):
+    app = make_app(JOB_STREAM_MAX_WSGI_STREAMS=0)
+    assert app.test_client().get("/api/jobs/stream?lat=-1.29&lng=36.82").status_code == 503
@@ -0,0 +1,17 @@
+"""init_logging keeps one listener thread per process across create_app() calls."""
+import threading
+
+
+def test_create_app_replaces_the_log_listener(make_app, tmp_path):
+    make_app()
+    threads = threading.active_count()
+    for _ in range(5):
+        make_app()
+    assert threading.active_count() == threads
+
+    # The displaced listener drains its queue before it stops
+    log_file = tmp_path / "app.log"
+    app = make_app(LOG_FILE=str(log_file), LOG_LEVEL="INFO")
+    app.logger.info("queued before the next create_app")
+    make_app()
+    assert "queued before the next create_app" in log_file.read_text()
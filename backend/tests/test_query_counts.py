@@ -0,0 +1,80 @@
+"""
+?include= expansions are batch-loaded: the number of SQL statements a
+request issues must not grow with the number of rows it returns.
+"""
+from itertools import count
+
+from app.extensions import db
+from app.models.application import WorkerApplication
+from app.models.job import Job
+from app.models.user import User
+from app.models.worker_profile import WorkerProfile
+from app.utils.querycount import assert_constant_queries
+
+_ids = count(1)
+
+
+def add_user(role):
+    n = next(_ids)
+    user = User(username=f"{role}{n}", email=f"{role}{n}@test.local",
+                password_hash="-", role=role)
+    db.session.add(user)
+    return user
+
+
+def add_job(client, worker=None):
+    job = Job(title="Fix a tap", description="Leaking kitchen tap", location_lat=-1.29,
+              location_lng=36.82, client=client, worker=worker,
+              status="assigned" if worker else "open")
+    db.session.add(job)
+    return job
+
+
+def test_job_feed_includes_are_batched(app):
+    # Every response must come from the database, not the response cache
+    app.config["RESPONSE_CACHE_TTL"] = 0
+    client = app.test_client()
+
+    def seed(size):
+        with app.app_context():
+            while Job.query.count() < size:
+                add_job(add_user("client"), add_user("worker"))
+            db.session.commit()
+
+    def call():
+        response = client.get("/api/jobs/?include=client,worker&per_page=50")
+        assert response.status_code == 200
+        assert all(item["client"] and item["worker"] for item in response.get_json()["items"])
+
+    with app.app_context():
+        engine = db.engine
+    counts = assert_constant_queries(call, seed, engine=engine)
+    assert set(counts) == {1, 5, 25}
+
+
+def test_application_list_includes_are_batched(app, headers_for):
+    with app.app_context():
+        owner = add_user("client")
+        job = add_job(owner)
+        db.session.commit()
+        job_id, headers = job.id, headers_for(owner.id, "client")
+    client = app.test_client()
+
+    def seed(size):
+        with app.app_context():
+            while WorkerApplication.query.filter_by(job_id=job_id).count() < size:
+                worker = add_user("worker")
+                db.session.add(WorkerProfile(user=worker, skills="plumbing"))
+                db.session.add(WorkerApplication(job_id=job_id, worker=worker))
+                db.session.flush()
+            db.session.commit()
+
+    def call():
+        response = client.get(f"/api/applications/job/{job_id}?include=worker,profile",
+                              headers=headers)
+        assert response.status_code == 200
+        assert all(item["worker"] and item["profile"] for item in response.get_json())
+
+    with app.app_context():
+        engine = db.engine
+    assert_constant_queries(call, seed, engine=engine)
@@ -0,0 +1,21 @@
+"""Application scoring features (services/ai_service.py)."""
+import numpy as np
+import pytest
+
+from services.ai_service import NEUTRAL, SKILL_WEIGHT, DISTANCE_WEIGHT, RATING_WEIGHT, score_features
+
+
+def test_missing_features_score_neutral():
+    # No skills, no location, no rating: every feature is unknown
+    scores = score_features({"plumbing", "tap"}, [set()], [np.nan], [np.nan])
+    assert scores[0] == pytest.approx(NEUTRAL * (SKILL_WEIGHT + DISTANCE_WEIGHT + RATING_WEIGHT))
+
+
+def test_listed_skills_outside_the_job_score_zero():
+    unknown, mismatch, match = score_features(
+        {"plumbing", "tap"}, [set(), {"painting"}, {"plumbing"}], [np.nan] * 3)
+    # Distance and rating are unknown, so only the skill component differs
+    rest = NEUTRAL * (DISTANCE_WEIGHT + RATING_WEIGHT)
+    assert mismatch == pytest.approx(rest)
+    assert unknown == pytest.approx(rest + NEUTRAL * SKILL_WEIGHT)
+    assert match == pytest.approx(rest + SKILL_WEIGHT)
@@ -0,0 +1,38 @@
+"""GET /api/jobs/search: the status filter applies before candidates are cut."""
+import pytest
+
+from app.extensions import db
+from app.models.user import User
+from services.search import CANDIDATE_FACTOR
+
+JOB = {"location": "Nairobi", "location_lat": -1.29, "location_lng": 36.82}
+
+
+@pytest.fixture
+def client_headers(app, headers_for):
+    with app.app_context():
+        user = User(username="searcher", email="searcher@test.local", role="client",
+                    password_hash="-")
+        db.session.add(user)
+        db.session.commit()
+        return headers_for(user.id, "client")
+
+
+def test_status_filter_reaches_past_better_text_matches(app, client_headers):
+    client = app.test_client()
+    # Enough cancelled title matches to fill the whole candidate window
+    for i in range(CANDIDATE_FACTOR + 1):
+        job = client.post("/api/jobs/", json={**JOB, "title": f"Plumber {i}",
+                                              "description": "Plumber needed"},
+                          headers=client_headers).get_json()["job"]
+        client.post(f"/api/jobs/{job['id']}/cancel", headers=client_headers)
+    open_job = client.post("/api/jobs/", json={**JOB, "title": "Kitchen tap",
+                                               "description": "Leak, plumber wanted"},
+                           headers=client_headers).get_json()["job"]
+
+    res = client.get("/api/jobs/search?q=plumber&status=open&limit=1")
+    assert res.status_code == 200
+    assert [item["id"] for item in res.get_json()["items"]] == [open_job["id"]]
+
+    res = client.get("/api/jobs/search?q=plumber&status=cancelled&limit=50")
+    assert len(res.get_json()["items"]) == CANDIDATE_FACTOR + 1
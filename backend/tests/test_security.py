@@ -0,0 +1,32 @@
+"""Password hashing and authentication edge cases."""
+from app.extensions import db
+from app.models.user import User
+
+
+def test_user_password_uses_the_configured_hasher(make_app):
+    app = make_app(PASSWORD_HASH_METHOD="pbkdf2:sha256:1000")
+    user = User(username="hasher", email="hasher@test.local", role="worker")
+    with app.app_context():
+        user.set_password("password123")
+        assert user.password_hash.startswith("pbkdf2:sha256:1000$")
+        assert user.check_password("password123")
+        assert not user.check_password("password124")
+
+
+def test_deleted_user_gets_404_not_500(app, headers_for):
+    with app.app_context():
+        user = User(username="leaver", email="leaver@test.local", role="worker",
+                    password_hash="-")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    headers = headers_for(user_id)
+    client = app.test_client()
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    with app.app_context():
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+    response = client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "User not found"}